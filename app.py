@@ -308,6 +308,7 @@ else:
                         internships = list(internships) if hasattr(internships, '__iter__') else []
                     
                     st.session_state['all_internships'] = internships
+                    st.session_state.pop('internship_stats', None)  # Recount on the dashboard
                     print(f"[DEBUG] Loaded {len(internships)} internships for user {user_id}")
                     return True
             except Exception as e:
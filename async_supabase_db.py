@@ -0,0 +1,194 @@
+"""
+Async Supabase data access
+asyncio-native counterpart of SupabaseDB for the Telegram bot and background workers
+"""
+
+from datetime import datetime
+from supabase import acreate_client, AsyncClient
+from supabase_db import get_supabase_config
+
+
+class AsyncSupabaseDB:
+    """
+    Async mirror of the SupabaseDB internship/profile methods.
+
+    Every call awaits the PostgREST round trip instead of blocking the event loop,
+    so one slow query no longer stalls the other chats handled by the bot.
+    Create instances with ``await AsyncSupabaseDB.create()``.
+    """
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+
+    @classmethod
+    async def create(cls):
+        """Initializes the async Supabase client."""
+        SUPABASE_URL, SUPABASE_KEY = get_supabase_config()
+        if not all([SUPABASE_URL, SUPABASE_KEY]):
+            raise ConnectionError("Supabase URL or Key is not set. Check your config.py, environment variables, or Streamlit secrets.")
+        try:
+            client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+        except Exception as e:
+            print(f"Async Supabase initialization error: {str(e)}")
+            raise ConnectionError(f"Failed to initialize async Supabase client: {e}") from e
+        return cls(client)
+
+    async def get_user_profile(self, user_id: str):
+        """Gets the profile of the specified user."""
+        try:
+            profile_res = await self.client.table('profiles').select('*').eq('id', user_id).single().execute()
+            return profile_res.data
+        except Exception:
+            return None
+
+    async def get_profile_by_telegram_chat_id(self, telegram_chat_id):
+        """Gets the profile linked to a Telegram chat (set in Telegram Settings)."""
+        try:
+            response = await self.client.table('profiles').select('*').eq('telegram_chat_id', str(telegram_chat_id)).limit(1).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            print(f"[ERROR] Failed to get profile for Telegram chat: {str(e)}")
+            return None
+
+    async def check_internship_exists(self, user_id: str, job_data: dict) -> dict:
+        """Check if an internship already exists for the user using multiple criteria"""
+        try:
+            application_link = job_data.get('application_link', '')
+            job_title = job_data.get('job_title', '')
+            company_name = job_data.get('company_name', '')
+
+            if application_link:
+                response = await self.client.table('internships').select('id').eq('user_id', user_id).eq('application_link', application_link).execute()
+                if response.data:
+                    return {'exists': True, 'reason': 'application_link', 'existing_id': response.data[0]['id']}
+
+            if job_title and company_name:
+                response = await self.client.table('internships').select('id').eq('user_id', user_id).eq('job_title', job_title).eq('company_name', company_name).execute()
+                if response.data:
+                    return {'exists': True, 'reason': 'job_company_match', 'existing_id': response.data[0]['id']}
+
+            return {'exists': False}
+
+        except Exception as e:
+            print(f"[ERROR] Failed to check internship existence: {str(e)}")
+            return {'exists': False, 'error': str(e)}
+
+    async def add_internship(self, user_id: str, job_data: dict):
+        """Adds a new internship record for a specific user with duplicate checking."""
+        try:
+            duplicate_check = await self.check_internship_exists(user_id, job_data)
+            if duplicate_check.get('exists'):
+                reason = duplicate_check.get('reason', 'unknown')
+                existing_id = duplicate_check.get('existing_id', 'unknown')
+                return {'error': 'duplicate', 'message': f'Duplicate internship detected ({reason})', 'existing_id': existing_id}
+
+            record = {**job_data, 'user_id': user_id}
+            response = await self.client.table('internships').insert(record).execute()
+            if response.data:
+                return {'success': True, 'data': response.data[0], 'is_new': True}
+            return {'error': 'Failed to insert data - no records returned.'}
+
+        except Exception as e:
+            if 'duplicate key value violates unique constraint' in str(e):
+                return {"error": "duplicate", "message": "You have already saved this internship."}
+            return {"error": str(e)}
+
+    async def get_internships_by_user(self, user_id: str, limit=None, offset=None):
+        """Fetches internship records for a specific user with optional pagination."""
+        if not user_id:
+            return []
+
+        try:
+            if limit is not None and offset is not None:
+                response = await self.client.table('internships').select('*').eq('user_id', user_id).limit(limit).offset(offset).execute()
+                internships = response.data or []
+            else:
+                internships = []
+                batch_size = 1000
+                current_offset = 0
+                while True:
+                    response = await self.client.table('internships').select('*').eq('user_id', user_id).limit(batch_size).offset(current_offset).execute()
+                    batch_data = response.data or []
+                    internships.extend(batch_data)
+                    if len(batch_data) < batch_size:
+                        break
+                    current_offset += batch_size
+
+            try:
+                return sorted(
+                    internships,
+                    key=lambda x: (
+                        {'new': 0, 'applied': 1, 'rejected': 2}.get(x.get('status', 'new'), 3),
+                        -int(datetime.fromisoformat(x.get('created_at', '').replace('Z', '+00:00')).timestamp() if x.get('created_at') else 0)
+                    )
+                )
+            except Exception:
+                return internships
+        except Exception as e:
+            raise Exception(f"Failed to fetch internships: {str(e)}")
+
+    async def get_internships_count(self, user_id: str):
+        """Get the total count of internships for a user."""
+        if not user_id:
+            return 0
+        try:
+            response = await self.client.table('internships').select('id', count='exact').eq('user_id', user_id).execute()
+            return response.count if response.count is not None else len(response.data or [])
+        except Exception as e:
+            print(f"Error getting internships count: {e}")
+            return 0
+
+    async def update_internship_status(self, user_id: str, internship_id: int, new_status: str):
+        """Updates the status of an internship and returns the updated record (None if not found)."""
+        if new_status not in ['new', 'applied', 'rejected']:
+            raise ValueError(f"Invalid status: {new_status}")
+
+        try:
+            response = await self.client.table('internships').update({
+                'status': new_status
+            }).match({
+                'id': int(internship_id),
+                'user_id': user_id
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            raise Exception(f"Database error: {str(e)}")
+
+    async def delete_internship(self, user_id: str, internship_id: int):
+        """Deletes a specific internship for a user."""
+        try:
+            response = await self.client.table('internships').delete().match({
+                'id': int(internship_id),
+                'user_id': user_id
+            }).execute()
+            return bool(response.data)
+        except Exception as e:
+            print(f"Error deleting internship: {str(e)}")
+            return False
+
+    async def get_unnotified_internships(self, user_id: str, columns: str = 'id, job_title, company_name, application_link, job_description'):
+        """Get all internships that haven't been notified yet (notified is false or NULL) in one query"""
+        try:
+            response = await (
+                self.client.table('internships')
+                .select(columns)
+                .eq('user_id', user_id)
+                .or_('notified.is.false,notified.is.null')
+                .execute()
+            )
+            return response.data or []
+        except Exception as e:
+            print(f"[ERROR] Failed to get unnotified internships: {str(e)}")
+            return []
+
+    async def mark_notified(self, internship_ids):
+        """Mark several internships as notified with a single UPDATE ... WHERE id IN (...)"""
+        ids = [internship_id for internship_id in dict.fromkeys(internship_ids or []) if internship_id is not None]
+        if not ids:
+            return {'success': True, 'updated_count': 0}
+        try:
+            response = await self.client.table('internships').update({'notified': True}).in_('id', ids).execute()
+            return {'success': True, 'updated_count': len(response.data or [])}
+        except Exception as e:
+            print(f"[ERROR] Failed to mark internships as notified: {str(e)}")
+            return {'error': str(e)}
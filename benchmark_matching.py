@@ -0,0 +1,298 @@
+"""
+Matching Benchmarks
+Measures SmartMatchingEngine throughput (jobs/sec) on a synthetic posting corpus
+
+Usage:
+    python benchmark_matching.py extract --jobs 500
+    python benchmark_matching.py score --jobs 5000
+    python benchmark_matching.py parallel --jobs 4000 --workers 1 2 4 8
+    python benchmark_matching.py semantic --jobs 5000 --candidates 1000
+    python benchmark_matching.py pipeline --jobs 2000
+    python benchmark_matching.py rescore --jobs 5000
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from embedding_index import EmbeddingIndex
+from feature_store import FeatureStore
+from posting_index import PostingIndex
+from smart_matching_engine import SmartMatchingEngine
+
+FILLER_WORDS = (
+    "we are looking for a motivated intern to join our team you will work on "
+    "backend services data pipelines and internal tools with experienced engineers "
+    "strong communication skills required must have ability to learn quickly nice to have "
+    "bachelor degree in computer science or related field remote friendly office"
+).split()
+
+
+def generate_postings(engine: SmartMatchingEngine, count: int, words_per_posting: int = 350, seed: int = 42) -> list:
+    """Synthetic job postings mixing filler text with random taxonomy terms."""
+    rng = random.Random(seed)
+    all_terms = [tech for techs in engine.tech_skills.values() for tech in techs]
+    postings = []
+    for i in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(words_per_posting)]
+        for _ in range(rng.randint(5, 25)):
+            words.insert(rng.randrange(len(words)), rng.choice(all_terms))
+        postings.append({
+            'id': i,
+            'job_title': rng.choice(["Software Engineer Intern", "Data Science Intern", "Senior Backend Engineer"]),
+            'job_description': " ".join(words).capitalize()
+        })
+    return postings
+
+
+def legacy_extract_skills(engine: SmartMatchingEngine, job_description: str) -> set:
+    """The original per-term scan, kept only as the benchmark baseline."""
+    desc_lower = job_description.lower()
+    found = set()
+    for category, tech_list in engine.tech_skills.items():
+        for tech in tech_list:
+            if (tech in desc_lower or
+                tech.replace(' ', '') in desc_lower.replace(' ', '') or
+                any(variant in desc_lower for variant in [tech.upper(), tech.capitalize()])):
+                skill_pos = desc_lower.find(tech)
+                tech_context = desc_lower[max(0, skill_pos - 100):skill_pos + len(tech) + 100] if skill_pos != -1 else ""
+                re.search(engine.requirement_patterns['skills_required'], tech_context)
+                found.add(tech)
+    return found
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:,.0f} jobs/sec ({seconds * 1000:.1f} ms total)"
+
+
+def bench_extract(jobs: int):
+    engine = SmartMatchingEngine()
+    postings = generate_postings(engine, jobs)
+
+    start = time.perf_counter()
+    for job in postings:
+        legacy_extract_skills(engine, job['job_description'])
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for job in postings:
+        engine._extract_job_requirements(job['job_description'], job['job_title'])
+    current_seconds = time.perf_counter() - start
+
+    engine.requirements_cache.clear()
+    for job in postings:
+        engine.extract_job_requirements(job['job_description'], job['job_title'])
+    start = time.perf_counter()
+    for job in postings:
+        engine.extract_job_requirements(job['job_description'], job['job_title'])
+    cached_seconds = time.perf_counter() - start
+
+    print(f"extract_job_requirements over {jobs} postings")
+    print(f"  legacy per-term scan : {_rate(jobs, legacy_seconds)}")
+    print(f"  current engine       : {_rate(jobs, current_seconds)}")
+    print(f"  speedup              : {legacy_seconds / current_seconds:.1f}x")
+    print(f"  cached (warm LRU)    : {_rate(jobs, cached_seconds)}")
+
+
+SAMPLE_RESUME = {
+    'skills': ['Python', 'Django', 'PostgreSQL', 'Docker', 'Git', 'React', 'Pandas', 'Machine Learning'],
+    'education': [{'degree': 'Bachelor of Computer Science'}],
+    'professional_experience': [{'duration': '2024/06 – 2024/09'}],
+    'projects': [{}, {}]
+}
+
+
+def bench_score(jobs: int):
+    engine = SmartMatchingEngine()
+    resume_analysis = engine.analyze_resume(SAMPLE_RESUME)
+    requirements = [engine.extract_job_requirements(job['job_description'], job['job_title'])
+                    for job in generate_postings(engine, jobs)]
+    levels = ['low', 'medium', 'high']
+    competition = [levels[i % 3] for i in range(jobs)]
+
+    start = time.perf_counter()
+    per_job = []
+    for job_requirements, level in zip(requirements, competition):
+        compatibility = engine.calculate_compatibility_score(resume_analysis, job_requirements)
+        acceptance = engine.calculate_acceptance_probability(compatibility, {'competition_level': level})
+        per_job.append((compatibility['overall_compatibility'], acceptance['acceptance_probability']))
+    per_job_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = engine.encode_jobs(requirements)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = engine.score_many(resume_analysis, encoded, competition)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for (overall, acceptance), row in zip(per_job, scores)
+                     if abs(overall - row['overall']) > 1e-9 or abs(acceptance - row['acceptance']) > 1e-9)
+
+    print(f"scoring one resume against {jobs} extracted postings")
+    print(f"  per-job dict scoring : {_rate(jobs, per_job_seconds)}")
+    print(f"  encode_jobs (once)   : {encode_seconds * 1000:.1f} ms")
+    print(f"  score_many (encoded) : {_rate(jobs, batch_seconds)}")
+    print(f"  speedup              : {per_job_seconds / batch_seconds:.0f}x, mismatched rows: {mismatches}")
+
+
+def bench_parallel(jobs: int, worker_counts: list):
+    engine = SmartMatchingEngine()
+    resume_analysis = engine.analyze_resume(SAMPLE_RESUME)
+
+    print(f"score_jobs over {jobs} raw postings (cold requirement caches, pool start-up included)")
+    baseline = None
+    for seed, workers in enumerate(worker_counts, start=1):
+        # Fresh postings per run so no worker has them cached yet
+        postings = generate_postings(engine, jobs, seed=seed)
+        start = time.perf_counter()
+        engine.score_jobs(resume_analysis, postings, workers=workers)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"  {workers} worker(s)      : {_rate(jobs, seconds)}  scaling {baseline / seconds:.2f}x")
+
+
+def bench_semantic(jobs: int, candidates: int, top: int = 50):
+    engine = SmartMatchingEngine()
+    resume_analysis = engine.analyze_resume(SAMPLE_RESUME)
+    postings = generate_postings(engine, jobs)
+    index = EmbeddingIndex(path=None)
+
+    start = time.perf_counter()
+    index.add(postings)
+    embed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kept = index.top_candidates(postings, SAMPLE_RESUME, candidates)
+    search_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, scores = engine.score_jobs(resume_analysis, postings, workers=1)
+    score_seconds = time.perf_counter() - start
+    best = sorted(range(jobs), key=lambda i: scores[i]['overall'], reverse=True)[:top]
+    recall = len(set(best) & set(kept)) / len(best)
+    saved_seconds = score_seconds * (jobs - len(kept)) / jobs
+
+    print(f"semantic pre-filter over {jobs} postings, keeping {candidates}")
+    print(f"  embed + store (cold) : {_rate(jobs, embed_seconds)}  (batch job, not per search)")
+    print(f"  top-K (stored rows)  : {search_seconds * 1000:.1f} ms")
+    print(f"  rule scoring (cold)  : {score_seconds * 1000:.1f} ms for all, "
+          f"{saved_seconds * 1000:.1f} ms saved by the pre-filter")
+    print(f"  recall of rule top-{top}: {recall:.0%}")
+
+
+def bench_pipeline(jobs: int):
+    """Headless Smart Search over a local corpus only: no UI, no network, no database."""
+    from rag_linkedin_searcher import RAGLinkedInSearcher, SOURCE_LOCAL
+
+    with tempfile.TemporaryDirectory() as workdir:
+        posting_index = PostingIndex(path=os.path.join(workdir, "postings.db"))
+        searcher = RAGLinkedInSearcher(posting_index=posting_index, embedding_index=EmbeddingIndex(path=None),
+                                       feature_store=FeatureStore(path=os.path.join(workdir, "features.db")))
+        postings = generate_postings(searcher.matching_engine, jobs)
+        for job in postings:
+            job['application_link'] = f"https://example.com/jobs/{job.pop('id')}"
+        posting_index.add_postings(postings)
+
+        stage_times = {}
+        last = [time.perf_counter()]
+
+        def on_event(event: str, payload: dict):
+            now = time.perf_counter()
+            label = f"{event}:{payload['stage']}" if 'stage' in payload else event
+            stage_times[label] = stage_times.get(label, 0.0) + now - last[0]
+            last[0] = now
+
+        queries = [{'query': "software engineer intern", 'location': '', 'reasoning': ''},
+                   {'query': "data science intern", 'location': '', 'reasoning': ''}]
+        start = time.perf_counter()
+        results = searcher.perform_rag_search(SAMPLE_RESUME, user_id=None, max_results_per_query=jobs // 2,
+                                              custom_queries=queries, source=SOURCE_LOCAL, on_event=on_event)
+        seconds = time.perf_counter() - start
+
+    retrieved, scored = results['retrieved_count'], results['summary']['total_found']
+    print(f"headless pipeline over a {jobs}-posting local corpus ({retrieved} retrieved, {scored} rule-scored)")
+    print(f"  end to end           : {_rate(retrieved, seconds)}")
+    print("  time before each event:")
+    for label, label_seconds in stage_times.items():
+        print(f"    {label:<24}: {label_seconds * 1000:.1f} ms")
+
+
+def bench_rescore(jobs: int):
+    """Incremental re-scoring after typical resume edits vs a full score_many."""
+    engine = SmartMatchingEngine()
+    requirements = [engine.extract_job_requirements(job['job_description'], job['job_title'])
+                    for job in generate_postings(engine, jobs)]
+    levels = ['low', 'medium', 'high']
+    competition = [levels[i % 3] for i in range(jobs)]
+    encoded = engine.encode_jobs(requirements)
+
+    previous_analysis = engine.analyze_resume(SAMPLE_RESUME)
+    previous_scores = engine.score_many(previous_analysis, encoded, competition)
+    edits = {
+        'add one skill': {**SAMPLE_RESUME, 'skills': SAMPLE_RESUME['skills'] + ['Kubernetes']},
+        'swap two skills': {**SAMPLE_RESUME, 'skills': SAMPLE_RESUME['skills'][2:] + ['Go', 'Rust']},
+        'add experience': {**SAMPLE_RESUME, 'professional_experience': SAMPLE_RESUME['professional_experience'] * 3},
+        'add a degree': {**SAMPLE_RESUME, 'education': SAMPLE_RESUME['education'] + [{'degree': 'Master of Data Science'}]},
+    }
+
+    print(f"re-scoring {jobs} encoded postings after a resume edit")
+    for label, resume in edits.items():
+        resume_analysis = engine.analyze_resume(resume)
+
+        start = time.perf_counter()
+        full = engine.score_many(resume_analysis, encoded, competition)
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        incremental, details = engine.rescore_many(previous_scores, encoded, previous_analysis, resume_analysis, competition)
+        incremental_seconds = time.perf_counter() - start
+
+        mismatches = int(sum((full[field] != incremental[field]).sum() for field in full.dtype.names))
+        print(f"  {label:<16}: full {full_seconds * 1000:.2f} ms, incremental {incremental_seconds * 1000:.2f} ms "
+              f"({details['technical_rows']} technical rows), mismatched values: {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract_parser = subparsers.add_parser('extract', help="Requirement extraction throughput vs the legacy scan")
+    extract_parser.add_argument('--jobs', type=int, default=500)
+
+    score_parser = subparsers.add_parser('score', help="Per-job scoring vs vectorised score_many")
+    score_parser.add_argument('--jobs', type=int, default=5000)
+
+    parallel_parser = subparsers.add_parser('parallel', help="score_jobs scaling across worker processes")
+    parallel_parser.add_argument('--jobs', type=int, default=4000)
+    parallel_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+
+    semantic_parser = subparsers.add_parser('semantic', help="Embedding pre-filter cost and recall of the rule top results")
+    semantic_parser.add_argument('--jobs', type=int, default=5000)
+    semantic_parser.add_argument('--candidates', type=int, default=1000)
+
+    pipeline_parser = subparsers.add_parser('pipeline', help="Headless Smart Search (local corpus) end to end")
+    pipeline_parser.add_argument('--jobs', type=int, default=2000)
+
+    rescore_parser = subparsers.add_parser('rescore', help="Incremental re-scoring after resume edits vs score_many")
+    rescore_parser.add_argument('--jobs', type=int, default=5000)
+
+    args = parser.parse_args()
+    if args.command == 'extract':
+        bench_extract(args.jobs)
+    elif args.command == 'score':
+        bench_score(args.jobs)
+    elif args.command == 'parallel':
+        bench_parallel(args.jobs, args.workers)
+    elif args.command == 'semantic':
+        bench_semantic(args.jobs, args.candidates)
+    elif args.command == 'pipeline':
+        bench_pipeline(args.jobs)
+    elif args.command == 'rescore':
+        bench_rescore(args.jobs)
+
+
+if __name__ == "__main__":
+    main()
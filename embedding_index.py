@@ -0,0 +1,333 @@
+"""
+Dense Embedding Index
+CPU-only semantic retrieval: postings embedded into a memory-mapped int8 matrix and ranked against resume sections by batched matmul
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from posting_index import STOPWORDS
+from requirements_cache import make_content_key
+from skill_matcher import tokenize
+from skill_taxonomy import get_taxonomy
+
+# File prefix for the persistent index (<prefix>.db, <prefix>.vectors.npy, <prefix>.scales.npy); empty = memory only
+DEFAULT_EMBEDDING_PATH = os.getenv("EMBEDDING_INDEX_PATH", "embedding_index")
+# Optional sentence-transformers model name (e.g. all-MiniLM-L6-v2); unset = hashed embeddings
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+# Opt-in: of the postings that already have stored embeddings, at most this many are rule-scored
+# per search, chosen by cosine similarity (0 = off). Embedding is left to the batch job.
+DEFAULT_PREFILTER_CANDIDATES = int(os.getenv("SEMANTIC_PREFILTER_CANDIDATES", "0"))
+
+EMBED_BATCH_SIZE = 256
+SEARCH_BATCH_ROWS = 4096
+
+# Resume sections embedded separately -> weight in the combined similarity
+RESUME_SECTION_WEIGHTS = {
+    'skills': 0.4,
+    'experience': 0.3,
+    'projects': 0.2,
+    'education': 0.1
+}
+
+
+class HashedEmbedder:
+    """
+    Model-free embeddings: a sparse random projection of weighted text features.
+
+    Features are non-stopword tokens, adjacent token pairs and canonical taxonomy skills
+    (so "k8s" and "kubernetes" share a direction). Skills carry the most weight because
+    they drive the rule-based score this pre-filters for. Each feature is hashed to one of dim
+    buckets with a random sign; weights are sublinear in the count, and vectors are
+    L2-normalised so a dot product is the cosine similarity.
+    """
+
+    FEATURE_WEIGHTS = {'token': 1.0, 'pair': 0.5, 'skill': 6.0}
+
+    def __init__(self, dim: int = 384, seed: int = 0):
+        self.dim = dim
+        self.seed = seed
+        self.name = f"hashed-{dim}-{seed}"
+        self._salt = seed.to_bytes(8, 'little')
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            value = int.from_bytes(
+                hashlib.blake2b(feature.encode('utf-8'), digest_size=8, salt=self._salt).digest(), 'little'
+            )
+            bucket = (value % self.dim, 1.0 if value >> 63 else -1.0)
+            if len(self._buckets) < 500000:
+                self._buckets[feature] = bucket
+        return bucket
+
+    def _features(self, text: str) -> Counter:
+        tokens = tokenize(text)
+        words = [token for token, _ in tokens if token not in STOPWORDS]
+        features = Counter(('token', word) for word in words)
+        features.update(('pair', f"{first} {second}") for first, second in zip(words, words[1:]))
+        features.update(('skill', skill) for skill, _ in get_taxonomy().skill_index.find(tokens))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            columns = np.empty(len(features), dtype=np.int64)
+            values = np.empty(len(features), dtype=np.float32)
+            for i, ((kind, feature), count) in enumerate(features.items()):
+                column, sign = self._bucket(f"{kind}:{feature}")
+                columns[i] = column
+                values[i] = sign * self.FEATURE_WEIGHTS[kind] * (1.0 + math.log(count))
+            np.add.at(vectors[row], columns, values)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SentenceEmbedder:
+    """Small sentence-transformers model run on the CPU (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(list(texts), batch_size=64, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """The configured sentence model, or hashed embeddings when none is set or it cannot be loaded."""
+    if model_name:
+        try:
+            return SentenceEmbedder(model_name)
+        except (ImportError, OSError) as e:
+            print(f"[ERROR] Embedding model {model_name!r} unavailable, using hashed embeddings: {str(e)}")
+    return HashedEmbedder()
+
+
+def posting_text(job: dict) -> str:
+    return f"{job.get('job_title', '') or ''}\n{job.get('job_description', '') or ''}"
+
+
+def resume_sections(resume_data: dict) -> Dict[str, str]:
+    """Text of each non-empty resume section in RESUME_SECTION_WEIGHTS."""
+    resume_data = resume_data or {}
+    experience = resume_data.get('professional_experience', []) or []
+    projects = resume_data.get('projects', []) or []
+    sections = {
+        'skills': " ".join(list(resume_data.get('skills', []) or []) +
+                           list(resume_data.get('certifications', []) or [])),
+        'experience': "\n".join(
+            " ".join([exp.get('role', '') or ''] + list(exp.get('achievements', []) or []))
+            for exp in experience if isinstance(exp, dict)
+        ),
+        'projects': "\n".join(
+            " ".join([project.get('title', '') or '', project.get('description', '') or '']
+                     + list(project.get('technologies', []) or []))
+            for project in projects if isinstance(project, dict)
+        ),
+        'education': "\n".join(
+            edu.get('degree', '') or '' for edu in resume_data.get('education', []) or [] if isinstance(edu, dict)
+        )
+    }
+    return {name: text for name, text in sections.items() if text.strip()}
+
+
+def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantisation: vectors ~= codes * scales[:, None]."""
+    max_abs = np.abs(vectors).max(axis=1)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+class EmbeddingIndex:
+    """
+    Posting embeddings keyed by content hash.
+
+    - <prefix>.vectors.npy: memory-mapped int8 matrix, one row per posting (capacity doubles on growth)
+    - <prefix>.scales.npy: memory-mapped float32 dequantisation scale per row
+    - <prefix>.db: content key -> row, plus the embedder name (a different embedder resets the index)
+    A posting is embedded once; later searches only read its row.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_EMBEDDING_PATH, embedder=None, initial_capacity: int = 1024):
+        self.embedder = embedder or get_embedder()
+        self.dim = self.embedder.dim
+        self.path = path or None
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+
+        self._conn = None
+        if self.path:
+            self._conn = sqlite3.connect(f"{self.path}.db", check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (content_key TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+            )
+            stored = self._conn.execute("SELECT value FROM meta WHERE name = 'embedder'").fetchone()
+            if stored and stored[0] != self.embedder.name:
+                print(f"[DEBUG] Embedder changed ({stored[0]} -> {self.embedder.name}), resetting embedding index")
+                self._conn.execute("DELETE FROM embeddings")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('embedder', ?)",
+                               (self.embedder.name,))
+            self._conn.commit()
+            self._rows = dict(self._conn.execute("SELECT content_key, row FROM embeddings"))
+
+        self._count = max(self._rows.values(), default=-1) + 1
+        self._vectors, self._scales = self._open(max(initial_capacity, self._count))
+
+    def _open(self, capacity: int, previous: Tuple[np.ndarray, np.ndarray] = None):
+        """Matrices with room for capacity rows, keeping the first self._count rows of previous (or of disk)."""
+        if not self.path:
+            vectors = np.zeros((capacity, self.dim), dtype=np.int8)
+            scales = np.ones(capacity, dtype=np.float32)
+            if previous is not None:
+                vectors[:self._count] = previous[0][:self._count]
+                scales[:self._count] = previous[1][:self._count]
+            return vectors, scales
+
+        vectors_path, scales_path = f"{self.path}.vectors.npy", f"{self.path}.scales.npy"
+        if previous is None and os.path.exists(vectors_path) and os.path.exists(scales_path):
+            vectors = np.load(vectors_path, mmap_mode='r+')
+            scales = np.load(scales_path, mmap_mode='r+')
+            if vectors.shape[1] == self.dim and len(vectors) >= capacity and len(scales) == len(vectors):
+                return vectors, scales
+            previous = (np.array(vectors[:self._count]), np.array(scales[:self._count]))
+            if len(previous[0]) < self._count or vectors.shape[1] != self.dim:
+                # Files do not match the row map (dimension change or partial write): start over
+                previous = None
+                self._rows.clear()
+                self._count = 0
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+            del vectors, scales
+
+        new_vectors = np.lib.format.open_memmap(f"{vectors_path}.tmp", mode='w+', dtype=np.int8,
+                                                shape=(capacity, self.dim))
+        new_scales = np.lib.format.open_memmap(f"{scales_path}.tmp", mode='w+', dtype=np.float32,
+                                               shape=(capacity,))
+        if previous is not None:
+            new_vectors[:self._count] = previous[0][:self._count]
+            new_scales[:self._count] = previous[1][:self._count]
+        new_vectors.flush()
+        new_scales.flush()
+        del new_vectors, new_scales
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{scales_path}.tmp", scales_path)
+        return np.load(vectors_path, mmap_mode='r+'), np.load(scales_path, mmap_mode='r+')
+
+    def add(self, jobs: List[dict]) -> np.ndarray:
+        """Embed postings not seen before; return the row of every posting, in order."""
+        keys = [make_content_key(self.embedder.name, job.get('job_title', ''), job.get('job_description', ''))
+                for job in jobs]
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._rows))
+            if missing:
+                missing_set = set(missing)
+                texts = {key: posting_text(job) for key, job in zip(keys, jobs) if key in missing_set}
+                needed = self._count + len(missing)
+                if needed > len(self._vectors):
+                    self._vectors, self._scales = self._open(max(needed, 2 * len(self._vectors)),
+                                                             (self._vectors, self._scales))
+                new_rows = []
+                for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                    batch = missing[start:start + EMBED_BATCH_SIZE]
+                    codes, scales = _quantize(self.embedder.embed([texts[key] for key in batch]))
+                    first = self._count
+                    self._vectors[first:first + len(batch)] = codes
+                    self._scales[first:first + len(batch)] = scales
+                    for offset, key in enumerate(batch):
+                        self._rows[key] = first + offset
+                        new_rows.append((key, first + offset))
+                    self._count += len(batch)
+
+                if self._conn is not None:
+                    # Vectors reach the file before the row map references them
+                    self._vectors.flush()
+                    self._scales.flush()
+                    try:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO embeddings (content_key, row) VALUES (?, ?)", new_rows
+                        )
+                        self._conn.commit()
+                    except sqlite3.Error as e:
+                        print(f"[ERROR] Failed to persist embeddings: {str(e)}")
+            return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def similarities(self, query_vectors: np.ndarray, weights: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Weighted cosine of each row against the query vectors, computed in batched matmuls."""
+        query = query_vectors.astype(np.float32).T
+        weights = np.asarray(weights, dtype=np.float32)
+        scores = np.empty(len(rows), dtype=np.float32)
+        with self._lock:
+            for start in range(0, len(rows), SEARCH_BATCH_ROWS):
+                batch = rows[start:start + SEARCH_BATCH_ROWS]
+                block = self._vectors[batch].astype(np.float32)
+                scores[start:start + len(batch)] = (block @ query) @ weights * self._scales[batch]
+        return scores
+
+    def embed_resume(self, resume_data: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """One vector per non-empty resume section, with normalised section weights."""
+        sections = resume_sections(resume_data)
+        if not sections:
+            return np.zeros((0, self.dim), dtype=np.float32), np.zeros(0, dtype=np.float32)
+        weights = np.array([RESUME_SECTION_WEIGHTS[name] for name in sections], dtype=np.float32)
+        return self.embedder.embed(list(sections.values())), weights / weights.sum()
+
+    def stored_rows(self, jobs: List[dict]) -> np.ndarray:
+        """Row of each posting that already has an embedding, -1 for the others (nothing is embedded)."""
+        keys = [make_content_key(self.embedder.name, job.get('job_title', ''), job.get('job_description', ''))
+                for job in jobs]
+        with self._lock:
+            return np.fromiter((self._rows.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+    def top_candidates(self, jobs: List[dict], resume_data: dict, limit: int) -> List[int]:
+        """
+        Indices to rule-score, in their original order: every posting without a stored
+        embedding, plus the limit stored postings most similar to the resume. Postings are
+        never embedded here (cold embedding costs more than the scoring it would save).
+        """
+        rows = self.stored_rows(jobs)
+        stored = np.flatnonzero(rows >= 0)
+        if len(stored) <= limit:
+            return list(range(len(jobs)))
+        query_vectors, weights = self.embed_resume(resume_data)
+        if not len(query_vectors):
+            return list(range(len(jobs)))
+        scores = self.similarities(query_vectors, weights, rows[stored])
+        kept = stored[np.argpartition(-scores, limit - 1)[:limit]]
+        return sorted(np.flatnonzero(rows < 0).tolist() + kept.tolist())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'embedder': self.embedder.name, 'dim': self.dim, 'postings': self._count,
+                    'capacity': len(self._vectors), 'persistent': self._conn is not None}
+
+
+_index_instance = None
+_index_lock = threading.Lock()
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """Process-wide embedding index."""
+    global _index_instance
+    with _index_lock:
+        if _index_instance is None:
+            _index_instance = EmbeddingIndex()
+        return _index_instance
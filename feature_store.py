@@ -0,0 +1,218 @@
+"""
+Job Feature Store
+Compact per-posting requirement features (skill IDs, levels, remote flag) persisted in SQLite and keyed by posting
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from posting_index import posting_key
+from requirements_cache import make_content_key
+from smart_matching_engine import EXPERIENCE_LEVELS, EDUCATION_LEVELS
+
+DEFAULT_FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", "job_features.db")
+
+_EXPERIENCE_NAMES = {level: name for name, level in EXPERIENCE_LEVELS.items()}
+_DEGREE_NAMES = {level: name for name, level in EDUCATION_LEVELS.items()}
+_BATCH_SIZE = 500
+
+
+class FeatureStore:
+    """
+    One row of parsed requirements per posting (keyed by posting_key), so a posting's
+    description is parsed once and its features outlive the session that scraped it.
+
+    - required_ids / preferred_ids: uint16 skill columns (engine.skill_columns)
+    - experience_level / degree_level: EXPERIENCE_LEVELS / EDUCATION_LEVELS codes
+    - content_hash: make_content_key of the parsed text; taxonomy_version: the parser
+    A row is reused while the posting text and taxonomy are unchanged, or whenever the
+    caller only has the posting's identity (saved internships without a description).
+    """
+
+    def __init__(self, path: str = DEFAULT_FEATURE_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_features (
+                posting_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                taxonomy_version TEXT NOT NULL,
+                required_ids BLOB NOT NULL,
+                preferred_ids BLOB NOT NULL,
+                min_years_experience INTEGER NOT NULL,
+                experience_level INTEGER NOT NULL,
+                education_required INTEGER NOT NULL,
+                degree_level INTEGER NOT NULL,
+                is_remote INTEGER NOT NULL,
+                technical_categories TEXT NOT NULL,
+                company_size_indicator TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+        self._skill_names = {}   # taxonomy_version -> skill name per column
+
+    def _names(self, engine) -> List[str]:
+        names = self._skill_names.get(engine.taxonomy_version)
+        if names is None:
+            names = [None] * len(engine.skill_columns)
+            for skill, column in engine.skill_columns.items():
+                names[column] = skill
+            self._skill_names[engine.taxonomy_version] = names
+        return names
+
+    @staticmethod
+    def _skill_ids(engine, skills) -> bytes:
+        columns = engine.skill_columns
+        return np.array(sorted(columns[skill] for skill in skills if skill in columns), dtype=np.uint16).tobytes()
+
+    def _encode(self, engine, key: str, content_hash: str, requirements: dict, now: float) -> tuple:
+        return (
+            key, content_hash, engine.taxonomy_version,
+            self._skill_ids(engine, requirements['required_skills']),
+            self._skill_ids(engine, requirements['preferred_skills']),
+            int(requirements['min_years_experience']),
+            EXPERIENCE_LEVELS.get(requirements['experience_level'], 0),
+            int(bool(requirements['education_required'])),
+            EDUCATION_LEVELS.get(requirements['degree_level'], 1),
+            int(bool(requirements['is_remote'])),
+            ",".join(sorted(requirements['technical_categories'])),
+            requirements['company_size_indicator'],
+            now
+        )
+
+    def _decode(self, engine, row: tuple) -> dict:
+        (required_ids, preferred_ids, min_years, experience_level, education_required,
+         degree_level, is_remote, categories, company_size) = row
+        names = self._names(engine)
+        return {
+            'required_skills': {names[i] for i in np.frombuffer(required_ids, dtype=np.uint16)},
+            'preferred_skills': {names[i] for i in np.frombuffer(preferred_ids, dtype=np.uint16)},
+            'min_years_experience': min_years,
+            'education_required': bool(education_required),
+            'degree_level': _DEGREE_NAMES.get(degree_level, 'bachelor'),
+            'experience_level': _EXPERIENCE_NAMES.get(experience_level, 'entry_level'),
+            'technical_categories': set(categories.split(",")) if categories else set(),
+            'is_remote': bool(is_remote),
+            'company_size_indicator': company_size
+        }
+
+    def _rows(self, keys: List[str]) -> Dict[str, tuple]:
+        rows = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), _BATCH_SIZE):
+            chunk = unique_keys[start:start + _BATCH_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn.execute(
+                    f"""SELECT posting_key, content_hash, taxonomy_version, required_ids, preferred_ids,
+                               min_years_experience, experience_level, education_required, degree_level,
+                               is_remote, technical_categories, company_size_indicator
+                        FROM job_features WHERE posting_key IN ({placeholders})""", chunk):
+                rows[row[0]] = row[1:]
+        return rows
+
+    def lookup(self, engine, jobs: List[dict]) -> List[Optional[dict]]:
+        """
+        Stored requirements for each job, in order, or None where the posting has no
+        current row and must be parsed (then passed to store()).
+        """
+        keys = [posting_key(job) for job in jobs]
+        with self._lock:
+            rows = self._rows(keys)
+
+        results = []
+        for job, key in zip(jobs, keys):
+            row = rows.get(key)
+            description = job.get('job_description') or ''
+            if row is not None and row[1] == engine.taxonomy_version and (
+                    not description or row[0] == make_content_key(engine.taxonomy_version, job.get('job_title') or '', description)):
+                results.append(self._decode(engine, row[2:]))
+            else:
+                results.append(None)
+
+        misses = results.count(None)
+        with self._lock:
+            self._stats['hits'] += len(jobs) - misses
+            self._stats['misses'] += misses
+        return results
+
+    def store(self, engine, jobs: List[dict], requirements_list: List[dict]):
+        """
+        Persist freshly parsed requirements in one transaction. A parse without a
+        description (title only) never replaces an existing row.
+        """
+        now = time.time()
+        replace, insert = {}, {}
+        for job, requirements in zip(jobs, requirements_list):
+            key = posting_key(job)
+            description = job.get('job_description') or ''
+            content_hash = make_content_key(engine.taxonomy_version, job.get('job_title') or '', description)
+            (replace if description else insert)[key] = self._encode(engine, key, content_hash, requirements, now)
+        if not replace and not insert:
+            return
+
+        with self._lock:
+            try:
+                for verb, rows in (("INSERT OR REPLACE", replace), ("INSERT OR IGNORE", insert)):
+                    if rows:
+                        self._conn.executemany(
+                            f"{verb} INTO job_features VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            list(rows.values())
+                        )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                print(f"[ERROR] Failed to store job features: {str(e)}")
+
+    def requirements_for(self, engine, jobs: List[dict]) -> List[dict]:
+        """
+        extract_job_requirements output for each job, in order: stored features where
+        they are current, otherwise parsed now and stored.
+        """
+        results = self.lookup(engine, jobs)
+        missing = [i for i, requirements in enumerate(results) if requirements is None]
+        for i in missing:
+            results[i] = engine.extract_job_requirements(
+                job_description=jobs[i].get('job_description') or '', job_title=jobs[i].get('job_title') or ''
+            )
+        self.store(engine, [jobs[i] for i in missing], [results[i] for i in missing])
+        return results
+
+    def skill_demand(self, engine, jobs: List[dict], top_n: int = 15) -> List[tuple]:
+        """Most required skills across the jobs' stored features (no parsing): [(skill, job count), ...]."""
+        with self._lock:
+            rows = self._rows([posting_key(job) for job in jobs])
+        counts = np.zeros(len(engine.skill_columns), dtype=np.int64)
+        for row in rows.values():
+            if row[1] == engine.taxonomy_version:
+                counts[np.frombuffer(row[2], dtype=np.uint16)] += 1
+        names = self._names(engine)
+        top = Counter({names[i]: int(counts[i]) for i in np.flatnonzero(counts)})
+        return top.most_common(top_n)
+
+    def stats(self) -> dict:
+        with self._lock:
+            (rows,) = self._conn.execute("SELECT COUNT(*) FROM job_features").fetchone()
+            return {**self._stats, 'rows': rows}
+
+
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    """Process-wide job feature store."""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = FeatureStore()
+        return _store_instance
@@ -0,0 +1,296 @@
+"""
+Write-Behind Ingestion Queue
+Durable SQLite outbox between the scrapers and Supabase, drained by a background flusher
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from posting_index import canonical_job_id, get_posting_index
+
+DEFAULT_OUTBOX_PATH = os.getenv("INGESTION_OUTBOX_PATH", "ingestion_outbox.db")
+
+# Who enqueued a posting; flush listeners are registered per (user, source)
+SOURCE_INTERACTIVE = 'interactive'
+SOURCE_CONTINUOUS = 'continuous'
+
+
+def make_idempotency_key(user_id: str, job: dict) -> str:
+    """Stable key for a scraped posting: its canonical_job_id (tracking parameters ignored)."""
+    return hashlib.sha1(f"{user_id}|{canonical_job_id(job)}".encode('utf-8')).hexdigest()
+
+
+class IngestionQueue:
+    """
+    Scrapers append postings to a local SQLite outbox; a flusher batch-inserts them into
+    Supabase with SupabaseDB.add_internships_bulk.
+
+    - Idempotency: each row is keyed by make_idempotency_key, so re-enqueueing a pending
+      posting is a no-op and the bulk insert's duplicate check covers re-delivery.
+    - Retry: failed batches stay in the outbox with exponential backoff.
+    - Backpressure: enqueue waits (up to enqueue_timeout) while the outbox holds max_depth rows.
+    - Search corpus: enqueued postings are also added to the local posting index, if one is given.
+    - Listeners: each row records its source, and a flush only calls the listener
+      registered for that user and source (continuous scraping notifies, interactive saves do not).
+    """
+
+    def __init__(self, db=None, path: str = DEFAULT_OUTBOX_PATH, batch_size: int = 200,
+                 flush_interval: float = 5.0, max_depth: int = 10000, enqueue_timeout: float = 30.0,
+                 base_backoff: float = 2.0, max_backoff: float = 300.0, posting_index=None):
+        self.db = db
+        self.posting_index = posting_index
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_depth = max_depth
+        self.enqueue_timeout = enqueue_timeout
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS outbox (
+                idempotency_key TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT 'interactive',
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if 'source' not in columns:
+            self._conn.execute(f"ALTER TABLE outbox ADD COLUMN source TEXT NOT NULL DEFAULT '{SOURCE_INTERACTIVE}'")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt_at, enqueued_at)")
+
+        self._lock = threading.Lock()          # guards the SQLite connection and _metrics
+        self._flush_lock = threading.Lock()    # only one flush at a time
+        self._space_available = threading.Condition()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners: Dict[Tuple[str, str], Callable[[str, List[dict]], None]] = {}
+
+        self._metrics = {
+            'enqueued_total': 0,
+            'inserted_total': 0,
+            'duplicates_total': 0,
+            'failed_batches_total': 0,
+            'flushes_total': 0,
+            'last_flush_latency_ms': 0.0,
+            'avg_flush_latency_ms': 0.0,
+        }
+
+    def _get_db(self):
+        if self.db is None:
+            from supabase_db import SupabaseDB
+            self.db = SupabaseDB()
+        return self.db
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- Producer side ---
+
+    def depth(self) -> int:
+        """Number of postings waiting to be written."""
+        return self._execute("SELECT COUNT(*) FROM outbox")[0][0]
+
+    def enqueue(self, user_id: str, jobs: List[dict], source: str = SOURCE_INTERACTIVE,
+                timeout: Optional[float] = None) -> dict:
+        """
+        Append scraped postings to the outbox. While the outbox is full this waits up to
+        timeout seconds (default enqueue_timeout; 0 returns the backpressure error at once).
+        """
+        deadline = time.monotonic() + (self.enqueue_timeout if timeout is None else timeout)
+        with self._space_available:
+            while self.depth() >= self.max_depth:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {'error': 'backpressure', 'message': f'Ingestion outbox is full ({self.max_depth} pending rows)'}
+                self._wakeup.set()
+                self._space_available.wait(timeout=remaining)
+
+        now = time.time()
+        rows = [
+            (make_idempotency_key(user_id, job), user_id, source, json.dumps(job, default=str), now, now)
+            for job in jobs if isinstance(job, dict)
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, user_id, source, payload, enqueued_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            queued = self._conn.total_changes - before
+            self._metrics['enqueued_total'] += queued
+
+        if self.posting_index is not None:
+            try:
+                self.posting_index.add_postings(jobs)
+            except Exception as e:
+                print(f"[ERROR] Failed to update posting index: {str(e)}")
+
+        if self.depth() >= self.batch_size:
+            self._wakeup.set()
+        return {'queued': queued, 'depth': self.depth()}
+
+    def add_flush_listener(self, user_id: str, callback: Callable[[str, List[dict]], None],
+                           source: str = SOURCE_CONTINUOUS):
+        """Call callback(user_id, inserted_rows) after postings this user enqueued from source are written."""
+        self._listeners[(user_id, source)] = callback
+
+    def remove_flush_listener(self, user_id: str, source: str = SOURCE_CONTINUOUS):
+        self._listeners.pop((user_id, source), None)
+
+    # --- Flusher side ---
+
+    def flush(self, user_id: Optional[str] = None, max_rows: Optional[int] = None) -> dict:
+        """Write due outbox rows to Supabase, one bulk insert per user. Returns per-flush counts."""
+        summary = {'inserted': 0, 'duplicates': 0, 'failed': 0, 'inserted_rows': []}
+        with self._flush_lock:
+            sql = "SELECT idempotency_key, user_id, source, payload, attempts FROM outbox WHERE next_attempt_at <= ?"
+            params = [time.time()]
+            if user_id is not None:
+                sql += " AND user_id = ?"
+                params.append(user_id)
+            sql += " ORDER BY enqueued_at LIMIT ?"
+            params.append(max_rows or self.batch_size)
+            due = self._execute(sql, params)
+            if not due:
+                return summary
+
+            by_user: Dict[Tuple[str, str], list] = {}
+            for key, uid, source, payload, attempts in due:
+                by_user.setdefault((uid, source), []).append((key, json.loads(payload), attempts))
+
+            for (uid, source), items in by_user.items():
+                keys = [key for key, _, _ in items]
+                started = time.perf_counter()
+                try:
+                    result = self._get_db().add_internships_bulk(uid, [job for _, job, _ in items])
+                except Exception as e:
+                    result = {'error': str(e)}
+                self._record_latency((time.perf_counter() - started) * 1000)
+
+                if result.get('error'):
+                    self._schedule_retry(items, result['error'])
+                    with self._lock:
+                        self._metrics['failed_batches_total'] += 1
+                    summary['failed'] += len(items)
+                    continue
+
+                self._delete(keys)
+                inserted = result.get('inserted', [])
+                with self._lock:
+                    self._metrics['inserted_total'] += len(inserted)
+                    self._metrics['duplicates_total'] += result.get('duplicate_count', 0)
+                summary['inserted'] += len(inserted)
+                summary['duplicates'] += result.get('duplicate_count', 0)
+                summary['inserted_rows'].extend(inserted)
+
+                listener = self._listeners.get((uid, source))
+                if listener and inserted:
+                    try:
+                        listener(uid, inserted)
+                    except Exception as e:
+                        print(f"[ERROR] Ingestion flush listener failed for user {uid}: {e}")
+
+        with self._space_available:
+            self._space_available.notify_all()
+        return summary
+
+    def flush_all(self, user_id: Optional[str] = None) -> dict:
+        """Flush repeatedly until no due rows remain (or a batch fails)."""
+        total = {'inserted': 0, 'duplicates': 0, 'failed': 0, 'inserted_rows': []}
+        while True:
+            result = self.flush(user_id=user_id)
+            for key in ('inserted', 'duplicates', 'failed'):
+                total[key] += result[key]
+            total['inserted_rows'].extend(result['inserted_rows'])
+            if result['failed'] or not (result['inserted'] or result['duplicates']):
+                return total
+
+    def _delete(self, keys: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE idempotency_key = ?", [(key,) for key in keys])
+
+    def _schedule_retry(self, items, error: str):
+        now = time.time()
+        updates = [
+            (attempts + 1, now + min(self.max_backoff, self.base_backoff * (2 ** attempts)), error[:500], key)
+            for key, _, attempts in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE idempotency_key = ?",
+                updates
+            )
+        print(f"[ERROR] Ingestion flush failed for {len(items)} rows, will retry: {error}")
+
+    def _record_latency(self, latency_ms: float):
+        with self._lock:
+            flushes = self._metrics['flushes_total'] + 1
+            self._metrics['flushes_total'] = flushes
+            self._metrics['last_flush_latency_ms'] = round(latency_ms, 1)
+            previous_avg = self._metrics['avg_flush_latency_ms']
+            self._metrics['avg_flush_latency_ms'] = round(previous_avg + (latency_ms - previous_avg) / flushes, 1)
+
+    def metrics(self) -> dict:
+        """Queue depth, ingestion lag and flush latency counters."""
+        with self._lock:
+            depth, oldest = self._conn.execute("SELECT COUNT(*), MIN(enqueued_at) FROM outbox").fetchone()
+            metrics = dict(self._metrics)
+        return {
+            **metrics,
+            'queue_depth': depth,
+            'oldest_pending_age_s': round(time.time() - oldest, 1) if oldest else 0.0,
+        }
+
+    # --- Background flusher ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush_all()
+            except Exception as e:
+                print(f"[ERROR] Ingestion flusher error: {e}")
+
+    def start(self):
+        """Start the background flusher thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+
+_queue_instance = None
+_queue_lock = threading.Lock()
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Process-wide ingestion queue with its flusher already running."""
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            _queue_instance = IngestionQueue(posting_index=get_posting_index())
+            _queue_instance.start()
+        return _queue_instance
@@ -0,0 +1,263 @@
+"""
+Smart Search Result Records
+Slotted records for scored jobs, plus a streaming top-K ranker with secondary indexes for filter/sort
+"""
+
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from posting_index import canonical_job_id
+
+
+@dataclass(slots=True, frozen=True)
+class ResumeProfile:
+    """Resume analysis shared by every result of one search."""
+    analysis: dict
+    skills: frozenset
+
+    @classmethod
+    def from_analysis(cls, resume_analysis: dict) -> 'ResumeProfile':
+        skills = resume_analysis['skills'] | resume_analysis.get('normalized_skills', set())
+        return cls(analysis=resume_analysis, skills=frozenset(skills))
+
+
+@dataclass(slots=True)
+class ScoredJob:
+    """
+    One Smart Search result: the scraped posting (referenced, not copied), its parsed
+    requirements, the shared ResumeProfile and the flat scores from score_many.
+    Skill gaps and the full compatibility/acceptance breakdown are computed only when
+    a result is actually displayed.
+    """
+    job: dict
+    requirements: dict
+    resume: ResumeProfile
+    technical_score: float
+    experience_score: float
+    education_score: float
+    compatibility: float
+    acceptance_probability: float
+    recommendation_priority: float
+    match_category: str
+    competition_level: str = 'medium'
+
+    @property
+    def job_title(self) -> str:
+        return self.job.get('job_title') or ''
+
+    @property
+    def company_name(self) -> str:
+        return self.job.get('company_name') or ''
+
+    @property
+    def application_link(self) -> str:
+        return self.job.get('application_link') or ''
+
+    @property
+    def job_description(self) -> str:
+        return self.job.get('job_description') or ''
+
+    @property
+    def result_id(self) -> str:
+        """Stable ID of the posting, used to select results for saving."""
+        return canonical_job_id(self.job)
+
+    @property
+    def matched_queries(self) -> list:
+        """Search queries that returned this posting (one posting may match several)."""
+        contexts = self.job.get('search_contexts') or [self.job.get('search_context') or {}]
+        return [context['query'] for context in contexts if context.get('query')]
+
+    def matching_skills(self) -> list:
+        """Resume skills the job asks for: required ones first, then preferred."""
+        return (sorted(self.resume.skills & self.requirements['required_skills']) +
+                sorted(self.resume.skills & self.requirements['preferred_skills']))
+
+    def missing_required_skills(self) -> list:
+        return sorted(self.requirements['required_skills'] - self.resume.skills)
+
+    def explain(self, engine) -> dict:
+        """Full compatibility breakdown and acceptance analysis (formatted strings, suggestions)."""
+        compatibility_scores = engine.build_compatibility_scores(
+            self.resume.analysis, self.requirements,
+            self.technical_score, self.experience_score, self.education_score
+        )
+        acceptance_analysis = engine.calculate_acceptance_probability(
+            compatibility_scores,
+            {'competition_level': self.competition_level, 'application_timing': 'normal'}
+        )
+        return {'compatibility_scores': compatibility_scores, 'acceptance_analysis': acceptance_analysis}
+
+
+@dataclass(slots=True)
+class ScoredCorpus:
+    """
+    Every posting one search scored, aligned row for row (not only the top_k records a
+    ResultRanker retains), so the whole search can be re-scored after a resume change.
+    It lives in session state, so only the job list and compact score rows are kept:
+    requirements (from the feature store) and encoded (encode_jobs) are rebuilt on
+    re-score unless the caller already has them.
+    """
+    jobs: list
+    competition_levels: list
+    scores: object
+    resume: ResumeProfile
+    requirements: list = None
+    encoded: dict = None
+
+
+# Sort options offered by the Smart Search view -> (key, descending)
+SORT_KEYS = {
+    "Recommendation Priority": (lambda job: job.recommendation_priority, True),
+    "Compatibility Score": (lambda job: job.compatibility, True),
+    "Acceptance Probability": (lambda job: job.acceptance_probability, True),
+    "Company Name": (lambda job: job.company_name.lower(), False)
+}
+
+ALL_MATCHES = "All Matches"
+COMPATIBILITY_BUCKET = 5
+# Filter/sort combinations memoised per ranker (the ranker lives in session state)
+QUERY_MEMO_SIZE = 8
+
+
+class ResultRanker:
+    """
+    Streaming top-K ranker for scored jobs.
+
+    add() keeps a bounded min-heap on recommendation priority, so only the best top_k
+    records are retained however many jobs are scored, while summary counters cover
+    every job seen. Once ranking is requested the retained records get secondary
+    indexes (per match category, per compatibility bucket, per company and one
+    presorted order per sort option), and each filter/sort combination is answered
+    from those indexes; the last QUERY_MEMO_SIZE combinations are memoised, so
+    Streamlit reruns do not re-sort the list.
+    """
+
+    def __init__(self, top_k: int = None):
+        self.top_k = top_k
+        self._heap = []
+        self._sequence = 0
+        self._counts = {'High Match': 0, 'Medium Match': 0, 'Low Match': 0}
+        self._seen = 0
+        self._compatibility_sum = 0.0
+        self._acceptance_sum = 0.0
+        # ScoredCorpus of everything add() saw, when the scorer keeps one (for re-scoring)
+        self.corpus = None
+        self._reset_indexes()
+
+    @classmethod
+    def from_records(cls, records, top_k: int = None) -> 'ResultRanker':
+        ranker = cls(top_k)
+        for record in records:
+            ranker.add(record)
+        return ranker
+
+    def _reset_indexes(self):
+        self._ranked = None
+        self._orders = {}
+        self._by_category = None
+        self._by_bucket = None
+        self._by_company = None
+        self._queries = OrderedDict()
+
+    def add(self, record: ScoredJob):
+        self._seen += 1
+        self._counts[record.match_category] = self._counts.get(record.match_category, 0) + 1
+        self._compatibility_sum += record.compatibility
+        self._acceptance_sum += record.acceptance_probability
+
+        # Ties keep arrival order: the earlier record ranks higher
+        entry = (record.recommendation_priority, -self._sequence, record)
+        self._sequence += 1
+        if self.top_k is None or len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return
+        self._reset_indexes()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def ranked(self) -> list:
+        """Retained records, highest recommendation priority first."""
+        if self._ranked is None:
+            self._ranked = [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+        return self._ranked
+
+    def _build_indexes(self):
+        ranked = self.ranked()
+        self._by_category, self._by_bucket, self._by_company = {}, {}, {}
+        for record in ranked:
+            self._by_category.setdefault(record.match_category, []).append(record)
+            self._by_bucket.setdefault(int(record.compatibility // COMPATIBILITY_BUCKET), []).append(record)
+            self._by_company.setdefault(record.company_name.lower(), []).append(record)
+
+    def _order(self, sort_option: str) -> list:
+        if sort_option not in self._orders:
+            key, descending = SORT_KEYS.get(sort_option, SORT_KEYS["Recommendation Priority"])
+            self._orders[sort_option] = sorted(self.ranked(), key=key, reverse=descending)
+        return self._orders[sort_option]
+
+    def by_category(self, match_category: str) -> list:
+        if self._by_category is None:
+            self._build_indexes()
+        return self._by_category.get(match_category, [])
+
+    def by_company(self, company_name: str) -> list:
+        if self._by_company is None:
+            self._build_indexes()
+        return self._by_company.get((company_name or '').lower(), [])
+
+    def _at_least(self, min_compatibility: float) -> set:
+        """ids of retained records with compatibility >= min_compatibility, from whole buckets plus one edge bucket."""
+        if self._by_bucket is None:
+            self._build_indexes()
+        edge = int(min_compatibility // COMPATIBILITY_BUCKET)
+        selected = {id(record) for bucket, records in self._by_bucket.items() if bucket > edge for record in records}
+        selected.update(id(record) for record in self._by_bucket.get(edge, []) if record.compatibility >= min_compatibility)
+        return selected
+
+    def query(self, match_filter: str = ALL_MATCHES, min_compatibility: float = 0,
+              sort_option: str = "Recommendation Priority") -> list:
+        """Retained records matching the filters, in the requested order (recent combinations memoised)."""
+        cache_key = (match_filter, min_compatibility, sort_option)
+        if cache_key in self._queries:
+            self._queries.move_to_end(cache_key)
+        else:
+            order = self._order(sort_option)
+            if match_filter == ALL_MATCHES and min_compatibility <= 0:
+                results = order
+            else:
+                allowed = self._at_least(min_compatibility)
+                if match_filter != ALL_MATCHES:
+                    allowed &= {id(record) for record in self.by_category(match_filter)}
+                results = [record for record in order if id(record) in allowed]
+            self._queries[cache_key] = results
+            if len(self._queries) > QUERY_MEMO_SIZE:
+                self._queries.popitem(last=False)
+        return self._queries[cache_key]
+
+    def summary(self, top_n: int = 5) -> dict:
+        """Counts and averages over every job added (not only the retained top-K)."""
+        if not self._seen:
+            return {
+                'total_found': 0,
+                'high_match_count': 0,
+                'medium_match_count': 0,
+                'low_match_count': 0,
+                'average_compatibility': 0,
+                'average_acceptance_probability': 0,
+                'top_recommendations': []
+            }
+        return {
+            'total_found': self._seen,
+            'high_match_count': self._counts.get('High Match', 0),
+            'medium_match_count': self._counts.get('Medium Match', 0),
+            'low_match_count': self._counts.get('Low Match', 0),
+            'average_compatibility': round(self._compatibility_sum / self._seen, 1),
+            'average_acceptance_probability': round(self._acceptance_sum / self._seen, 1),
+            'top_recommendations': self.ranked()[:top_n]
+        }
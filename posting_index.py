@@ -0,0 +1,269 @@
+"""
+Local Posting Index
+SQLite-backed BM25 inverted index over every scraped posting, updated incrementally on ingest
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from skill_matcher import tokenize
+from skill_taxonomy import get_taxonomy
+
+DEFAULT_INDEX_PATH = os.getenv("POSTING_INDEX_PATH", "posting_index.db")
+
+# Skill mentions are indexed as one extra term each ("skill:machine learning"), resolved
+# through the taxonomy aliases, so "k8s" in a posting matches "kubernetes" on a resume
+SKILL_PREFIX = "skill:"
+
+# Per-user / per-search fields that are not part of the posting itself
+TRANSIENT_FIELDS = frozenset({
+    'search_context', 'search_contexts', 'index_score', 'indexed_at',
+    'id', 'user_id', 'status', 'notified', 'notes', 'created_at'
+})
+
+# LinkedIn job ID in /jobs/view/<slug>-<id> links or a currentJobId=<id> parameter
+_LINKEDIN_JOB_ID_RE = re.compile(r"linkedin\.com/.*?(?:\bjobs/view/(?:[^/?#]*-)?|[?&]currentjobid=)(\d{6,})")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the this to we will with you your
+le la les de des du un une et en pour par sur avec dans vous nous est au aux
+""".split())
+
+
+def canonical_job_id(job: dict) -> str:
+    """
+    Stable ID of a posting across searches: the LinkedIn job ID when the link has one,
+    else the link without query string or fragment (tracking parameters differ per
+    search), else title + company.
+    """
+    link = (job.get('application_link') or '').strip().lower()
+    if link:
+        match = _LINKEDIN_JOB_ID_RE.search(link)
+        if match:
+            return f"linkedin:{match.group(1)}"
+        return "url:" + link.split('#', 1)[0].split('?', 1)[0].rstrip('/')
+    title = " ".join((job.get('job_title') or '').lower().split())
+    company = " ".join((job.get('company_name') or '').lower().split())
+    return f"title:{title}|{company}"
+
+
+def posting_key(job: dict) -> str:
+    """User-independent identity of a posting: hash of its canonical_job_id."""
+    return hashlib.sha1(canonical_job_id(job).encode('utf-8')).hexdigest()
+
+
+def build_resume_query(resume_analysis: dict, search_queries: List[dict] = None) -> Dict[str, float]:
+    """
+    Weighted query terms for a resume: its canonical skills (as skill terms) plus the
+    words of any search queries the user typed.
+    """
+    terms: Dict[str, float] = {}
+    for skill in resume_analysis.get('normalized_skills', set()):
+        terms[SKILL_PREFIX + skill] = 2.0 if skill in resume_analysis.get('programming_languages', set()) else 1.5
+    for query in search_queries or []:
+        for token, _ in tokenize(query.get('query', '')):
+            if token not in STOPWORDS:
+                terms[token] = terms.get(token, 0.0) + 1.0
+    return terms
+
+
+class PostingIndex:
+    """
+    BM25 over a persistent inverted index.
+
+    - documents: one row per posting (keyed by posting_key) with its JSON payload and length
+    - postings: (term, doc_id) -> term frequency; title terms count title_weight times
+    add_postings() indexes new postings and re-indexes changed ones in one transaction;
+    search() scores only the documents that contain a query term.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                posting_key TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_indexed_at ON documents (indexed_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        # Corpus statistics kept in memory and adjusted on every add
+        self._lengths: Dict[int, int] = dict(self._conn.execute("SELECT doc_id, length FROM documents"))
+        self._total_length = sum(self._lengths.values())
+
+    def _terms(self, job: dict) -> Counter:
+        title = job.get('job_title', '') or ''
+        description = job.get('job_description', '') or ''
+        counts = Counter(token for token, _ in tokenize(description) if token not in STOPWORDS)
+        for token, _ in tokenize(title):
+            if token not in STOPWORDS:
+                counts[token] += self.title_weight
+
+        skill_index = get_taxonomy().skill_index
+        for skill, _ in skill_index.find(tokenize(f"{title}\n{description}")):
+            counts[SKILL_PREFIX + skill] += 1
+        return counts
+
+    def add_postings(self, jobs: List[dict]) -> dict:
+        """Index new postings and re-index changed ones. Returns counts."""
+        indexed, unchanged = 0, 0
+        now = time.time()
+        with self._lock:
+            try:
+                for job in jobs:
+                    if not isinstance(job, dict) or not (job.get('job_title') or job.get('job_description')):
+                        continue
+                    job = {field: value for field, value in job.items() if field not in TRANSIENT_FIELDS}
+                    payload = json.dumps(job, default=str, sort_keys=True)
+                    content_hash = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+                    key = posting_key(job)
+
+                    existing = self._conn.execute(
+                        "SELECT doc_id, content_hash FROM documents WHERE posting_key = ?", (key,)
+                    ).fetchone()
+                    if existing and existing[1] == content_hash:
+                        unchanged += 1
+                        continue
+
+                    terms = self._terms(job)
+                    length = sum(terms.values())
+                    if existing:
+                        doc_id = existing[0]
+                        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                        self._conn.execute(
+                            "UPDATE documents SET content_hash = ?, payload = ?, length = ?, indexed_at = ? WHERE doc_id = ?",
+                            (content_hash, payload, length, now, doc_id)
+                        )
+                        self._total_length -= self._lengths.get(doc_id, 0)
+                    else:
+                        doc_id = self._conn.execute(
+                            "INSERT INTO documents (posting_key, content_hash, payload, length, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                            (key, content_hash, payload, length, now)
+                        ).lastrowid
+                    self._conn.executemany(
+                        "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                        [(term, doc_id, tf) for term, tf in terms.items()]
+                    )
+                    self._lengths[doc_id] = length
+                    self._total_length += length
+                    indexed += 1
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                self._lengths = dict(self._conn.execute("SELECT doc_id, length FROM documents"))
+                self._total_length = sum(self._lengths.values())
+                print(f"[ERROR] Failed to index postings: {str(e)}")
+                return {'error': str(e)}
+
+        if indexed:
+            print(f"[DEBUG] Posting index: {indexed} indexed, {unchanged} unchanged ({len(self._lengths)} total)")
+        return {'success': True, 'indexed': indexed, 'unchanged': unchanged}
+
+    def search(self, query_terms: Dict[str, float], limit: int = 50, max_age_days: Optional[float] = None,
+               indexed_after: Optional[float] = None) -> List[dict]:
+        """
+        Top postings for a weighted query, best first. Each result is the stored posting
+        plus 'index_score' and 'indexed_at'. max_age_days / indexed_after (a timestamp)
+        restrict the search to recently (re-)indexed postings.
+        """
+        if not query_terms or not self._lengths:
+            return []
+
+        cutoff = max(time.time() - max_age_days * 86400 if max_age_days else 0, indexed_after or 0) or None
+        with self._lock:
+            allowed = None
+            if cutoff:
+                allowed = {doc_id for (doc_id,) in self._conn.execute(
+                    "SELECT doc_id FROM documents WHERE indexed_at >= ?", (cutoff,))}
+                if not allowed:
+                    return []
+
+            document_count = len(self._lengths)
+            average_length = self._total_length / document_count
+            scores: Dict[int, float] = {}
+            for term, weight in query_terms.items():
+                matches = self._conn.execute("SELECT doc_id, tf FROM postings WHERE term = ?", (term,)).fetchall()
+                if not matches:
+                    continue
+                idf = math.log(1 + (document_count - len(matches) + 0.5) / (len(matches) + 0.5))
+                for doc_id, tf in matches:
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths.get(doc_id, average_length) / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if not scores:
+                return []
+
+            results = []
+            candidates = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            rows = {}
+            for start in range(0, len(candidates), 500):
+                chunk = [doc_id for doc_id, _ in candidates[start:start + 500]]
+                placeholders = ",".join("?" * len(chunk))
+                for doc_id, payload, indexed_at in self._conn.execute(
+                        f"SELECT doc_id, payload, indexed_at FROM documents WHERE doc_id IN ({placeholders})", chunk):
+                    rows[doc_id] = (payload, indexed_at)
+
+        for doc_id, score in candidates:
+            payload, indexed_at = rows.get(doc_id, (None, 0))
+            if payload is None:
+                continue
+            job = json.loads(payload)
+            job['index_score'] = round(score, 3)
+            job['indexed_at'] = indexed_at
+            results.append(job)
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            document_count = len(self._lengths)
+            return {
+                'documents': document_count,
+                'average_length': round(self._total_length / document_count, 1) if document_count else 0,
+            }
+
+
+_index_instance = None
+_index_lock = threading.Lock()
+
+
+def get_posting_index() -> PostingIndex:
+    """Process-wide posting index."""
+    global _index_instance
+    with _index_lock:
+        if _index_instance is None:
+            _index_instance = PostingIndex()
+        return _index_instance
@@ -1,25 +1,119 @@
 """
 RAG-Powered LinkedIn Search Module
-Uses resume context to intelligently search and filter LinkedIn opportunities
+Uses resume context to intelligently search and filter LinkedIn opportunities (headless; progress is reported through events)
 """
 
-import streamlit as st
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import json
+import os
 import re
-from smart_matching_engine import SmartMatchingEngine
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from smart_matching_engine import SmartMatchingEngine, SCORE_DTYPE, SCORING_WORKERS, PARALLEL_MIN_JOBS
+from match_results import ResumeProfile, ScoredJob, ScoredCorpus, ResultRanker
+from posting_index import get_posting_index, build_resume_query, canonical_job_id, posting_key
+from embedding_index import get_embedding_index, DEFAULT_PREFILTER_CANDIDATES
+from feature_store import get_feature_store
+from rate_limiter import get_linkedin_rate_limiter
+from search_cache import get_search_cache
 from web_scraper import scrape_linkedin
 from supabase_db import SupabaseDB
 
+# Smart Search keeps at most this many results per search (summary counts still cover all of them)
+RESULTS_TOP_K = 500
+
+# LinkedIn queries run concurrently on this many threads (1 = one after another);
+# the shared rate limiter paces the actual requests
+SEARCH_WORKERS = int(os.getenv("SMART_SEARCH_WORKERS", "5"))
+
+# Search sources: the local posting index only, or the index plus fresh LinkedIn results
+SOURCE_LOCAL = 'local'
+SOURCE_BOTH = 'both'
+LOCAL_INDEX_CONTEXT = {
+    'query': 'Local corpus',
+    'location': '',
+    'reasoning': 'Matched from previously scraped postings in the local index'
+}
+SAVED_INTERNSHIPS_CONTEXT = {
+    'query': 'Saved internships',
+    'location': '',
+    'reasoning': 'Internships already saved to your list'
+}
+
+# Search pipeline events, delivered as on_event(event, payload) on the calling thread
+EVENT_STAGE = 'stage'                    # {'stage': 'local' | 'linkedin' | 'scoring', 'message'}
+EVENT_LOCAL_RESULTS = 'local_results'    # {'count', 'indexed'}
+EVENT_QUERY_DONE = 'query_done'          # {'index', 'total', 'completed', 'query_info', 'count'} or 'error' instead of 'count'
+EVENT_DUPLICATES = 'duplicates_merged'   # {'count'}
+EVENT_PREFILTER = 'semantic_prefilter'   # {'kept', 'total'}
+EVENT_SCORING = 'scoring_progress'       # {'done', 'total'}
+
+SearchEventHandler = Callable[[str, dict], None]
+
+
+def _emit(on_event: Optional[SearchEventHandler], event: str, **payload):
+    if on_event is not None:
+        on_event(event, payload)
+
+
+def print_progress(event: str, payload: dict):
+    """Event handler for batch jobs and benchmarks: one log line per event (scoring only at the end)."""
+    if event == EVENT_SCORING and payload['done'] < payload['total']:
+        return
+    print(f"[DEBUG] Smart Search {event}: {payload}")
+
+
+def merge_duplicate_postings(jobs: List[dict]) -> Tuple[List[dict], int]:
+    """
+    Collapse copies of the same posting (by canonical_job_id) returned by several queries.
+
+    The first copy is kept in place; fields it lacks are filled from later copies, and
+    'search_contexts' lists the context of every query that returned it ('search_context'
+    stays the first one). Returns the unique postings and the number of copies merged.
+    """
+    unique: Dict[str, dict] = {}
+    for job in jobs:
+        job_id = canonical_job_id(job)
+        kept = unique.get(job_id)
+        if kept is None:
+            job['search_contexts'] = [job['search_context']] if job.get('search_context') else []
+            unique[job_id] = job
+            continue
+        for field, value in job.items():
+            if field not in ('search_context', 'search_contexts') and value and not kept.get(field):
+                kept[field] = value
+        context = job.get('search_context')
+        if context and all(context.get('query') != seen.get('query') for seen in kept['search_contexts']):
+            kept['search_contexts'].append(context)
+    return list(unique.values()), len(jobs) - len(unique)
+
+
 class RAGLinkedInSearcher:
     """
     Retrieval-Augmented Generation powered LinkedIn search that uses resume context
     to intelligently find and rank relevant opportunities
     """
     
-    def __init__(self):
+    def __init__(self, db=None, posting_index=None, embedding_index=None, feature_store=None):
         self.matching_engine = SmartMatchingEngine()
-        self.db = SupabaseDB()
+        self._db = db
+        self.posting_index = posting_index or get_posting_index()
+        self._embedding_index = embedding_index
+        self.feature_store = feature_store or get_feature_store()
+    
+    @property
+    def db(self):
+        """Supabase client, connected on first use so searching and scoring work without credentials."""
+        if self._db is None:
+            self._db = SupabaseDB()
+        return self._db
+    
+    @property
+    def embedding_index(self):
+        """Embedding index, opened only when the semantic pre-filter or the recommendations job needs it."""
+        if self._embedding_index is None:
+            self._embedding_index = get_embedding_index()
+        return self._embedding_index
     
     def generate_smart_search_queries(self, resume_data: dict) -> List[Dict[str, str]]:
         """
@@ -131,15 +225,26 @@ class RAGLinkedInSearcher:
         
         return unique_queries[:5]  # Limit to 5 queries to avoid overwhelming
     
-    def perform_rag_search(self, resume_data: dict, user_id: str, max_results_per_query: int = 20, custom_queries: List[dict] = None) -> Dict:
+    def perform_rag_search(self, resume_data: dict, user_id: str, max_results_per_query: int = 20,
+                           custom_queries: List[dict] = None, source: str = SOURCE_BOTH,
+                           max_workers: int = SEARCH_WORKERS, on_event: SearchEventHandler = None) -> Dict:
         """
         Perform RAG-powered search across multiple intelligent queries
         
+        Postings are first retrieved from the local BM25 index with a resume-derived query
+        (instant); with source=SOURCE_BOTH LinkedIn is then searched for fresh postings,
+        which are added to the index. LinkedIn queries run on up to max_workers threads,
+        paced by the process-wide LinkedIn rate limiter, and each query is reported as
+        soon as it completes. Nothing here touches the UI: progress goes to on_event.
+        
         Args:
             resume_data: User's resume information
             user_id: User identifier for saving results
             max_results_per_query: Maximum results per individual search
             custom_queries: Optional list of custom search queries to use instead of AI-generated ones
+            source: SOURCE_LOCAL (index only) or SOURCE_BOTH (index + LinkedIn)
+            max_workers: Concurrent LinkedIn queries (1 runs them one after another)
+            on_event: Optional progress handler called as on_event(event, payload), see EVENT_*
             
         Returns:
             Dictionary with search results and metadata
@@ -153,7 +258,7 @@ class RAGLinkedInSearcher:
         
         results = {
             'search_queries_used': search_queries,
-            'raw_results': [],
+            'retrieved_count': 0,
             'analyzed_results': [],
             'summary': {
                 'total_found': 0,
@@ -167,122 +272,289 @@ class RAGLinkedInSearcher:
         
         all_scraped_results = []
         
-        # Execute each search query
-        for i, query_info in enumerate(search_queries):
-            st.write(f"🔍 **Search {i+1}/{len(search_queries)}:** {query_info['query']}")
-            st.write(f"*{query_info['reasoning']}*")
-            
-            with st.spinner(f"Searching LinkedIn for: {query_info['query']}..."):
-                # Perform the actual LinkedIn search
-                try:
-                    search_results = scrape_linkedin(
-                        job_title=query_info['query'],
-                        location=query_info['location'],
-                        max_results=max_results_per_query
-                    )
-                    
-                    # Check if scraping returned an error
-                    if isinstance(search_results, dict) and 'error' in search_results:
-                        st.error(f"❌ Error in search: {search_results['error']}")
-                        continue
+        # Retrieve from the local corpus first
+        _emit(on_event, EVENT_STAGE, stage='local', message="Searching the local corpus")
+        local_results = self.posting_index.search(
+            build_resume_query(self.matching_engine.analyze_resume(resume_data), search_queries),
+            limit=max_results_per_query * max(1, len(search_queries))
+        )
+        for result in local_results:
+            result['search_context'] = LOCAL_INDEX_CONTEXT
+        _emit(on_event, EVENT_LOCAL_RESULTS, count=len(local_results),
+              indexed=self.posting_index.stats()['documents'])
+        
+        # Execute the search queries concurrently; results are kept in query order
+        linkedin_queries = search_queries if source != SOURCE_LOCAL else []
+        results_by_query = [[] for _ in linkedin_queries]
+        if linkedin_queries:
+            _emit(on_event, EVENT_STAGE, stage='linkedin',
+                  message=f"Searching LinkedIn with {len(linkedin_queries)} queries")
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(linkedin_queries)))) as executor:
+                futures = {
+                    executor.submit(self._run_linkedin_query, query_info, max_results_per_query): i
+                    for i, query_info in enumerate(linkedin_queries)
+                }
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    i = futures[future]
+                    query_info = linkedin_queries[i]
+                    outcome = {'index': i, 'total': len(linkedin_queries), 'completed': completed,
+                               'query_info': query_info}
                     
-                    if search_results and len(search_results) > 0:
-                        st.success(f"✅ Found {len(search_results)} opportunities")
-                        
-                        # Add query context to each result
-                        for result in search_results:
-                            if isinstance(result, dict):  # Ensure result is a dictionary
-                                result['search_context'] = query_info
-                                all_scraped_results.append(result)
-                    else:
-                        st.warning(f"⚠️ No results found for this search")
+                    try:
+                        search_results = future.result()
                         
-                except Exception as e:
-                    st.error(f"❌ Error in search: {str(e)}")
+                        # Check if scraping returned an error
+                        if isinstance(search_results, dict) and 'error' in search_results:
+                            outcome['error'] = search_results['error']
+                        else:
+                            # Add query context to each result
+                            for result in search_results or []:
+                                if isinstance(result, dict):  # Ensure result is a dictionary
+                                    result['search_context'] = query_info
+                                    results_by_query[i].append(result)
+                            outcome['count'] = len(results_by_query[i])
+                            
+                    except Exception as e:
+                        outcome['error'] = str(e)
                     
-                # Small delay between searches to be respectful
-                import time
-                time.sleep(2)
+                    _emit(on_event, EVENT_QUERY_DONE, **outcome)
         
-        results['raw_results'] = all_scraped_results
+        for query_results in results_by_query:
+            all_scraped_results.extend(query_results)
+        
+        # One record per posting, however many queries returned it
+        all_scraped_results, duplicates_merged = merge_duplicate_postings(all_scraped_results)
+        if duplicates_merged:
+            _emit(on_event, EVENT_DUPLICATES, count=duplicates_merged)
+        
+        # Fresh postings join the corpus; they also replace their older indexed copies in this result set
+        if all_scraped_results:
+            self.posting_index.add_postings(all_scraped_results)
+        fresh_keys = {posting_key(job) for job in all_scraped_results}
+        all_scraped_results += [job for job in local_results if posting_key(job) not in fresh_keys]
+        
+        results['retrieved_count'] = len(all_scraped_results)
         results['summary']['total_found'] = len(all_scraped_results)
         
         # Analyze and score all results
-        st.write("🧠 **Analyzing compatibility scores...**")
-        analyzed_results = self.analyze_and_score_results(all_scraped_results, resume_data)
+        _emit(on_event, EVENT_STAGE, stage='scoring', message="Analyzing compatibility scores")
+        ranker = self.analyze_and_score_results(all_scraped_results, resume_data, on_event=on_event)
         
-        results['analyzed_results'] = analyzed_results
-        results['summary'] = self._generate_summary_stats(analyzed_results)
+        results['analyzed_results'] = ranker.ranked()
+        results['ranker'] = ranker
+        results['summary'] = ranker.summary()
+        results['summary']['duplicates_merged'] = duplicates_merged
         
         return results
     
-    def analyze_and_score_results(self, scraped_results: List[dict], resume_data: dict) -> List[dict]:
+    def _run_linkedin_query(self, query_info: dict, max_results: int):
+        """
+        Worker-thread body (no events from here): answer from the shared search cache, or
+        wait for the rate limiter and scrape. Identical searches running at the same time,
+        from any session, share one request.
+        """
+        def fetch():
+            get_linkedin_rate_limiter().acquire()
+            return scrape_linkedin(
+                job_title=query_info['query'],
+                location=query_info['location'],
+                max_results=max_results
+            )
+        
+        return get_search_cache().get_or_fetch(
+            query_info['query'], query_info['location'], False, max_results, fetch
+        )
+    
+    def analyze_and_score_results(self, scraped_results: List[dict], resume_data: dict,
+                                  top_k: int = RESULTS_TOP_K,
+                                  semantic_candidates: int = DEFAULT_PREFILTER_CANDIDATES,
+                                  on_event: SearchEventHandler = None) -> ResultRanker:
         """
         Analyze and score each job posting for compatibility
         
         Args:
             scraped_results: Raw scraped job postings
             resume_data: User's resume information
+            top_k: Number of best results to keep (None keeps all)
+            semantic_candidates: When more postings than this have stored embeddings, only the
+                ones closest to the resume among them are rule-scored; postings without a stored
+                embedding are always scored (0 disables the pre-filter)
+            on_event: Optional progress handler (EVENT_PREFILTER, EVENT_SCORING)
             
         Returns:
-            List of job postings with compatibility scores and analysis
+            ResultRanker holding the top_k ScoredJob records by recommendation priority
         """
         
-        resume_analysis = self.matching_engine.analyze_resume(resume_data)
-        analyzed_results = []
+        if semantic_candidates and len(scraped_results) > semantic_candidates:
+            candidates = self.embedding_index.top_candidates(scraped_results, resume_data, semantic_candidates)
+            _emit(on_event, EVENT_PREFILTER, kept=len(candidates), total=len(scraped_results))
+            scraped_results = [scraped_results[i] for i in candidates]
         
-        progress_bar = st.progress(0)
+        resume = ResumeProfile.from_analysis(self.matching_engine.analyze_resume(resume_data))
+        ranker = ResultRanker(top_k)
         
-        for i, job in enumerate(scraped_results):
-            # Extract job requirements
-            job_requirements = self.matching_engine.extract_job_requirements(
-                job_description=job.get('job_description', ''),
-                job_title=job.get('job_title', '')
-            )
-            
-            # Calculate compatibility score
-            compatibility_scores = self.matching_engine.calculate_compatibility_score(
-                resume_analysis, job_requirements
-            )
-            
-            # Calculate acceptance probability
-            additional_factors = {
-                'competition_level': self._estimate_competition_level(job),
-                'application_timing': 'normal'  # Could be enhanced with posting date analysis
-            }
-            
-            acceptance_analysis = self.matching_engine.calculate_acceptance_probability(
-                compatibility_scores, additional_factors
+        engine = self.matching_engine
+        competition_levels = [self._estimate_competition_level(job) for job in scraped_results]
+        
+        # Requirements come from the feature store; only new or changed postings are parsed
+        job_requirements_list = self.feature_store.lookup(engine, scraped_results)
+        missing = [i for i, job_requirements in enumerate(job_requirements_list) if job_requirements is None]
+        missing_jobs = [scraped_results[i] for i in missing]
+        _emit(on_event, EVENT_SCORING, done=len(scraped_results) - len(missing), total=len(scraped_results))
+        
+        if SCORING_WORKERS > 1 and len(missing) >= PARALLEL_MIN_JOBS:
+            # Large cold batches are parsed and scored across worker processes
+            parsed, parsed_scores = engine.score_jobs(
+                resume.analysis, missing_jobs, [competition_levels[i] for i in missing]
             )
-            
-            # Combine all analysis
-            analyzed_job = {
-                **job,  # Original job data
-                'resume_analysis': resume_analysis,
-                'job_requirements': job_requirements,
-                'compatibility_scores': compatibility_scores,
-                'acceptance_analysis': acceptance_analysis,
-                'match_category': self._categorize_match(compatibility_scores['overall_compatibility']),
-                'recommendation_priority': self._calculate_priority(compatibility_scores, acceptance_analysis)
-            }
-            
-            analyzed_results.append(analyzed_job)
-            
-            # Update progress
-            progress_bar.progress((i + 1) / len(scraped_results))
+        else:
+            # Serial parse (progress reported about 20 times at most)
+            parsed, parsed_scores = [], None
+            batch_size = max(100, len(missing_jobs) // 20)
+            for start in range(0, len(missing_jobs), batch_size):
+                parsed += [
+                    engine.extract_job_requirements(job_description=job.get('job_description') or '',
+                                                    job_title=job.get('job_title') or '')
+                    for job in missing_jobs[start:start + batch_size]
+                ]
+                _emit(on_event, EVENT_SCORING, done=len(scraped_results) - len(missing) + len(parsed),
+                      total=len(scraped_results))
+        for i, job_requirements in zip(missing, parsed):
+            job_requirements_list[i] = job_requirements
+        self.feature_store.store(engine, missing_jobs, parsed)
+        
+        # Score every job in one vectorised pass (the workers already scored the rows they parsed)
+        encoded = engine.encode_jobs(job_requirements_list)
+        if parsed_scores is None:
+            scores = engine.score_many(resume.analysis, encoded, competition_levels)
+        else:
+            _emit(on_event, EVENT_SCORING, done=len(scraped_results), total=len(scraped_results))
+            scores = np.empty(len(scraped_results), dtype=SCORE_DTYPE)
+            scores[missing] = parsed_scores
+            parsed_rows = set(missing)
+            stored = [i for i in range(len(scraped_results)) if i not in parsed_rows]
+            if stored:
+                scores[stored] = engine.score_many(
+                    resume.analysis, [job_requirements_list[i] for i in stored], [competition_levels[i] for i in stored]
+                )
+        
+        for record in self._scored_records(scraped_results, job_requirements_list, competition_levels, scores, resume):
+            ranker.add(record)
+        ranker.corpus = ScoredCorpus(scraped_results, competition_levels, scores, resume)
+        
+        return ranker
+    
+    def _scored_records(self, jobs: List[dict], job_requirements_list: List[dict], competition_levels: List[str],
+                        scores, resume: ResumeProfile) -> List[ScoredJob]:
+        """One ScoredJob per row of score_many output"""
+        records = []
+        for job, job_requirements, competition_level, row in zip(
+                jobs, job_requirements_list, competition_levels, scores.tolist()):
+            technical, experience, education, overall, acceptance = row
+            records.append(ScoredJob(
+                job=job,
+                requirements=job_requirements,
+                resume=resume,
+                technical_score=technical,
+                experience_score=experience,
+                education_score=education,
+                compatibility=overall,
+                acceptance_probability=acceptance,
+                recommendation_priority=self._calculate_priority(overall, acceptance),
+                match_category=self._categorize_match(overall),
+                competition_level=competition_level
+            ))
+        return records
+    
+    def rescore_results(self, search_results: dict, resume_data: dict) -> dict:
+        """
+        Re-score existing results (a perform_rag_search, load_recommendations or
+        score_saved_internships dict) against an updated resume without re-parsing postings
+        
+        Every posting the search scored is re-scored, not only the retained top-K, so
+        postings that now rank higher can enter the results and the summary counts stay
+        complete. The ranker's ScoredCorpus keeps the scored postings; their requirements
+        come back from the feature store without re-parsing, and each resume change
+        recomputes only the score components it affects (see SmartMatchingEngine.rescore_many).
         
-        # Sort by recommendation priority (highest first)
-        analyzed_results.sort(key=lambda x: x['recommendation_priority'], reverse=True)
+        Returns:
+            A new results dict of the same shape, plus 'rescore' details
+        """
+        ranker = search_results['ranker']
+        corpus = ranker.corpus
+        if corpus is None:
+            # Results built straight from records (stored recommendations): the records are the whole set
+            records = ranker.ranked()
+            if not records:
+                return search_results
+            corpus = ScoredCorpus(
+                jobs=[record.job for record in records],
+                competition_levels=[record.competition_level for record in records],
+                scores=np.array(
+                    [(record.technical_score, record.experience_score, record.education_score,
+                      record.compatibility, record.acceptance_probability) for record in records],
+                    dtype=SCORE_DTYPE
+                ),
+                resume=records[0].resume,
+                requirements=[record.requirements for record in records]
+            )
+        if not corpus.jobs:
+            return search_results
+        
+        engine = self.matching_engine
+        requirements = corpus.requirements or self.feature_store.requirements_for(engine, corpus.jobs)
+        encoded = corpus.encoded or engine.encode_jobs(requirements)
+        resume = ResumeProfile.from_analysis(engine.analyze_resume(resume_data))
+        scores, details = engine.rescore_many(
+            corpus.scores, encoded, corpus.resume.analysis, resume.analysis, corpus.competition_levels
+        )
+        
+        new_ranker = ResultRanker(ranker.top_k)
+        for record in self._scored_records(corpus.jobs, requirements, corpus.competition_levels, scores, resume):
+            new_ranker.add(record)
+        new_ranker.corpus = ScoredCorpus(corpus.jobs, corpus.competition_levels, scores, resume)
+        
+        summary = new_ranker.summary()
+        if 'duplicates_merged' in search_results.get('summary', {}):
+            summary['duplicates_merged'] = search_results['summary']['duplicates_merged']
+        print(f"[DEBUG] Re-scored {len(corpus.jobs)} results: technical recomputed for {details['technical_rows']}, "
+              f"experience {'recomputed' if details['changes']['experience'] else 'kept'}, "
+              f"education {'recomputed' if details['changes']['education'] else 'kept'}")
+        return {
+            **search_results,
+            'analyzed_results': new_ranker.ranked(),
+            'ranker': new_ranker,
+            'summary': summary,
+            'rescore': details
+        }
+    
+    def score_saved_internships(self, user_id: str, resume_data: dict) -> dict:
+        """
+        Score the user's saved internships against their resume, in the shape of
+        perform_rag_search results (so they can be displayed, filtered and re-scored alike)
+        """
+        try:
+            internships = self.db.get_internships_by_user(user_id)
+        except Exception as e:
+            print(f"[ERROR] Failed to load saved internships: {str(e)}")
+            return {'error': str(e)}
         
-        return analyzed_results
+        ranker = self.analyze_and_score_results(internships, resume_data, top_k=None, semantic_candidates=0)
+        return {
+            'search_queries_used': [SAVED_INTERNSHIPS_CONTEXT],
+            'retrieved_count': len(internships),
+            'analyzed_results': ranker.ranked(),
+            'ranker': ranker,
+            'summary': ranker.summary()
+        }
     
     def _estimate_competition_level(self, job: dict) -> str:
         """
         Estimate competition level based on job characteristics
         """
-        title = job.get('job_title', '').lower()
-        company = job.get('company_name', '').lower()
-        description = job.get('job_description', '').lower()
+        title = (job.get('job_title') or '').lower()
+        company = (job.get('company_name') or '').lower()
+        description = (job.get('job_description') or '').lower()
         
         # High competition indicators
         high_competition_indicators = [
@@ -320,89 +592,51 @@ class RAGLinkedInSearcher:
         else:
             return 'Low Match'
     
-    def _calculate_priority(self, compatibility_scores: dict, acceptance_analysis: dict) -> float:
+    def _calculate_priority(self, compatibility: float, acceptance_prob: float) -> float:
         """
         Calculate recommendation priority combining compatibility and acceptance probability
         """
-        compatibility = compatibility_scores['overall_compatibility']
-        acceptance_prob = acceptance_analysis['acceptance_probability']
-        
         # Weighted combination: 60% compatibility, 40% acceptance probability
         priority = (compatibility * 0.6) + (acceptance_prob * 0.4)
         
         return round(priority, 1)
     
-    def _generate_summary_stats(self, analyzed_results: List[dict]) -> dict:
-        """Generate summary statistics for the search results"""
-        if not analyzed_results:
-            return {
-                'total_found': 0,
-                'high_match_count': 0,
-                'medium_match_count': 0,
-                'low_match_count': 0,
-                'average_compatibility': 0,
-                'average_acceptance_probability': 0,
-                'top_recommendations': []
-            }
-        
-        # Count matches by category
-        high_match_count = sum(1 for job in analyzed_results if job['match_category'] == 'High Match')
-        medium_match_count = sum(1 for job in analyzed_results if job['match_category'] == 'Medium Match')
-        low_match_count = sum(1 for job in analyzed_results if job['match_category'] == 'Low Match')
-        
-        # Calculate averages
-        avg_compatibility = sum(job['compatibility_scores']['overall_compatibility'] 
-                               for job in analyzed_results) / len(analyzed_results)
-        
-        avg_acceptance = sum(job['acceptance_analysis']['acceptance_probability'] 
-                            for job in analyzed_results) / len(analyzed_results)
-        
-        # Get top recommendations
-        top_recommendations = analyzed_results[:5]  # Top 5 by priority
-        
-        return {
-            'total_found': len(analyzed_results),
-            'high_match_count': high_match_count,
-            'medium_match_count': medium_match_count,
-            'low_match_count': low_match_count,
-            'average_compatibility': round(avg_compatibility, 1),
-            'average_acceptance_probability': round(avg_acceptance, 1),
-            'top_recommendations': top_recommendations
-        }
-    
-    def save_smart_search_results(self, search_results: dict, user_id: str) -> bool:
+    def save_smart_search_results(self, search_results: dict, user_id: str, records: List[ScoredJob] = None,
+                                  min_compatibility: float = None) -> dict:
         """
-        Save the analyzed search results to database
+        Save chosen search results to the user's internship list in one bulk insert
         
         Args:
             search_results: Complete search results with analysis
             user_id: User identifier
+            records: The ScoredJob records to save (None = every analyzed result)
+            min_compatibility: Only save results at or above this compatibility (None = no threshold)
             
         Returns:
-            Boolean indicating success
+            {'success': True, 'new': n, 'duplicates': n} or {'error': message}
         """
-        try:
-            saved_count = 0
-            
-            for job in search_results['analyzed_results']:
-                # Prepare job data for database (only fields that exist in schema)
-                job_data = {
-                    'job_title': job.get('job_title', ''),
-                    'company_name': job.get('company_name', ''),
-                    'application_link': job.get('application_link', ''),
-                    'status': 'new'
-                    # Note: Smart Search metadata (compatibility scores, acceptance probability, etc.) 
-                    # is stored in session state and displayed during the search session
-                    # job_description is not saved to avoid schema errors
-                }
-                
-                # Save to database
-                result = self.db.add_internship(user_id, job_data)
-                if result.get('success'):
-                    saved_count += 1
-            
-            return saved_count > 0
-            
-        except Exception as e:
-            st.error(f"Error saving results: {str(e)}")
-            return False
\ No newline at end of file
+        if records is None:
+            records = search_results['analyzed_results']
+        if min_compatibility is not None:
+            records = [record for record in records if record.compatibility >= min_compatibility]
+        if not records:
+            return {'success': True, 'new': 0, 'duplicates': 0}
+        
+        # Only fields that exist in the internships schema; Smart Search metadata (scores,
+        # acceptance probability, job_description) stays in the session
+        jobs = [
+            {
+                'job_title': record.job_title,
+                'company_name': record.company_name,
+                'application_link': record.application_link,
+                'status': 'new'
+            }
+            for record in records
+        ]
+        
+        # One prefetch of existing keys plus one INSERT per 500 rows
+        result = self.db.add_internships_bulk(user_id, jobs)
+        if 'error' in result:
+            print(f"[ERROR] Error saving results: {result['error']}")
+            return result
+        return {'success': True, 'new': len(result['inserted']), 'duplicates': result['duplicate_count']}
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Rate Limiter
+Thread-safe token bucket shared by every caller of an external service
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+# LinkedIn request budget for the whole process: sustained requests/sec and burst size
+LINKEDIN_RATE_PER_SEC = float(os.getenv("LINKEDIN_RATE_PER_SEC", "0.5"))
+LINKEDIN_BURST = int(os.getenv("LINKEDIN_BURST", "5"))
+
+
+class RateLimiter:
+    """
+    Token bucket: up to burst requests may start at once, after which requests are
+    admitted at rate per second. acquire() blocks (outside the lock) until a token is free.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited_seconds': 0.0}
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going into debt) and return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            self._stats['acquired'] += 1
+            wait = -self._tokens / self.rate if self._tokens < 0 and self.rate > 0 else 0.0
+            self._stats['waited_seconds'] += wait
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a token. Returns False (and gives the token back) if it would take longer than timeout."""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self._tokens += 1
+                self._stats['acquired'] -= 1
+                self._stats['waited_seconds'] -= wait
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'rate': self.rate, 'burst': self.burst}
+
+
+_linkedin_limiter = None
+_linkedin_limiter_lock = threading.Lock()
+
+
+def get_linkedin_rate_limiter() -> RateLimiter:
+    """Process-wide LinkedIn limiter, shared by every session and worker thread."""
+    global _linkedin_limiter
+    with _linkedin_limiter_lock:
+        if _linkedin_limiter is None:
+            _linkedin_limiter = RateLimiter(LINKEDIN_RATE_PER_SEC, LINKEDIN_BURST)
+        return _linkedin_limiter
@@ -0,0 +1,349 @@
+"""
+Precomputed Recommendations
+Nightly batch job that scores new corpus postings for every stored resume and keeps each user's top-N for instant loading
+
+Usage (e.g. from cron at 03:00):
+    python recommendations.py            # refresh every user incrementally
+    python recommendations.py --full     # rescore the whole corpus for every user
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from embedding_index import DEFAULT_PREFILTER_CANDIDATES
+from match_results import ResumeProfile, ScoredJob, ResultRanker
+from posting_index import build_resume_query, posting_key
+from smart_matching_engine import resume_fingerprint, resume_scoring_fields
+
+DEFAULT_RECOMMENDATIONS_PATH = os.getenv("RECOMMENDATIONS_PATH", "recommendations.db")
+DEFAULT_TOP_N = int(os.getenv("RECOMMENDATIONS_TOP_N", "50"))
+# Corpus postings rule-scored per user and run (the best BM25 matches for the resume)
+CANDIDATES_PER_USER = 1000
+RUN_INTERVAL_SECONDS = 24 * 3600
+
+RECOMMENDATION_CONTEXT = {
+    'query': 'Recommended for you',
+    'location': '',
+    'reasoning': 'Precomputed from the shared posting corpus'
+}
+
+
+class RecommendationStore:
+    """
+    SQLite store for the batch job.
+
+    - resumes: the scoring fields of each user's latest resume (resume_scoring_fields, never
+      the full resume), registered when it is saved or Smart Search is opened
+    - recommendations: each user's top-N scored postings, rank 0 first
+    - runs: when each user was last refreshed, against which resume/taxonomy version, and
+      the corpus cutoff the next incremental run starts from
+    """
+
+    def __init__(self, path: str = DEFAULT_RECOMMENDATIONS_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS resumes (
+                user_id TEXT PRIMARY KEY,
+                resume TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS recommendations (
+                user_id TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                technical_score REAL NOT NULL,
+                experience_score REAL NOT NULL,
+                education_score REAL NOT NULL,
+                compatibility REAL NOT NULL,
+                acceptance_probability REAL NOT NULL,
+                recommendation_priority REAL NOT NULL,
+                match_category TEXT NOT NULL,
+                competition_level TEXT NOT NULL,
+                PRIMARY KEY (user_id, rank)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                user_id TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                computed_at REAL NOT NULL,
+                corpus_cutoff REAL NOT NULL,
+                candidates INTEGER NOT NULL
+            )"""
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._strip_stored_resumes()
+
+    def _strip_stored_resumes(self):
+        """Reduce resumes stored in full by earlier versions to their scoring fields."""
+        stripped = []
+        for user_id, resume in self._conn.execute("SELECT user_id, resume FROM resumes").fetchall():
+            resume_data = json.loads(resume)
+            if resume_data != resume_scoring_fields(resume_data):
+                stripped.append((json.dumps(resume_scoring_fields(resume_data), default=str), user_id))
+        if stripped:
+            self._conn.executemany("UPDATE resumes SET resume = ? WHERE user_id = ?", stripped)
+            self._conn.commit()
+            # Drop the old rows from free pages and the write-ahead log too
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def save_resume(self, user_id: str, resume_data: dict):
+        """Register a user's resume for the batch job (only its scoring fields are written)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resumes (user_id, resume, updated_at) VALUES (?, ?, ?)",
+                (user_id, json.dumps(resume_scoring_fields(resume_data), default=str), time.time())
+            )
+            self._conn.commit()
+
+    def has_resume(self, user_id: str, resume_data: dict) -> bool:
+        """True when this version of the user's resume is already registered."""
+        with self._lock:
+            row = self._conn.execute("SELECT resume FROM resumes WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None and json.loads(row[0]) == resume_scoring_fields(resume_data)
+
+    def remove_user(self, user_id: str):
+        """Forget a user's resume, recommendations and run history."""
+        with self._lock:
+            for table in ('resumes', 'recommendations', 'runs'):
+                self._conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+            self._conn.commit()
+
+    def resumes(self) -> Iterator[Tuple[str, dict]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT user_id, resume FROM resumes ORDER BY user_id").fetchall()
+        for user_id, resume in rows:
+            yield user_id, json.loads(resume)
+
+    def last_run(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, computed_at, corpus_cutoff, candidates FROM runs WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'version': row[0], 'computed_at': row[1], 'corpus_cutoff': row[2], 'candidates': row[3]}
+
+    def save_recommendations(self, user_id: str, records: List[ScoredJob], version: str,
+                             corpus_cutoff: float, candidates: int):
+        """Replace a user's recommendations and run record in one transaction."""
+        rows = [
+            (user_id, rank, json.dumps(record.job, default=str), record.technical_score, record.experience_score,
+             record.education_score, record.compatibility, record.acceptance_probability,
+             record.recommendation_priority, record.match_category, record.competition_level)
+            for rank, record in enumerate(records)
+        ]
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM recommendations WHERE user_id = ?", (user_id,))
+                self._conn.executemany(
+                    "INSERT INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO runs (user_id, version, computed_at, corpus_cutoff, candidates) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (user_id, version, time.time(), corpus_cutoff, candidates)
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def load_rows(self, user_id: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, technical_score, experience_score, education_score, compatibility, "
+                "acceptance_probability, recommendation_priority, match_category, competition_level "
+                "FROM recommendations WHERE user_id = ? ORDER BY rank", (user_id,)
+            ).fetchall()
+        return [
+            {'job': json.loads(row[0]), 'technical_score': row[1], 'experience_score': row[2],
+             'education_score': row[3], 'compatibility': row[4], 'acceptance_probability': row[5],
+             'recommendation_priority': row[6], 'match_category': row[7], 'competition_level': row[8]}
+            for row in rows
+        ]
+
+
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_recommendation_store() -> RecommendationStore:
+    """Process-wide recommendation store."""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = RecommendationStore()
+        return _store_instance
+
+
+def _run_version(searcher, resume_data: dict) -> str:
+    """Stored scores are reusable only for the same resume scoring fields and the same taxonomy/extractor."""
+    return f"{resume_fingerprint(resume_scoring_fields(resume_data))}/{searcher.matching_engine.taxonomy_version}"
+
+
+def refresh_recommendations(user_id: str, resume_data: dict, searcher, store: RecommendationStore = None,
+                            top_n: int = DEFAULT_TOP_N, full: bool = False) -> dict:
+    """
+    Recompute one user's recommendations from the shared posting corpus.
+
+    Incremental by default: only postings indexed since the user's last run are scored,
+    together with the current recommendations. A changed resume or taxonomy (or
+    full=True) rescores the best CANDIDATES_PER_USER corpus matches instead.
+    """
+    store = store or get_recommendation_store()
+    version = _run_version(searcher, resume_data)
+    run = store.last_run(user_id)
+    incremental = not full and run is not None and run['version'] == version
+    corpus_cutoff = time.time()
+
+    query = build_resume_query(searcher.matching_engine.analyze_resume(resume_data))
+    new_postings = searcher.posting_index.search(
+        query, limit=CANDIDATES_PER_USER, indexed_after=run['corpus_cutoff'] if incremental else None
+    )
+    for job in new_postings:
+        job['search_context'] = RECOMMENDATION_CONTEXT
+
+    candidates = list(new_postings)
+    if incremental:
+        if not new_postings:
+            return {'success': True, 'user_id': user_id, 'new_postings': 0}
+        fresh_keys = {posting_key(job) for job in new_postings}
+        candidates += [row['job'] for row in store.load_rows(user_id) if posting_key(row['job']) not in fresh_keys]
+
+    # Embeddings for the semantic pre-filter are computed here, off the interactive path
+    if DEFAULT_PREFILTER_CANDIDATES and new_postings:
+        searcher.embedding_index.add(new_postings)
+
+    ranker = searcher.analyze_and_score_results(candidates, resume_data, top_k=top_n)
+    records = ranker.ranked()
+    store.save_recommendations(user_id, records, version, corpus_cutoff, len(candidates))
+    return {'success': True, 'user_id': user_id, 'new_postings': len(new_postings), 'recommendations': len(records)}
+
+
+def refresh_all_recommendations(searcher, store: RecommendationStore = None, top_n: int = DEFAULT_TOP_N,
+                                full: bool = False, progress_callback: Callable[[int, int], None] = None,
+                                should_stop: Callable[[], bool] = None) -> dict:
+    """Refresh every stored resume; one user's failure does not stop the run."""
+    store = store or get_recommendation_store()
+    refreshed, failed, processed = 0, 0, 0
+    for user_id, resume_data in store.resumes():
+        if should_stop and should_stop():
+            break
+        try:
+            result = refresh_recommendations(user_id, resume_data, searcher, store, top_n=top_n, full=full)
+            if result.get('new_postings'):
+                refreshed += 1
+        except Exception as e:
+            failed += 1
+            print(f"[ERROR] Failed to refresh recommendations for {user_id}: {str(e)}")
+        processed += 1
+        if progress_callback:
+            progress_callback(processed, refreshed)
+    return {'success': True, 'users': processed, 'refreshed': refreshed, 'failed': failed}
+
+
+def load_recommendations(user_id: str, resume_data: dict, searcher, store: RecommendationStore = None) -> Optional[dict]:
+    """
+    A user's stored recommendations in the shape of perform_rag_search results, or None
+    when there are none for this resume version. Requirements come from the job feature
+    store, so loading costs no scraping, parsing or scoring.
+    """
+    store = store or get_recommendation_store()
+    run = store.last_run(user_id)
+    if run is None or run['version'] != _run_version(searcher, resume_data):
+        return None
+
+    engine = searcher.matching_engine
+    resume = ResumeProfile.from_analysis(engine.analyze_resume(resume_data))
+    rows = store.load_rows(user_id)
+    requirements = searcher.feature_store.requirements_for(engine, [row['job'] for row in rows])
+    records = [
+        ScoredJob(requirements=job_requirements, resume=resume, **row)
+        for row, job_requirements in zip(rows, requirements)
+    ]
+    ranker = ResultRanker.from_records(records)
+    return {
+        'search_queries_used': [RECOMMENDATION_CONTEXT],
+        'retrieved_count': len(records),
+        'analyzed_results': ranker.ranked(),
+        'ranker': ranker,
+        'summary': ranker.summary(),
+        'computed_at': run['computed_at']
+    }
+
+
+class RecommendationJob:
+    """Runs refresh_all_recommendations on a daemon thread every interval_seconds and exposes its progress."""
+
+    def __init__(self, searcher=None, store: RecommendationStore = None, interval_seconds: float = RUN_INTERVAL_SECONDS,
+                 top_n: int = DEFAULT_TOP_N):
+        self.searcher = searcher
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.top_n = top_n
+        self.progress = {'running': False, 'users': 0, 'refreshed': 0, 'last_run': None, 'result': None}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _on_progress(self, users, refreshed):
+        self.progress.update({'users': users, 'refreshed': refreshed})
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.progress.update({'users': 0, 'refreshed': 0})
+            try:
+                if self.searcher is None:
+                    from rag_linkedin_searcher import RAGLinkedInSearcher
+                    self.searcher = RAGLinkedInSearcher()
+                result = refresh_all_recommendations(
+                    self.searcher, self.store, top_n=self.top_n,
+                    progress_callback=self._on_progress, should_stop=self._stop_event.is_set
+                )
+            except Exception as e:
+                result = {'error': f"Recommendation run failed: {str(e)}"}
+            print(f"[INFO] Recommendation run finished: {result}")
+            self.progress.update({'last_run': time.time(), 'result': result})
+            self._stop_event.wait(self.interval_seconds)
+        self.progress['running'] = False
+
+    def start(self):
+        """Start the job in the background; does nothing if it is already running."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+        self.progress['running'] = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Ask the job to stop after the current user."""
+        self._stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--full', action='store_true', help="Rescore the whole corpus instead of new postings only")
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N)
+    args = parser.parse_args()
+
+    from rag_linkedin_searcher import RAGLinkedInSearcher
+    start = time.perf_counter()
+    result = refresh_all_recommendations(RAGLinkedInSearcher(), top_n=args.top_n, full=args.full)
+    print(f"[INFO] {result} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
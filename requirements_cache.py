@@ -0,0 +1,132 @@
+"""
+Job Requirements Cache
+Content-addressed cache for parsed job requirements: bounded in-memory LRU with an optional SQLite tier
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Set to a file path to keep parsed requirements across restarts (empty = memory only)
+DEFAULT_CACHE_PATH = os.getenv("REQUIREMENTS_CACHE_PATH", "")
+DEFAULT_MAX_ENTRIES = int(os.getenv("REQUIREMENTS_CACHE_SIZE", "4096"))
+
+
+def make_content_key(taxonomy_version: str, job_title: str, job_description: str) -> str:
+    """Hash of the posting text plus the taxonomy version that parsed it."""
+    content = f"{taxonomy_version}\x00{job_title or ''}\x00{job_description or ''}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _encode(requirements: dict) -> str:
+    return json.dumps({key: sorted(value) if isinstance(value, set) else value
+                       for key, value in requirements.items()})
+
+
+def _decode(payload: str, set_fields) -> dict:
+    requirements = json.loads(payload)
+    for key in set_fields:
+        if key in requirements:
+            requirements[key] = set(requirements[key])
+    return requirements
+
+
+def _copy(requirements: dict) -> dict:
+    """Fresh sets for the caller, so mutating a result cannot corrupt the cached entry."""
+    return {key: set(value) if isinstance(value, set) else value for key, value in requirements.items()}
+
+
+class RequirementsCache:
+    """
+    Two-tier cache keyed by make_content_key.
+
+    - Memory: OrderedDict LRU bounded by max_entries, shared by every engine in the process.
+    - Disk (optional): SQLite table read on a memory miss and written on every put, so
+      postings parsed by one session or user are reused by the next.
+    A taxonomy change produces new keys; stale rows are simply never read again.
+    """
+
+    SET_FIELDS = ('required_skills', 'preferred_skills', 'technical_categories')
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = DEFAULT_CACHE_PATH):
+        self.max_entries = max_entries
+        self.path = path or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        self._conn = None
+        if self.path:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_requirements (content_key TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            requirements = self._entries.get(key)
+            if requirements is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return _copy(requirements)
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT payload FROM job_requirements WHERE content_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    requirements = _decode(row[0], self.SET_FIELDS)
+                    self._remember(key, requirements)
+                    self._stats['disk_hits'] += 1
+                    return _copy(requirements)
+
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key: str, requirements: dict):
+        stored = _copy(requirements)
+        with self._lock:
+            self._remember(key, stored)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO job_requirements (content_key, payload) VALUES (?, ?)",
+                        (key, _encode(stored))
+                    )
+                except sqlite3.Error as e:
+                    print(f"[ERROR] Failed to persist job requirements: {str(e)}")
+
+    def _remember(self, key: str, requirements: dict):
+        self._entries[key] = requirements
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries), 'max_entries': self.max_entries,
+                    'persistent': self._conn is not None}
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_requirements_cache() -> RequirementsCache:
+    """Process-wide requirements cache (survives Streamlit reruns and is shared across users)."""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = RequirementsCache()
+        return _cache_instance
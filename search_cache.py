@@ -0,0 +1,138 @@
+"""
+Search Result Cache
+Shared TTL cache of raw LinkedIn search results with single-flight coalescing of identical concurrent searches
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+
+
+def search_key(query: str, location: Optional[str] = None, last_24_hours: bool = False) -> Tuple[str, str, bool]:
+    """Normalised (query, location, freshness window): case and spacing do not matter."""
+    return (" ".join((query or '').lower().split()), " ".join((location or '').lower().split()), bool(last_24_hours))
+
+
+class _Flight:
+    """One upstream request (for up to max_results results) that concurrent identical searches wait on."""
+
+    __slots__ = ('done', 'result', 'error', 'max_results')
+
+    def __init__(self, max_results: Optional[int]):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.max_results = max_results
+
+
+class SearchResultCache:
+    """
+    TTL-bounded LRU of search results keyed by search_key.
+
+    - A cached entry answers any request for at most as many results as it was fetched
+      with (or any request at all if the search returned fewer than it asked for).
+    - Only the first of several concurrent identical misses calls fetch(); the others
+      wait for it and share its result (single flight). A miss asking for more results
+      than the in-flight request fetches its own and becomes the flight later callers join.
+    - Error results ({'error': ...}) are handed to every waiter but never cached.
+    Callers get fresh copies of the result dicts, so annotating them is safe.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (fetched_at, max_results, results)
+        self._inflight = {}             # key -> _Flight
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    @staticmethod
+    def _covers(max_fetched: Optional[int], results: list, max_results: Optional[int]) -> bool:
+        if max_fetched is None or len(results) < max_fetched:
+            return True
+        return max_results is not None and max_results <= max_fetched
+
+    @staticmethod
+    def _joinable(flight_max: Optional[int], max_results: Optional[int]) -> bool:
+        """Whether a request can wait on an in-flight fetch of up to flight_max results."""
+        return flight_max is None or (max_results is not None and max_results <= flight_max)
+
+    @staticmethod
+    def _copy(results, max_results: Optional[int]):
+        if not isinstance(results, list):
+            return dict(results) if isinstance(results, dict) else results
+        return [dict(result) for result in results[:max_results]]
+
+    def get_or_fetch(self, query: str, location: Optional[str], last_24_hours: bool, max_results: Optional[int],
+                     fetch: Callable[[], object]):
+        """Cached results for the search, calling fetch() at most once across concurrent callers."""
+        key = search_key(query, location, last_24_hours)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fetched_at, max_fetched, results = entry
+                if time.monotonic() - fetched_at <= self.ttl and self._covers(max_fetched, results, max_results):
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return self._copy(results, max_results)
+            flight = self._inflight.get(key)
+            leader = flight is None or not self._joinable(flight.max_results, max_results)
+            if leader:
+                flight = self._inflight[key] = _Flight(max_results)
+                self._stats['misses'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._copy(flight.result, max_results)
+
+        try:
+            flight.result = fetch()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    self._inflight.pop(key)
+                current = self._entries.get(key)
+                if flight.error is None and isinstance(flight.result, list) and (
+                        current is None or time.monotonic() - current[0] > self.ttl
+                        or self._covers(max_results, flight.result, current[1])):
+                    # A larger concurrent fetch that finished first is not replaced by a smaller one
+                    self._entries[key] = (time.monotonic(), max_results, flight.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats['evictions'] += 1
+            flight.done.set()
+        return self._copy(flight.result, max_results)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries), 'in_flight': len(self._inflight), 'ttl': self.ttl}
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """Process-wide search result cache, shared by every user and session."""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = SearchResultCache()
+        return _cache_instance
@@ -0,0 +1,101 @@
+"""
+Skill Tokenizer and Index
+Normalizes text into a token stream once and matches taxonomy terms by hashed n-gram lookup
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Tokens keep in-word dots, plus and hash signs ("node.js", "asp.net", "c++", "c#");
+# everything else (spaces, hyphens, slashes, commas, trailing periods) separates tokens
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """Lowercase text and return its (token, start_offset) stream."""
+    if not text:
+        return []
+    return [(match.group(), match.start()) for match in _TOKEN_RE.finditer(text.lower())]
+
+
+def term_key(term: str) -> Tuple[str, ...]:
+    """Dictionary key of a taxonomy term or alias: its token tuple."""
+    return tuple(token for token, _ in tokenize(term))
+
+
+def token_set(tokens: Iterable[Tuple[str, int]]) -> set:
+    """Distinct token strings of a token stream, for whole-word keyword checks."""
+    return {token for token, _ in tokens}
+
+
+class SkillIndex:
+    """
+    Hashed n-gram dictionary over a skill taxonomy.
+
+    Keys are token tuples of each canonical term, its space-free spelling and its aliases
+    (e.g. ("node.js",) and ("node", "js") -> "nodejs", ("k8s",) -> "kubernetes").
+    find() walks a token stream once, trying the longest n-gram first at each position,
+    so matches always start and end on token boundaries ("r" no longer matches "react").
+    """
+
+    def __init__(self, tech_skills: Dict[str, List[str]], aliases: Dict[str, str] = None):
+        self.entries: Dict[Tuple[str, ...], str] = {}
+        self.categories: Dict[str, Tuple[str, ...]] = {}
+
+        for category, tech_list in tech_skills.items():
+            for tech in tech_list:
+                self.categories[tech] = self.categories.get(tech, ()) + (category,)
+                key = term_key(tech)
+                self.entries.setdefault(key, tech)
+                if len(key) > 1:
+                    self.entries.setdefault((''.join(key),), tech)
+
+        for alias, canonical in (aliases or {}).items():
+            if canonical in self.categories:
+                self.entries.setdefault(term_key(alias), canonical)
+
+        # Longest key starting with each first token; any other token is skipped after one lookup
+        self.max_ngram_by_first: Dict[str, int] = {}
+        for key in self.entries:
+            self.max_ngram_by_first[key[0]] = max(len(key), self.max_ngram_by_first.get(key[0], 0))
+        self.single_tokens = frozenset(key[0] for key in self.entries if len(key) == 1)
+        self.phrase_first_tokens = frozenset(key[0] for key in self.entries if len(key) > 1)
+
+    def find(self, tokens: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Return (canonical_skill, start_offset) for every match in the token stream, in order."""
+        entries, max_ngram_by_first = self.entries, self.max_ngram_by_first
+        words = [token for token, _ in tokens]
+        word_count = len(words)
+        hits = []
+        i = 0
+        while i < word_count:
+            longest = max_ngram_by_first.get(words[i])
+            if longest is None:
+                i += 1
+                continue
+            for n in range(min(longest, word_count - i), 0, -1):
+                canonical = entries.get(tuple(words[i:i + n]))
+                if canonical:
+                    hits.append((canonical, tokens[i][1]))
+                    i += n
+                    break
+            else:
+                i += 1
+        return hits
+
+    def mentions(self, tokens: List[Tuple[str, int]], tokens_present: set) -> bool:
+        """Whether any term occurs in the stream; tokens_present is its token_set (single tokens need no walk)."""
+        if not self.single_tokens.isdisjoint(tokens_present):
+            return True
+        return not self.phrase_first_tokens.isdisjoint(tokens_present) and bool(self.find(tokens))
+
+    def first_positions(self, tokens: List[Tuple[str, int]]) -> Dict[str, int]:
+        """Map each canonical skill found in the token stream to its first character offset."""
+        positions: Dict[str, int] = {}
+        for canonical, offset in self.find(tokens):
+            positions.setdefault(canonical, offset)
+        return positions
+
+    def skills_in(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention."""
+        return list(self.first_positions(tokenize(text)))
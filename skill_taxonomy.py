@@ -0,0 +1,115 @@
+"""
+Skill Taxonomy
+Loads skill_taxonomy.json once into an immutable, versioned index shared by every matching engine
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from skill_matcher import SkillIndex
+
+DEFAULT_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json")
+)
+
+REQUIRED_SECTIONS = ('tech_skills', 'aliases', 'experience_indicators', 'requirement_patterns')
+
+
+class Taxonomy:
+    """
+    Read-only compiled taxonomy.
+
+    - tech_skills / experience_indicators: category -> tuple of terms
+    - aliases: alternative spelling -> canonical term
+    - requirement_patterns: raw regex strings; patterns: the same, compiled once
+    - skill_index: token n-gram index (term/alias -> canonical, canonical -> categories)
+    - experience_index: the same kind of index over experience_indicators (term -> level)
+    - skill_columns: canonical term -> column in the batch scoring matrices
+    - version: declared version plus a content hash, so any edit changes it
+    """
+
+    __slots__ = ('version', 'path', 'tech_skills', 'aliases', 'experience_indicators',
+                 'requirement_patterns', 'patterns', 'skill_cue_re', 'skill_index', 'experience_index',
+                 'skill_columns')
+
+    def __init__(self, data: dict, path: Optional[str] = None):
+        missing = [section for section in REQUIRED_SECTIONS if section not in data]
+        if missing:
+            raise ValueError(f"Taxonomy is missing sections: {', '.join(missing)}")
+
+        content_hash = hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        self.version = f"{data.get('version', 'unversioned')}+{content_hash}"
+        self.path = path
+        self.tech_skills = _freeze_groups(data['tech_skills'])
+        self.aliases = MappingProxyType({alias.lower(): canonical for alias, canonical in data['aliases'].items()})
+        self.experience_indicators = _freeze_groups(data['experience_indicators'])
+        self.requirement_patterns = MappingProxyType(dict(data['requirement_patterns']))
+        self.patterns = MappingProxyType({
+            name: re.compile(pattern) for name, pattern in self.requirement_patterns.items()
+        })
+        # Inline cues, used for skill mentions outside a Requirements / Nice to have section
+        self.skill_cue_re = re.compile(
+            rf"\b(?:(?P<required>{self.requirement_patterns['skills_required']})"
+            rf"|(?P<preferred>{self.requirement_patterns['skills_preferred']}))\b"
+        )
+        self.skill_index = SkillIndex(self.tech_skills, self.aliases)
+        self.experience_index = SkillIndex(self.experience_indicators)
+        self.skill_columns = MappingProxyType(
+            {tech: column for column, tech in enumerate(self.skill_index.categories)}
+        )
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"Taxonomy is immutable (tried to set {name!r})")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"Taxonomy(version={self.version!r}, skills={len(self.skill_columns)})"
+
+
+def _freeze_groups(groups: dict) -> Mapping[str, Tuple[str, ...]]:
+    return MappingProxyType({name: tuple(term.lower() for term in terms) for name, terms in groups.items()})
+
+
+def load_taxonomy(path: str = DEFAULT_TAXONOMY_PATH) -> Taxonomy:
+    """Parse and compile a taxonomy file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return Taxonomy(json.load(f), path=path)
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> Taxonomy:
+    """Process-wide taxonomy, compiled on first use."""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = load_taxonomy()
+        return _taxonomy
+
+
+def reload_taxonomy(path: Optional[str] = None) -> dict:
+    """
+    Recompile the taxonomy from disk and swap it in for engines created afterwards.
+    Existing engines keep the snapshot they were built with; the previous taxonomy
+    stays active if the new file fails to load.
+    """
+    global _taxonomy
+    try:
+        taxonomy = load_taxonomy(path or (_taxonomy.path if _taxonomy and _taxonomy.path else DEFAULT_TAXONOMY_PATH))
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"[ERROR] Failed to reload skill taxonomy: {str(e)}")
+        return {'error': str(e)}
+
+    with _taxonomy_lock:
+        previous = _taxonomy.version if _taxonomy else None
+        _taxonomy = taxonomy
+    print(f"[DEBUG] Skill taxonomy reloaded: {previous} -> {taxonomy.version}")
+    return {'success': True, 'version': taxonomy.version, 'previous_version': previous}
@@ -5,10 +5,180 @@ Analyzes resume and job postings to calculate acceptance probability and compati
 
 import re
 import json
+import hashlib
 from typing import Dict, List, Tuple, Set
 from datetime import datetime
 import math
-import streamlit as st
+import multiprocessing
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from skill_matcher import SkillIndex, tokenize, token_set
+from skill_taxonomy import Taxonomy, get_taxonomy, reload_taxonomy
+from requirements_cache import get_requirements_cache, make_content_key
+
+# Bump when extract_job_requirements changes behaviour so cached parses are not reused
+EXTRACTOR_VERSION = 3
+
+# Whole-word degree keywords (substring checks matched "ms" in "systems", "ma" in "mathematics")
+MASTER_TOKENS = {'master', 'masters', 'ms', 'msc', 'm.s', 'm.sc', 'mba'}
+PHD_TOKENS = {'phd', 'ph.d', 'doctorate', 'doctoral'}
+BACHELOR_TOKENS = {'bachelor', 'bachelors', 'bs', 'bsc', 'b.s', 'b.sc', 'ba', 'license', 'licence'}
+# Remote-work phrases, matched on token boundaries ("work-from-home" too, "remotely" not)
+REMOTE_INDEX = SkillIndex({'remote': ('remote', 'work from home', 'distributed')})
+
+# Section headings (at line start, optionally bulleted, ending the line or followed by ':').
+# The named group that matches is the kind of the span opened by the heading; 'other' closes
+# the previous span (about us, benefits, ...). Text before the first heading is unlabelled.
+_SECTION_HEADER_RE = re.compile(
+    r"^[ \t]*(?:[-*•#>]+[ \t]*)?(?:"
+    r"(?P<preferred>nice[ -]to[ -]haves?|good[ -]to[ -]haves?|preferred(?: skills| qualifications| experience)?"
+    r"|bonus(?: points)?|pluses|desired(?: skills| qualifications)?|additional qualifications|atouts|un plus)"
+    r"|(?P<required>requirements?|required(?: skills| qualifications| experience)?"
+    r"|(?:minimum |basic |key )?qualifications|must[ -]haves?|what you(?:'|’)?ll need|what you need"
+    r"|what we(?:'|’)?re looking for|what we are looking for|who you are|your profile|profile"
+    r"|(?:technical )?skills(?: (?:and|&) (?:experience|qualifications))?|prérequis|profil recherché"
+    r"|compétences(?: requises)?|exigences)"
+    r"|(?P<responsibilities>(?:key |main |your )?responsibilities|what you(?:'|’)?ll do|what you will do"
+    r"|your role|the role|role description|duties|missions?|vos missions|day[ -]to[ -]day)"
+    r"|(?P<other>about (?:us|the company|the team|[a-z]+)|benefits|perks|what we offer|why join(?: us)?"
+    r"|company description|equal opportunity|compensation|salary|location|how to apply)"
+    r")\b[^\n:]{0,20}?[ \t]*(?::|$)",
+    re.MULTILINE
+)
+
+# Clause boundaries used to scope inline "required"/"a plus" cues outside labelled sections
+_CLAUSE_END_RE = re.compile(r"[\n;!?]|\.(?:\s|$)")
+
+
+def _segment_sections(text: str) -> Tuple[List[int], List[str]]:
+    """Split text once into spans: parallel lists of span start offsets and span kinds."""
+    starts, kinds = [0], ['unlabelled']
+    for match in _SECTION_HEADER_RE.finditer(text):
+        starts.append(match.end())
+        kinds.append(match.lastgroup)
+    return starts, kinds
+
+# Resume analyses shared by every engine and rerun, keyed by (taxonomy version, resume fingerprint)
+_RESUME_ANALYSIS_CACHE = OrderedDict()
+_RESUME_ANALYSIS_CACHE_SIZE = 64
+_RESUME_ANALYSIS_LOCK = threading.Lock()
+
+
+def resume_fingerprint(resume_data: dict) -> str:
+    """Stable hash of the resume JSON (key order independent); a saved edit is a new version."""
+    return hashlib.sha256(json.dumps(resume_data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def resume_scoring_fields(resume_data: dict) -> dict:
+    """
+    The parts of a resume analyze_resume reads (skills, languages, degree names, experience
+    durations, project and certification counts) without names, contact details or free text.
+    analyze_resume gives the same result for it as for the full resume.
+    """
+    resume_data = resume_data or {}
+    return {
+        'skills': list(resume_data.get('skills') or []),
+        'languages': list(resume_data.get('languages') or []),
+        'education': [{'degree': edu.get('degree', '')} for edu in resume_data.get('education') or []],
+        'professional_experience': [
+            {'duration': exp.get('duration', '')} for exp in resume_data.get('professional_experience') or []
+        ],
+        'projects': [{} for _ in resume_data.get('projects') or []],
+        'certifications': [{} for _ in resume_data.get('certifications') or []]
+    }
+
+
+def diff_resume_analysis(previous: dict, current: dict) -> dict:
+    """What changed between two analyze_resume outputs, per score component."""
+    previous_skills = previous['skills'] | previous.get('normalized_skills', set())
+    current_skills = current['skills'] | current.get('normalized_skills', set())
+    return {
+        'skills': previous_skills ^ current_skills,
+        'languages': bool(previous['programming_languages']) != bool(current['programming_languages']),
+        'experience': previous['experience_level'] != current['experience_level'],
+        'education': (previous['has_degree'], previous['education_level']) != (current['has_degree'], current['education_level'])
+    }
+
+
+def invalidate_resume_analysis(resume_data: dict = None):
+    """Drop cached analyses of one resume version (or of every resume when None)."""
+    with _RESUME_ANALYSIS_LOCK:
+        if resume_data is None:
+            _RESUME_ANALYSIS_CACHE.clear()
+            return
+        fingerprint = resume_fingerprint(resume_data)
+        for key in [key for key in _RESUME_ANALYSIS_CACHE if key[1] == fingerprint]:
+            del _RESUME_ANALYSIS_CACHE[key]
+
+# Parallel scoring: below this many jobs the pool overhead outweighs the speedup
+PARALLEL_MIN_JOBS = 300
+PARALLEL_CHUNK_SIZE = 250
+# Worker processes used by score_jobs (0 = one per CPU)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0")) or os.cpu_count() or 1
+
+# One long-lived process pool per worker count (spawned processes keep their engine and caches)
+_PROCESS_POOLS = {}
+_PROCESS_POOLS_LOCK = threading.Lock()
+_WORKER_ENGINE = None
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    with _PROCESS_POOLS_LOCK:
+        if workers not in _PROCESS_POOLS:
+            _PROCESS_POOLS[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_scoring_worker
+            )
+        return _PROCESS_POOLS[workers]
+
+
+def _init_scoring_worker():
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = SmartMatchingEngine()
+
+
+def _score_chunk(resume_analysis: dict, postings: List[Tuple[str, str]], competition_levels: List[str],
+                 taxonomy_version: str, taxonomy_path: str) -> Tuple[List[dict], np.ndarray]:
+    """Worker entry point: (title, description) postings in, their requirements and compact score rows out."""
+    global _WORKER_ENGINE
+    if _WORKER_ENGINE is None or _WORKER_ENGINE.taxonomy.version != taxonomy_version:
+        # The parent reloaded its taxonomy since this worker started
+        if get_taxonomy().version != taxonomy_version:
+            reload_taxonomy(taxonomy_path)
+        _WORKER_ENGINE = SmartMatchingEngine()
+    engine = _WORKER_ENGINE
+    requirements = [engine.extract_job_requirements(description, title) for title, description in postings]
+    return requirements, engine.score_many(resume_analysis, requirements, competition_levels)
+
+# Ordinal levels and multipliers shared by the per-job and batch scorers
+EXPERIENCE_LEVELS = {'entry_level': 0, 'mid_level': 1, 'senior_level': 2}
+EDUCATION_LEVELS = {'high_school': 0, 'bachelor': 1, 'master': 2, 'phd': 3}
+COMPETITION_MULTIPLIERS = {'low': 1.2, 'medium': 1.0, 'high': 0.8}
+TIMING_MULTIPLIERS = {'early': 1.15, 'normal': 1.0, 'late': 0.9}
+
+# Experience score indexed by [resume level, required level] (same rules as _calculate_experience_score)
+EXPERIENCE_SCORE_TABLE = np.array([
+    [100.0, 70.0, 40.0],
+    [85.0, 100.0, 70.0],
+    [85.0, 95.0, 100.0]
+])
+
+# One compact row per job returned by SmartMatchingEngine.score_many
+SCORE_DTYPE = np.dtype([
+    ('technical', 'f8'), ('experience', 'f8'), ('education', 'f8'),
+    ('overall', 'f8'), ('acceptance', 'f8')
+])
+
+
+def _round_scores(values: np.ndarray) -> np.ndarray:
+    """Round to one decimal exactly like round() (np.round disagrees on ties such as 53.55)"""
+    return np.array([round(value, 1) for value in values.tolist()])
+
 
 class SmartMatchingEngine:
     """
@@ -16,62 +186,33 @@ class SmartMatchingEngine:
     based on resume analysis and job requirements
     """
     
-    def __init__(self):
-        # Common tech skills categorized by level
-        self.tech_skills = {
-            'programming_languages': [
-                'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust',
-                'php', 'ruby', 'swift', 'kotlin', 'scala', 'r', 'matlab', 'sql', 'solidity'
-            ],
-            'web_frameworks': [
-                'react', 'angular', 'vue', 'nodejs', 'express', 'django', 'flask',
-                'spring', 'laravel', 'rails', 'asp.net', 'fastapi', 'jakarta ee', 'mvc'
-            ],
-            'databases': [
-                'postgresql', 'mysql', 'mongodb', 'redis', 'cassandra', 'dynamodb',
-                'sqlite', 'oracle', 'mariadb', 'elasticsearch', 'entity framework'
-            ],
-            'cloud_platforms': [
-                'aws', 'azure', 'gcp', 'google cloud', 'heroku', 'digitalocean',
-                'kubernetes', 'docker', 'terraform'
-            ],
-            'data_science': [
-                'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
-                'matplotlib', 'seaborn', 'jupyter', 'apache spark', 'opencv', 'power bi',
-                'cnn', 'deep learning', 'machine learning', 'computer vision', 'image processing'
-            ],
-            'devops': [
-                'git', 'jenkins', 'travis', 'circleci', 'gitlab', 'github actions',
-                'ansible', 'puppet', 'chef', 'github'
-            ],
-            'blockchain': [
-                'ethereum', 'solidity', 'web3', 'blockchain', 'smart contracts'
-            ],
-            'ai_ml': [
-                'llm', 'prompt engineering', 'generative ai', 'artificial intelligence',
-                'data mining', 'statistical modeling', 'shap'
-            ]
-        }
+    def __init__(self, taxonomy: Taxonomy = None):
+        # Skills, aliases, experience indicators and requirement patterns come from the shared,
+        # precompiled taxonomy (skill_taxonomy.json); building an engine copies nothing
+        self.taxonomy = taxonomy or get_taxonomy()
+        self.tech_skills = self.taxonomy.tech_skills
+        self.skill_aliases = self.taxonomy.aliases
+        self.experience_indicators = self.taxonomy.experience_indicators
+        self.requirement_patterns = self.taxonomy.requirement_patterns
+        self.patterns = self.taxonomy.patterns
+        self.skill_cue_re = self.taxonomy.skill_cue_re
+        self.skill_index = self.taxonomy.skill_index
+        self.experience_index = self.taxonomy.experience_index
         
-        # Experience level indicators
-        self.experience_indicators = {
-            'entry_level': ['intern', 'entry', 'junior', 'new grad', 'fresh', 'trainee'],
-            'mid_level': ['mid', 'intermediate', 'experienced', '2-3 years', '3-5 years'],
-            'senior_level': ['senior', 'lead', 'principal', 'architect', '5+ years', 'expert']
-        }
+        # Column of each canonical skill in the batch scoring matrices
+        self.skill_columns = self.taxonomy.skill_columns
         
-        # Common requirements patterns
-        self.requirement_patterns = {
-            'education': r'(bachelor|master|phd|degree|bs|ms|ba|ma|computer science|engineering)',
-            'experience_years': r'(\d+)\s*[-+]?\s*years?\s*(of\s*)?(experience|exp)',
-            'skills_required': r'(required|must have|essential|mandatory)',
-            'skills_preferred': r'(preferred|nice to have|plus|bonus|desired)'
-        }
+        # Parsed requirements and resume analyses are cached per taxonomy + extractor version
+        self.taxonomy_version = f"{self.taxonomy.version}/x{EXTRACTOR_VERSION}"
+        self.requirements_cache = get_requirements_cache()
     
     def analyze_resume(self, resume_data: dict) -> dict:
         """
         Analyze resume to extract key matching factors
         
+        Cached per resume version (see resume_fingerprint), so the query generator, the
+        scorer and the summary panel share one analysis per rerun. Treat the result as read-only.
+        
         Args:
             resume_data: User's resume information in the format:
             {
@@ -88,8 +229,28 @@ class SmartMatchingEngine:
         Returns:
             Dictionary with analyzed resume factors
         """
+        if not resume_data:
+            return self._analyze_resume(resume_data)
+        
+        cache_key = (self.taxonomy_version, resume_fingerprint(resume_data))
+        with _RESUME_ANALYSIS_LOCK:
+            analysis = _RESUME_ANALYSIS_CACHE.get(cache_key)
+            if analysis is not None:
+                _RESUME_ANALYSIS_CACHE.move_to_end(cache_key)
+                return analysis
+        
+        analysis = self._analyze_resume(resume_data)
+        with _RESUME_ANALYSIS_LOCK:
+            _RESUME_ANALYSIS_CACHE[cache_key] = analysis
+            while len(_RESUME_ANALYSIS_CACHE) > _RESUME_ANALYSIS_CACHE_SIZE:
+                _RESUME_ANALYSIS_CACHE.popitem(last=False)
+        return analysis
+    
+    def _analyze_resume(self, resume_data: dict) -> dict:
+        """Uncached analysis behind analyze_resume (one skill-index lookup per skill entry)"""
         analysis = {
             'skills': set(),
+            'normalized_skills': set(),
             'experience_level': 'entry_level',
             'years_experience': 0,
             'education_level': 'none',
@@ -113,23 +274,18 @@ class SmartMatchingEngine:
                 skill_lower = skill.lower().strip()
                 analysis['skills'].add(skill_lower)
                 
-                # Categorize technical skills with better matching
-                for category, tech_list in self.tech_skills.items():
-                    for tech in tech_list:
-                        # Check if tech skill is mentioned in the skill description
-                        if (tech in skill_lower or 
-                            tech.replace(' ', '') in skill_lower.replace(' ', '') or
-                            any(tech_variant in skill_lower for tech_variant in [tech, tech.upper(), tech.capitalize()])):
-                            
-                            # Special handling for DevOps - require more than just Git
-                            if category == 'devops':
-                                devops_matches.append(tech)
-                            else:
-                                analysis['technical_categories'].add(category)
-                                
-                            if category == 'programming_languages':
-                                analysis['programming_languages'].add(tech)
-                            break  # Found a match, no need to check other techs in this category
+                # Canonical taxonomy terms mentioned in this skill entry (whole tokens only)
+                for tech in self.skill_index.skills_in(skill_lower):
+                    analysis['normalized_skills'].add(tech)
+                    for category in self.skill_index.categories[tech]:
+                        # Special handling for DevOps - require more than just Git
+                        if category == 'devops':
+                            devops_matches.append(tech)
+                        else:
+                            analysis['technical_categories'].add(category)
+                        
+                        if category == 'programming_languages':
+                            analysis['programming_languages'].add(tech)
             
             # Only add DevOps category if multiple DevOps tools are found (not just Git/GitHub)
             devops_non_git_tools = [tool for tool in devops_matches 
@@ -151,16 +307,17 @@ class SmartMatchingEngine:
             
             for edu in education:
                 degree = edu.get('degree', '').lower()
+                degree_tokens = token_set(tokenize(degree))
                 # Check for engineering degrees (common for CS)
-                if 'engineering' in degree and ('computer' in degree or 'software' in degree):
+                if 'engineering' in degree_tokens and ('computer' in degree_tokens or 'software' in degree_tokens):
                     highest_degree = 'bachelor'  # Engineering degree equivalent
-                elif 'master' in degree or 'ms' in degree or 'ma' in degree:
+                elif degree_tokens & MASTER_TOKENS:
                     highest_degree = 'master'
-                elif 'phd' in degree or 'doctorate' in degree:
+                elif degree_tokens & PHD_TOKENS:
                     highest_degree = 'phd'
-                elif 'bachelor' in degree or 'bs' in degree or 'ba' in degree or 'license' in degree:
+                elif degree_tokens & BACHELOR_TOKENS:
                     highest_degree = 'bachelor'
-                elif 'preparatory' in degree or 'baccalaureate' in degree:
+                elif 'preparatory' in degree_tokens or 'baccalaureate' in degree_tokens:
                     # These are pre-university, but still count as some education
                     if highest_degree == 'none':
                         highest_degree = 'high_school'
@@ -223,6 +380,9 @@ class SmartMatchingEngine:
         """
         Extract requirements and preferences from job posting
         
+        Results are cached by a hash of title + description + taxonomy version, so a
+        posting seen in an earlier search, by another user or on a rerun is parsed once.
+        
         Args:
             job_description: Job description text
             job_title: Job title
@@ -230,6 +390,15 @@ class SmartMatchingEngine:
         Returns:
             Dictionary with extracted requirements
         """
+        cache_key = make_content_key(self.taxonomy_version, job_title, job_description)
+        requirements = self.requirements_cache.get(cache_key)
+        if requirements is None:
+            requirements = self._extract_job_requirements(job_description, job_title)
+            self.requirements_cache.put(cache_key, requirements)
+        return requirements
+    
+    def _extract_job_requirements(self, job_description: str, job_title: str) -> dict:
+        """Uncached parse behind extract_job_requirements"""
         requirements = {
             'required_skills': set(),
             'preferred_skills': set(),
@@ -248,65 +417,99 @@ class SmartMatchingEngine:
         desc_lower = job_description.lower()
         title_lower = job_title.lower()
         
+        # Tokenize once; skill and degree matching both work on this stream
+        desc_tokens = tokenize(desc_lower)
+        desc_token_set = token_set(desc_tokens)
+        
         # Extract experience requirements
-        exp_matches = re.findall(self.requirement_patterns['experience_years'], desc_lower)
+        exp_matches = self.patterns['experience_years'].findall(desc_lower)
         if exp_matches:
             try:
                 requirements['min_years_experience'] = int(exp_matches[0][0])
             except:
                 pass
         
-        # Determine experience level from title and description
-        if any(term in title_lower for term in self.experience_indicators['senior_level']):
+        # Determine experience level from the title (whole-token indicator matches, so "lead"
+        # does not fire on "leading" nor "mid" on "pyramid"); entry level is the default
+        title_levels = self._experience_levels(tokenize(title_lower))
+        if 'senior_level' in title_levels:
             requirements['experience_level'] = 'senior_level'
-        elif any(term in title_lower for term in self.experience_indicators['mid_level']):
+        elif 'mid_level' in title_levels:
             requirements['experience_level'] = 'mid_level'
-        elif any(term in title_lower + desc_lower for term in self.experience_indicators['entry_level']):
-            requirements['experience_level'] = 'entry_level'
         
         # Extract education requirements
-        if re.search(self.requirement_patterns['education'], desc_lower):
+        if self.patterns['education'].search(desc_lower):
             requirements['education_required'] = True
-            if 'master' in desc_lower or 'ms' in desc_lower:
+            if desc_token_set & MASTER_TOKENS:
                 requirements['degree_level'] = 'master'
-            elif 'phd' in desc_lower or 'doctorate' in desc_lower:
+            elif desc_token_set & PHD_TOKENS:
                 requirements['degree_level'] = 'phd'
         
         # Note: GPA requirements are not processed as user doesn't have GPA
         
-        # Extract technical skills with better matching
-        for category, tech_list in self.tech_skills.items():
-            for tech in tech_list:
-                # More flexible matching for technical skills
-                if (tech in desc_lower or 
-                    tech.replace(' ', '') in desc_lower.replace(' ', '') or
-                    any(variant in desc_lower for variant in [tech.upper(), tech.capitalize()])):
-                    requirements['technical_categories'].add(category)
-                    
-                    # Determine if required or preferred
-                    tech_context = self._get_skill_context(desc_lower, tech)
-                    if re.search(self.requirement_patterns['skills_required'], tech_context):
-                        requirements['required_skills'].add(tech)
-                    else:
-                        requirements['preferred_skills'].add(tech)
+        # Extract technical skills: one n-gram lookup pass over the token stream, then classify
+        # every mention by the section it falls in (a skill is required if any mention is)
+        section_starts, section_kinds = _segment_sections(desc_lower)
+        clauses = None
+        found_skills = set()
+        required_skills = requirements['required_skills']
+        for tech, position in self.skill_index.find(desc_tokens):
+            if tech not in found_skills:
+                found_skills.add(tech)
+                requirements['technical_categories'].update(self.skill_index.categories[tech])
+            if tech in required_skills:
+                continue
+            
+            section = bisect_right(section_starts, position) - 1
+            kind = section_kinds[section]
+            if kind == 'unlabelled' or kind == 'responsibilities' or kind == 'other':
+                if clauses is None:
+                    clauses = self._index_clauses(desc_lower)
+                kind = self._classify_by_cue(position, section_starts[section], clauses)
+            if kind == 'required':
+                required_skills.add(tech)
+        
+        requirements['preferred_skills'] = found_skills - required_skills
         
         # Check for remote work
-        requirements['is_remote'] = any(term in desc_lower for term in ['remote', 'work from home', 'distributed'])
+        requirements['is_remote'] = REMOTE_INDEX.mentions(desc_tokens, desc_token_set)
         
         return requirements
     
-    def _get_skill_context(self, text: str, skill: str, context_window: int = 100) -> str:
+    def _experience_levels(self, tokens: List[Tuple[str, int]]) -> set:
+        """Experience levels whose indicator terms appear in the token stream"""
+        categories = self.experience_index.categories
+        return {level for term, _ in self.experience_index.find(tokens) for level in categories[term]}
+    
+    def _index_clauses(self, text: str) -> Tuple[List[int], List[int], List[str]]:
+        """One pass over the text: clause end offsets plus the offsets and kinds of every cue"""
+        clause_ends = [match.start() for match in _CLAUSE_END_RE.finditer(text)]
+        clause_ends.append(len(text))
+        cue_positions, cue_kinds = [], []
+        for match in self.skill_cue_re.finditer(text):
+            cue_positions.append(match.start())
+            cue_kinds.append('required' if match.group('required') else 'preferred')
+        return clause_ends, cue_positions, cue_kinds
+    
+    def _classify_by_cue(self, position: int, section_start: int, clauses) -> str:
         """
-        Get surrounding context for a skill mention to determine if it's required or preferred
+        Classify a skill mention by the nearest required/preferred cue in its clause
+        (defaults to preferred, as when no cue is present)
         """
-        skill_pos = text.find(skill)
-        if skill_pos == -1:
-            return ""
-        
-        start = max(0, skill_pos - context_window)
-        end = min(len(text), skill_pos + len(skill) + context_window)
+        clause_ends, cue_positions, cue_kinds = clauses
+        clause = bisect_left(clause_ends, position)
+        start = max(section_start, clause_ends[clause - 1] + 1 if clause > 0 else 0)
+        end = clause_ends[clause]
         
-        return text[start:end]
+        kind, distance = 'preferred', None
+        nearest = bisect_left(cue_positions, position)
+        for cue in (nearest - 1, nearest):
+            if 0 <= cue < len(cue_positions) and start <= cue_positions[cue] < end:
+                cue_distance = abs(cue_positions[cue] - position)
+                if distance is None or cue_distance < distance:
+                    kind, distance = cue_kinds[cue], cue_distance
+        return kind
+    
     #Overall Compatibility = (Technical × 40%) + (Experience × 35%) + (Education × 25%)
     def calculate_compatibility_score(self, resume_analysis: dict, job_requirements: dict) -> dict:
         """
@@ -319,25 +522,32 @@ class SmartMatchingEngine:
         Returns:
             Dictionary with detailed scoring breakdown
         """
-        scores = {
-            'technical_skills_score': 0.0,
-            'experience_level_score': 0.0,
-            'education_score': 0.0,
-            'overall_compatibility': 0.0,
-            'detailed_breakdown': {}
-        }
-        
         # Technical Skills Score (40% weight)
         technical_score = self._calculate_technical_score(resume_analysis, job_requirements)
-        scores['technical_skills_score'] = technical_score
         
         # Experience Level Score (35% weight)
         experience_score = self._calculate_experience_score(resume_analysis, job_requirements)
-        scores['experience_level_score'] = experience_score
         
         # Education Score (25% weight)
         education_score = self._calculate_education_score(resume_analysis, job_requirements)
-        scores['education_score'] = education_score
+        
+        return self.build_compatibility_scores(
+            resume_analysis, job_requirements, technical_score, experience_score, education_score
+        )
+    
+    def build_compatibility_scores(self, resume_analysis: dict, job_requirements: dict,
+                                   technical_score: float, experience_score: float, education_score: float) -> dict:
+        """
+        Assemble the compatibility dict from already computed component scores
+        (used by calculate_compatibility_score and to expand rows returned by score_many)
+        """
+        scores = {
+            'technical_skills_score': technical_score,
+            'experience_level_score': experience_score,
+            'education_score': education_score,
+            'overall_compatibility': 0.0,
+            'detailed_breakdown': {}
+        }
         
         # Calculate weighted overall score
         scores['overall_compatibility'] = (
@@ -372,10 +582,11 @@ class SmartMatchingEngine:
         if not job['required_skills'] and not job['preferred_skills']:
             return 85.0  # Benefit of doubt if no specific skills listed
         
-        required_match = len(resume['skills'].intersection(job['required_skills']))
+        resume_skills = resume['skills'] | resume.get('normalized_skills', set())
+        required_match = len(resume_skills.intersection(job['required_skills']))
         required_total = len(job['required_skills'])
         
-        preferred_match = len(resume['skills'].intersection(job['preferred_skills']))
+        preferred_match = len(resume_skills.intersection(job['preferred_skills']))
         preferred_total = len(job['preferred_skills'])
         
         # Calculate weighted score
@@ -401,10 +612,8 @@ class SmartMatchingEngine:
     
     def _calculate_experience_score(self, resume: dict, job: dict) -> float:
         """Calculate experience level compatibility (0-100)"""
-        experience_levels = {'entry_level': 0, 'mid_level': 1, 'senior_level': 2}
-        
-        resume_level = experience_levels.get(resume['experience_level'], 0)
-        required_level = experience_levels.get(job['experience_level'], 0)
+        resume_level = EXPERIENCE_LEVELS.get(resume['experience_level'], 0)
+        required_level = EXPERIENCE_LEVELS.get(job['experience_level'], 0)
         
         # Perfect match
         if resume_level == required_level:
@@ -433,10 +642,8 @@ class SmartMatchingEngine:
         if not resume['has_degree']:
             return 30.0  # Low score if degree required but not present
         
-        education_levels = {'high_school': 0, 'bachelor': 1, 'master': 2, 'phd': 3}
-        
-        resume_level = education_levels.get(resume['education_level'], 0)
-        required_level = education_levels.get(job['degree_level'], 1)
+        resume_level = EDUCATION_LEVELS.get(resume['education_level'], 0)
+        required_level = EDUCATION_LEVELS.get(job['degree_level'], 1)
         
         if resume_level >= required_level:
             return 100.0  # Perfect match
@@ -447,10 +654,11 @@ class SmartMatchingEngine:
     
     def _get_technical_details(self, resume: dict, job: dict) -> dict:
         """Get detailed technical skills breakdown"""
+        resume_skills = resume['skills'] | resume.get('normalized_skills', set())
         return {
-            'matching_required_skills': list(resume['skills'].intersection(job['required_skills'])),
-            'missing_required_skills': list(job['required_skills'] - resume['skills']),
-            'matching_preferred_skills': list(resume['skills'].intersection(job['preferred_skills'])),
+            'matching_required_skills': list(resume_skills.intersection(job['required_skills'])),
+            'missing_required_skills': list(job['required_skills'] - resume_skills),
+            'matching_preferred_skills': list(resume_skills.intersection(job['preferred_skills'])),
             'your_technical_categories': list(resume['technical_categories']),
             'job_technical_categories': list(job['technical_categories'])
         }
@@ -498,19 +706,13 @@ class SmartMatchingEngine:
         
         # Market competition factor (estimated)
         competition_factor = additional_factors.get('competition_level', 'medium')
-        competition_multiplier = {
-            'low': 1.2,     # 20% boost for low competition
-            'medium': 1.0,   # No change
-            'high': 0.8      # 20% penalty for high competition
-        }.get(competition_factor, 1.0)
+        # 20% boost for low competition, 20% penalty for high competition
+        competition_multiplier = COMPETITION_MULTIPLIERS.get(competition_factor, 1.0)
         
         # Application timing factor
         timing_factor = additional_factors.get('application_timing', 'normal')
-        timing_multiplier = {
-            'early': 1.15,   # 15% boost for early applications
-            'normal': 1.0,   # No change
-            'late': 0.9      # 10% penalty for late applications
-        }.get(timing_factor, 1.0)
+        # 15% boost for early applications, 10% penalty for late applications
+        timing_multiplier = TIMING_MULTIPLIERS.get(timing_factor, 1.0)
         
         # Calculate final probability (increased base weight from 60% to 70%)
         raw_probability = (
@@ -594,4 +796,238 @@ class SmartMatchingEngine:
         if not suggestions:
             suggestions.append("✅ Your profile looks strong! Consider applying early to improve chances.")
         
-        return suggestions[:4]  # Limit to top 4 suggestions
\ No newline at end of file
+        return suggestions[:4]  # Limit to top 4 suggestions
+    
+    def encode_jobs(self, job_requirements_list: List[dict]) -> dict:
+        """
+        Encode extracted job requirements as NumPy arrays for score_many
+        
+        The encoding does not depend on the resume, so a saved backlog can be encoded
+        once and re-scored against any resume without touching the per-job dicts again.
+        
+        Args:
+            job_requirements_list: Outputs of extract_job_requirements
+            
+        Returns:
+            Dictionary of aligned arrays (one row per job); the skill matrices are
+            boolean (one byte per job and taxonomy skill)
+        """
+        job_count = len(job_requirements_list)
+        columns = self.skill_columns
+        required = np.zeros((job_count, len(columns)), dtype=bool)
+        preferred = np.zeros((job_count, len(columns)), dtype=bool)
+        
+        # Collect (row, column) coordinates first and set them with one fancy-indexed assignment per matrix
+        required_cells = ([], [])
+        preferred_cells = ([], [])
+        for row, job in enumerate(job_requirements_list):
+            for skills, cells in ((job['required_skills'], required_cells), (job['preferred_skills'], preferred_cells)):
+                for tech in skills:
+                    if tech in columns:
+                        cells[0].append(row)
+                        cells[1].append(columns[tech])
+        required[required_cells] = True
+        preferred[preferred_cells] = True
+        
+        return {
+            'required': required,
+            'preferred': preferred,
+            'required_total': np.count_nonzero(required, axis=1),
+            'preferred_total': np.count_nonzero(preferred, axis=1),
+            'wants_languages': np.array(
+                ['programming_languages' in job['technical_categories'] for job in job_requirements_list], dtype=bool
+            ),
+            'experience_level': np.array(
+                [EXPERIENCE_LEVELS.get(job['experience_level'], 0) for job in job_requirements_list], dtype=np.intp
+            ),
+            'education_required': np.array(
+                [bool(job['education_required']) for job in job_requirements_list], dtype=bool
+            ),
+            'degree_level': np.array(
+                [EDUCATION_LEVELS.get(job['degree_level'], 1) for job in job_requirements_list], dtype=np.intp
+            )
+        }
+    
+    def score_many(self, resume_analysis: dict, jobs, competition_levels: List[str] = None,
+                   application_timing: List[str] = None) -> np.ndarray:
+        """
+        Score one resume against many jobs in a single vectorised pass
+        
+        Produces the same technical/experience/education/overall numbers as
+        calculate_compatibility_score and the same acceptance_probability as
+        calculate_acceptance_probability, without building per-job dicts.
+        
+        Args:
+            resume_analysis: Output of analyze_resume
+            jobs: List of extract_job_requirements outputs, or the result of encode_jobs
+            competition_levels: Optional per-job 'low'/'medium'/'high'
+            application_timing: Optional per-job 'early'/'normal'/'late'
+            
+        Returns:
+            Structured array with SCORE_DTYPE fields, one row per job
+        """
+        encoded = jobs if isinstance(jobs, dict) else self.encode_jobs(jobs)
+        job_count = len(encoded['experience_level'])
+        results = np.zeros(job_count, dtype=SCORE_DTYPE)
+        if job_count == 0:
+            return results
+        
+        results['technical'] = self._technical_scores(resume_analysis, encoded)
+        results['experience'] = self._experience_scores(resume_analysis, encoded)
+        results['education'] = self._education_scores(resume_analysis, encoded)
+        self._combine_scores(results, competition_levels, application_timing)
+        return results
+    
+    def rescore_many(self, scores: np.ndarray, encoded: dict, previous_analysis: dict, resume_analysis: dict,
+                     competition_levels: List[str] = None, application_timing: List[str] = None) -> Tuple[np.ndarray, dict]:
+        """
+        Update score_many results after a resume change, recomputing only what the change affects
+        
+        Technical scores are recomputed only for jobs that mention an added or removed
+        skill (all jobs if the resume gained or lost its programming languages);
+        experience and education columns only if those resume levels changed. Overall and
+        acceptance are then recombined in one vectorised pass. The result equals
+        score_many(resume_analysis, encoded, ...).
+        
+        Args:
+            scores: Previous score_many output for the same encoded jobs
+            encoded: encode_jobs output the scores were computed from
+            previous_analysis / resume_analysis: analyze_resume outputs before and after the change
+            
+        Returns:
+            (new scores, {'changes': diff_resume_analysis output, 'technical_rows': jobs recomputed})
+        """
+        changes = diff_resume_analysis(previous_analysis, resume_analysis)
+        results = scores.copy()
+        technical_rows = 0
+        if len(results) == 0 or not any(changes.values()):
+            return results, {'changes': changes, 'technical_rows': technical_rows}
+        
+        if changes['languages']:
+            rows = np.arange(len(results))
+        else:
+            changed_columns = [self.skill_columns[tech] for tech in changes['skills'] if tech in self.skill_columns]
+            rows = np.flatnonzero(
+                encoded['required'][:, changed_columns].any(axis=1) | encoded['preferred'][:, changed_columns].any(axis=1)
+            ) if changed_columns else np.arange(0)
+        if len(rows):
+            results['technical'][rows] = self._technical_scores(resume_analysis, encoded, rows)
+            technical_rows = len(rows)
+        if changes['experience']:
+            results['experience'] = self._experience_scores(resume_analysis, encoded)
+        if changes['education']:
+            results['education'] = self._education_scores(resume_analysis, encoded)
+        
+        self._combine_scores(results, competition_levels, application_timing)
+        return results, {'changes': changes, 'technical_rows': technical_rows}
+    
+    def _technical_scores(self, resume_analysis: dict, encoded: dict, rows: np.ndarray = None) -> np.ndarray:
+        """Technical skills column for all jobs, or only the given rows"""
+        select = slice(None) if rows is None else rows
+        
+        # Matches are matrix-vector products against the resume skill vector; only the
+        # resume's columns are cast to float, never the whole boolean matrix
+        resume_skills = resume_analysis['skills'] | resume_analysis.get('normalized_skills', set())
+        resume_columns = sorted({self.skill_columns[tech] for tech in resume_skills if tech in self.skill_columns})
+        resume_vector = np.ones(len(resume_columns), dtype=np.float64)
+        
+        required_total = encoded['required_total'][select]
+        preferred_total = encoded['preferred_total'][select]
+        required_matches = encoded['required'][:, resume_columns][select].astype(np.float64) @ resume_vector
+        preferred_matches = encoded['preferred'][:, resume_columns][select].astype(np.float64) @ resume_vector
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required_score = np.where(required_total > 0, required_matches / required_total * 100, 100.0)
+            preferred_score = np.where(preferred_total > 0, preferred_matches / preferred_total * 100, 100.0)
+        technical = required_score * 0.7 + preferred_score * 0.3
+        if resume_analysis['programming_languages']:
+            technical = np.where(encoded['wants_languages'][select], np.minimum(100.0, technical + 10), technical)
+        technical = np.where((required_total + preferred_total) == 0, 85.0, technical)
+        return _round_scores(technical)
+    
+    def _experience_scores(self, resume_analysis: dict, encoded: dict) -> np.ndarray:
+        """Experience level: table lookup by (resume level, required level)"""
+        resume_experience = EXPERIENCE_LEVELS.get(resume_analysis['experience_level'], 0)
+        return EXPERIENCE_SCORE_TABLE[resume_experience, encoded['experience_level']]
+    
+    def _education_scores(self, resume_analysis: dict, encoded: dict) -> np.ndarray:
+        if resume_analysis['has_degree']:
+            resume_education = EDUCATION_LEVELS.get(resume_analysis['education_level'], 0)
+            degree_level = encoded['degree_level']
+            degree_score = np.select(
+                [resume_education >= degree_level, resume_education == degree_level - 1],
+                [100.0, 80.0],
+                60.0
+            )
+        else:
+            degree_score = np.full(len(encoded['degree_level']), 30.0)
+        return np.where(encoded['education_required'], degree_score, 95.0)
+    
+    def _combine_scores(self, results: np.ndarray, competition_levels: List[str] = None,
+                        application_timing: List[str] = None):
+        """Fill overall and acceptance from the three component columns (in place)"""
+        results['overall'] = results['technical'] * 0.40 + results['experience'] * 0.35 + results['education'] * 0.25
+        
+        # Acceptance probability (same constraints as calculate_acceptance_probability)
+        competition = np.array(
+            [COMPETITION_MULTIPLIERS.get(level, 1.0) for level in competition_levels] if competition_levels else 1.0
+        )
+        timing = np.array(
+            [TIMING_MULTIPLIERS.get(timing, 1.0) for timing in application_timing] if application_timing else 1.0
+        )
+        raw_probability = results['overall'] * 0.70 * competition * timing
+        final_probability = np.select(
+            [raw_probability >= 90, raw_probability >= 80, raw_probability >= 70],
+            [np.minimum(85.0, raw_probability), raw_probability * 0.95, raw_probability * 0.90],
+            raw_probability * 0.85
+        )
+        results['acceptance'] = _round_scores(final_probability)
+    
+    def score_jobs(self, resume_analysis: dict, jobs: List[dict], competition_levels: List[str] = None,
+                   workers: int = None, chunk_size: int = PARALLEL_CHUNK_SIZE,
+                   min_parallel: int = PARALLEL_MIN_JOBS) -> Tuple[List[dict], np.ndarray]:
+        """
+        Extract requirements for raw postings and score them, sharded across processes
+        
+        Only (job_title, job_description) pairs and the resume analysis are pickled to the
+        workers, and each chunk comes back as its requirements plus a SCORE_DTYPE array, so
+        results stay in input order. Small inputs (or workers=1) run serially in-process.
+        
+        Args:
+            resume_analysis: Output of analyze_resume
+            jobs: Postings with 'job_title' and 'job_description'
+            competition_levels: Optional per-job 'low'/'medium'/'high'
+            workers: Process count (defaults to SCORING_WORKERS)
+            chunk_size: Jobs per task sent to a worker
+            min_parallel: Inputs smaller than this are scored serially
+            
+        Returns:
+            (extract_job_requirements output per job, structured array with SCORE_DTYPE fields)
+        """
+        postings = [(job.get('job_title', '') or '', job.get('job_description', '') or '') for job in jobs]
+        levels = competition_levels or ['medium'] * len(postings)
+        workers = workers or SCORING_WORKERS
+        
+        if workers <= 1 or len(postings) < min_parallel:
+            requirements = [self.extract_job_requirements(description, title) for title, description in postings]
+            return requirements, self.score_many(resume_analysis, requirements, levels)
+        
+        try:
+            pool = _get_process_pool(workers)
+            futures = [
+                pool.submit(_score_chunk, resume_analysis, postings[start:start + chunk_size],
+                            levels[start:start + chunk_size], self.taxonomy.version, self.taxonomy.path)
+                for start in range(0, len(postings), chunk_size)
+            ]
+            requirements, scores = [], []
+            for future in futures:
+                chunk_requirements, chunk_scores = future.result()
+                requirements += chunk_requirements
+                scores.append(chunk_scores)
+            return requirements, np.concatenate(scores)
+        except Exception as e:
+            print(f"[ERROR] Parallel scoring failed, falling back to serial: {str(e)}")
+            with _PROCESS_POOLS_LOCK:
+                broken_pool = _PROCESS_POOLS.pop(workers, None)
+            if broken_pool is not None:
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+            return self.score_jobs(resume_analysis, jobs, competition_levels, workers=1)
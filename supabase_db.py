@@ -4,25 +4,62 @@ from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
 import time
 import re
-import streamlit as st
-
-# Try to import from config, fallback to environment variables or Streamlit secrets
-try:
-    from config import SUPABASE_URL, SUPABASE_KEY
-except ImportError:
-    # Try Streamlit secrets first, then environment variables
-    try:
-        SUPABASE_URL = st.secrets.get("SUPABASE_URL") or os.getenv("SUPABASE_URL")
-        SUPABASE_KEY = st.secrets.get("SUPABASE_ANON_KEY") or st.secrets.get("SUPABASE_KEY") or os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
-    except:
-        # If Streamlit secrets fail, try environment variables
-        SUPABASE_URL = os.getenv("SUPABASE_URL")
-        SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from posting_index import canonical_job_id
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_supabase_config():
+    """
+    (SUPABASE_URL, SUPABASE_KEY), resolved on first use so importing this module
+    does not require Streamlit: config.py, then Streamlit secrets, then environment variables.
+    """
+    global _config
+    with _config_lock:
+        if _config is None:
+            try:
+                from config import SUPABASE_URL, SUPABASE_KEY
+            except ImportError:
+                # Try Streamlit secrets first, then environment variables
+                try:
+                    import streamlit as st
+                    SUPABASE_URL = st.secrets.get("SUPABASE_URL") or os.getenv("SUPABASE_URL")
+                    SUPABASE_KEY = st.secrets.get("SUPABASE_ANON_KEY") or st.secrets.get("SUPABASE_KEY") or os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
+                except:
+                    # If Streamlit secrets fail, try environment variables
+                    SUPABASE_URL = os.getenv("SUPABASE_URL")
+                    SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
+            _config = (SUPABASE_URL, SUPABASE_KEY)
+        return _config
+
+# get_user_id_by_email (see README) is probed once per process: None until known
+_email_rpc_available = None
+_email_rpc_lock = threading.Lock()
+
+
+def _is_missing_function_error(error):
+    """True when PostgREST reports that the called SQL function does not exist."""
+    return getattr(error, 'code', None) in ('PGRST202', '42883') or 'could not find the function' in str(error).lower()
+
+
+def _mark_email_rpc_missing():
+    """Record that get_user_id_by_email is absent, logging it the first time."""
+    global _email_rpc_available
+    with _email_rpc_lock:
+        if _email_rpc_available is not False:
+            _email_rpc_available = False
+            print("[ERROR] SQL function get_user_id_by_email is missing (see README); "
+                  "email lookups fall back to listing auth users")
+
 
 class SupabaseDB:
     """A class to manage all interactions with the Supabase database."""
     def __init__(self):
         """Initializes the Supabase client."""
+        SUPABASE_URL, SUPABASE_KEY = get_supabase_config()
         if not all([SUPABASE_URL, SUPABASE_KEY]):
             raise ConnectionError("Supabase URL or Key is not set. Check your config.py, environment variables, or Streamlit secrets.")
         
@@ -34,57 +71,96 @@ class SupabaseDB:
         except Exception as e:
             print(f"Supabase initialization error: {str(e)}")
             raise ConnectionError(f"Failed to initialize Supabase client: {e}") from e
+        self._check_email_lookup_function()
+
+    def _check_email_lookup_function(self):
+        """Probe get_user_id_by_email once per process so a missing function is reported at startup."""
+        global _email_rpc_available
+        if _email_rpc_available is not None:
+            return
+        try:
+            self.client.rpc('get_user_id_by_email', {'p_email': ''}).execute()
+        except Exception as e:
+            if _is_missing_function_error(e):
+                _mark_email_rpc_missing()
+                return
+            # The function exists; lookups will report this error themselves
+            print(f"Warning: get_user_id_by_email probe failed: {e}")
+        with _email_rpc_lock:
+            if _email_rpc_available is None:
+                _email_rpc_available = True
+
+    def _find_auth_user_id_by_email(self, email):
+        """
+        Look up the auth user id for an email via the get_user_id_by_email RPC (no user listing).
+        Returns None only when no such user exists; lookup failures raise. Without the
+        SQL function it falls back to scanning the auth admin user list.
+        """
+        if _email_rpc_available is not False:
+            try:
+                response = self.client.rpc('get_user_id_by_email', {'p_email': email}).execute()
+            except Exception as e:
+                if not _is_missing_function_error(e):
+                    raise
+                _mark_email_rpc_missing()
+            else:
+                data = response.data if hasattr(response, 'data') else None
+                if isinstance(data, list):
+                    data = data[0] if data else None
+                if isinstance(data, dict):
+                    data = data.get('id') or data.get('get_user_id_by_email')
+                return data or None
+        return self._find_auth_user_id_by_listing(email)
+
+    def _find_auth_user_id_by_listing(self, email):
+        """Fallback email lookup: page through the auth admin user list."""
+        page = 1
+        while True:
+            response = self.client.auth.admin.list_users(page=page, per_page=1000)
+            users = getattr(response, 'users', response) or []
+            for auth_user in users:
+                if (auth_user.email or '').lower() == email.lower():
+                    return auth_user.id
+            if len(users) < 1000:
+                return None
+            page += 1
 
     def _clean_orphaned_records_by_email(self, email):
-        """Clean up any orphaned profile/subscription records for the given email."""
+        """Clean up orphaned profile/subscription records for the given email only."""
         try:
-            # First, try to find if there are any auth users with this email
-            existing_users = self.client.auth.admin.list_users()
-            user_ids_to_clean = []
+            user_id = self._find_auth_user_id_by_email(email)
+            if not user_id:
+                return
             
-            # Check if email exists in auth but might have orphaned records
-            for auth_user in existing_users.users if hasattr(existing_users, 'users') else []:
-                if auth_user.email == email:
-                    # Check if this user has a valid profile
-                    try:
-                        profile_check = self.client.table('profiles').select('id').eq('id', auth_user.id).execute()
-                        if profile_check.data:
-                            # User exists properly, don't clean
-                            continue
-                    except Exception:
-                        pass
-                    user_ids_to_clean.append(auth_user.id)
+            # A user with a valid profile is properly registered, nothing to clean
+            profile_check = self.client.table('profiles').select('id').eq('id', user_id).execute()
+            if profile_check.data:
+                return
             
-            # Also check for any profiles without corresponding auth users
-            try:
-                # Get profiles that might be orphaned
-                profiles = self.client.table('profiles').select('id').execute()
-                for profile in profiles.data if profiles.data else []:
-                    try:
-                        # Check if auth user exists for this profile
-                        auth_check = self.client.auth.admin.get_user_by_id(profile['id'])
-                        if not auth_check or not getattr(auth_check, 'user', None):
-                            user_ids_to_clean.append(profile['id'])
-                    except Exception:
-                        # If we can't find the auth user, it's probably orphaned
-                        user_ids_to_clean.append(profile['id'])
-            except Exception:
-                pass
-                
-            # Clean up orphaned records
-            for user_id in set(user_ids_to_clean):  # Remove duplicates
-                try:
-                    self.client.table('profiles').delete().eq('id', user_id).execute()
-                except Exception:
-                    pass
-                try:
-                    self.client.table('subscriptions').delete().eq('id', user_id).execute()
-                except Exception:
-                    pass
+            self._delete_user_records([user_id])
                     
         except Exception as e:
             print(f"Warning: Could not clean orphaned records for {email}: {e}")
 
+    def _delete_user_records(self, user_ids):
+        """Delete profile and subscription rows for the given user ids (one request per table)."""
+        if not user_ids:
+            return
+        for table in ('profiles', 'subscriptions'):
+            try:
+                self.client.table(table).delete().in_('id', list(user_ids)).execute()
+            except Exception as e:
+                print(f"Warning: Could not delete {table} rows for {len(user_ids)} users: {e}")
+
+    def _auth_user_missing(self, user_id):
+        """Return True only when the auth API positively reports that the user does not exist."""
+        try:
+            auth_check = self.client.auth.admin.get_user_by_id(user_id)
+            return not auth_check or not getattr(auth_check, 'user', None)
+        except Exception as e:
+            # Transient API errors must never be treated as orphaned users
+            return getattr(e, 'status', None) == 404 or 'not found' in str(e).lower()
+
     def sign_up_user(self, email, password, username, telegram_bot_token=None, telegram_chat_id=None):
         """Signs up a new user, creates their profile, and sets up a default subscription."""
         user = None
@@ -198,16 +274,18 @@ class SupabaseDB:
     def check_user_email_confirmed(self, email):
         """Check if user's email is confirmed."""
         try:
-            # Get user by email
-            users = self.client.auth.admin.list_users()
-            for auth_user in users.users if hasattr(users, 'users') else []:
-                if auth_user.email == email:
-                    return {
-                        "confirmed": auth_user.email_confirmed_at is not None,
-                        "user_id": auth_user.id,
-                        "confirmation_sent_at": getattr(auth_user, 'confirmation_sent_at', None)
-                    }
-            return {"error": "User not found"}
+            user_id = self._find_auth_user_id_by_email(email)
+            if not user_id:
+                return {"error": "User not found"}
+            user_response = self.client.auth.admin.get_user_by_id(user_id)
+            auth_user = getattr(user_response, 'user', None)
+            if not auth_user:
+                return {"error": "User not found"}
+            return {
+                "confirmed": auth_user.email_confirmed_at is not None,
+                "user_id": auth_user.id,
+                "confirmation_sent_at": getattr(auth_user, 'confirmation_sent_at', None)
+            }
         except Exception as e:
             return {"error": f"Error checking confirmation status: {str(e)}"}
     
@@ -318,37 +396,102 @@ class SupabaseDB:
                 return {"error": "duplicate", "message": "You have already saved this internship."}
             return {"error": str(e)}
 
+    def get_existing_internship_keys(self, user_id: str):
+        """
+        Prefetch the duplicate-detection keys of all of a user's internships in one paginated select.
+        Links are compared by canonical_job_id, so tracking parameters do not hide duplicates.
+        """
+        links = set()
+        title_company_pairs = set()
+        batch_size = 1000
+        current_offset = 0
+        while True:
+            response = (
+                self.client.table('internships')
+                .select('application_link, job_title, company_name')
+                .eq('user_id', user_id)
+                .limit(batch_size)
+                .offset(current_offset)
+                .execute()
+            )
+            batch_data = response.data or []
+            for row in batch_data:
+                if row.get('application_link'):
+                    links.add(canonical_job_id(row))
+                if row.get('job_title') and row.get('company_name'):
+                    title_company_pairs.add((row['job_title'], row['company_name']))
+            if len(batch_data) < batch_size:
+                break
+            current_offset += batch_size
+        return {'links': links, 'title_company_pairs': title_company_pairs}
+
+    def add_internships_bulk(self, user_id: str, jobs: list, chunk_size: int = 500):
+        """
+        Insert many internships for a user with the same duplicate rules as add_internship
+        (links compared by canonical_job_id), using one prefetch of existing keys and one
+        INSERT per chunk instead of two SELECTs and an INSERT per job.
+        """
+        try:
+            existing = self.get_existing_internship_keys(user_id)
+            seen_links = existing['links']
+            seen_pairs = existing['title_company_pairs']
+
+            new_records = []
+            duplicate_count = 0
+            for job in jobs:
+                link_id = canonical_job_id(job) if job.get('application_link') else None
+                title_company = (job.get('job_title', ''), job.get('company_name', ''))
+                if (link_id and link_id in seen_links) or (all(title_company) and title_company in seen_pairs):
+                    duplicate_count += 1
+                    continue
+                if link_id:
+                    seen_links.add(link_id)
+                if all(title_company):
+                    seen_pairs.add(title_company)
+                new_records.append({**job, 'user_id': user_id})
+
+            inserted = []
+            for i in range(0, len(new_records), chunk_size):
+                response = self.client.table('internships').insert(new_records[i:i + chunk_size]).execute()
+                inserted.extend(response.data or [])
+
+            print(f"[DEBUG] add_internships_bulk: {len(inserted)} inserted, {duplicate_count} duplicates for user {user_id}")
+            return {'success': True, 'inserted': inserted, 'duplicate_count': duplicate_count}
+        except Exception as e:
+            print(f"[ERROR] add_internships_bulk failed: {str(e)}")
+            return {'error': str(e)}
+
     def mark_internship_as_notified(self, internship_id: str):
         """Mark an internship as notified to prevent duplicate notifications"""
+        return self.mark_notified([internship_id])
+
+    def mark_notified(self, internship_ids):
+        """Mark several internships as notified with a single UPDATE ... WHERE id IN (...)"""
+        ids = [internship_id for internship_id in dict.fromkeys(internship_ids or []) if internship_id is not None]
+        if not ids:
+            return {'success': True, 'updated_count': 0}
         try:
-            response = self.client.table('internships').update({'notified': True}).eq('id', internship_id).execute()
-            return {'success': True}
+            response = self.client.table('internships').update({'notified': True}).in_('id', ids).execute()
+            updated_count = len(response.data) if hasattr(response, 'data') and response.data else 0
+            return {'success': True, 'updated_count': updated_count}
         except Exception as e:
-            print(f"[ERROR] Failed to mark internship as notified: {str(e)}")
+            print(f"[ERROR] Failed to mark internships as notified: {str(e)}")
             return {'error': str(e)}
     
-    def get_unnotified_internships(self, user_id: str):
-        """Get all internships that haven't been notified yet"""
+    def get_unnotified_internships(self, user_id: str, columns: str = 'id, job_title, company_name, application_link, job_description'):
+        """Get all internships that haven't been notified yet (notified is false or NULL) in one query"""
         try:
-            # First try to get internships where notified is explicitly False
-            response = self.client.table('internships').select('*').eq('user_id', user_id).eq('notified', False).execute()
-            unnotified = response.data if hasattr(response, 'data') else response
-            
-            # Also get internships where notified is NULL (existing records before the update)
-            response_null = self.client.table('internships').select('*').eq('user_id', user_id).is_('notified', 'null').execute()
-            null_notified = response_null.data if hasattr(response_null, 'data') else response_null
-            
-            # Combine both lists and remove duplicates
-            all_unnotified = unnotified + null_notified
-            seen_ids = set()
-            unique_unnotified = []
-            for internship in all_unnotified:
-                if internship['id'] not in seen_ids:
-                    seen_ids.add(internship['id'])
-                    unique_unnotified.append(internship)
-            
-            print(f"[DEBUG] Found {len(unique_unnotified)} unnotified internships (explicitly false: {len(unnotified)}, null: {len(null_notified)})")
-            return unique_unnotified
+            response = (
+                self.client.table('internships')
+                .select(columns)
+                .eq('user_id', user_id)
+                .or_('notified.is.false,notified.is.null')
+                .execute()
+            )
+            unnotified = response.data if hasattr(response, 'data') and response.data else []
+            
+            print(f"[DEBUG] Found {len(unnotified)} unnotified internships")
+            return unnotified
             
         except Exception as e:
             print(f"[ERROR] Failed to get unnotified internships: {str(e)}")
@@ -441,6 +584,52 @@ class SupabaseDB:
             print(f"Error getting internships count: {e}")
             return 0
 
+    def get_internship_stats(self, user_id: str):
+        """
+        Get internship counts per status, per source site and per day in one round trip.
+
+        Uses the internship_stats RPC (grouped server-side, see README). If the RPC is not
+        installed, falls back to aggregating a narrow status/source_site/created_at projection.
+        """
+        stats = {'total': 0, 'by_status': {}, 'by_source': {}, 'by_day': {}}
+        if not user_id:
+            return stats
+        try:
+            response = self.client.rpc('internship_stats', {'p_user_id': user_id}).execute()
+            if isinstance(response.data, dict):
+                return {**stats, **response.data}
+        except Exception as e:
+            print(f"[DEBUG] internship_stats RPC unavailable, aggregating client-side: {e}")
+
+        try:
+            batch_size = 1000
+            current_offset = 0
+            while True:
+                response = (
+                    self.client.table('internships')
+                    .select('status, source_site, created_at')
+                    .eq('user_id', user_id)
+                    .limit(batch_size)
+                    .offset(current_offset)
+                    .execute()
+                )
+                batch_data = response.data or []
+                for row in batch_data:
+                    status = row.get('status') or 'new'
+                    source = row.get('source_site') or 'Unknown'
+                    day = (row.get('created_at') or '')[:10] or 'Unknown'
+                    stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+                    stats['by_source'][source] = stats['by_source'].get(source, 0) + 1
+                    stats['by_day'][day] = stats['by_day'].get(day, 0) + 1
+                stats['total'] += len(batch_data)
+                if len(batch_data) < batch_size:
+                    break
+                current_offset += batch_size
+            return stats
+        except Exception as e:
+            print(f"Error getting internship stats: {e}")
+            return stats
+
     def update_internship_status(self, user_id: str, internship_id: int, new_status: str):
         """Updates the status of a specific internship for a user."""
         try:
@@ -558,38 +747,92 @@ class SupabaseDB:
             print(f"Error changing password: {e}")
             return {"error": f"An error occurred: {str(e)}"}
     
-    def manual_cleanup_orphaned_records(self):
-        """Manual cleanup method for orphaned records. Use carefully."""
+    def reconcile_orphaned_records(self, batch_size=200, max_workers=4, progress_callback=None, should_stop=None):
+        """
+        Remove profile/subscription rows whose auth user no longer exists.
+
+        Profiles are walked with keyset pagination (ordered by id) so deletions never shift
+        the pages, auth lookups run on a bounded thread pool, and each batch of orphans is
+        deleted with one request per table. progress_callback(scanned, cleaned) is called
+        after every batch; should_stop() lets a background runner cancel between batches.
+        """
+        scanned = 0
+        cleaned = 0
+        last_id = None
         try:
-            cleanup_count = 0
-            
-            # Get all profiles
-            profiles = self.client.table('profiles').select('id').execute()
-            
-            for profile in profiles.data if profiles.data else []:
-                try:
-                    # Check if auth user exists for this profile
-                    auth_check = self.client.auth.admin.get_user_by_id(profile['id'])
-                    if not auth_check or not getattr(auth_check, 'user', None):
-                        # Orphaned profile, clean it up
-                        self.client.table('profiles').delete().eq('id', profile['id']).execute()
-                        self.client.table('subscriptions').delete().eq('id', profile['id']).execute()
-                        cleanup_count += 1
-                        print(f"Cleaned up orphaned records for user ID: {profile['id']}")
-                except Exception:
-                    # If we can't find the auth user, it's probably orphaned
-                    try:
-                        self.client.table('profiles').delete().eq('id', profile['id']).execute()
-                        self.client.table('subscriptions').delete().eq('id', profile['id']).execute()
-                        cleanup_count += 1
-                        print(f"Cleaned up orphaned records for user ID: {profile['id']}")
-                    except Exception as del_e:
-                        print(f"Could not clean up orphaned record {profile['id']}: {del_e}")
-                        
-            print(f"Manual cleanup completed. Cleaned {cleanup_count} orphaned records.")
-            return {"success": True, "cleaned": cleanup_count}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    if should_stop and should_stop():
+                        break
+                    query = self.client.table('profiles').select('id').order('id').limit(batch_size)
+                    if last_id is not None:
+                        query = query.gt('id', last_id)
+                    response = query.execute()
+                    batch_ids = [row['id'] for row in (response.data or [])]
+                    if not batch_ids:
+                        break
+                    
+                    missing_flags = list(executor.map(self._auth_user_missing, batch_ids))
+                    orphan_ids = [user_id for user_id, missing in zip(batch_ids, missing_flags) if missing]
+                    self._delete_user_records(orphan_ids)
+                    
+                    scanned += len(batch_ids)
+                    cleaned += len(orphan_ids)
+                    last_id = batch_ids[-1]
+                    if progress_callback:
+                        progress_callback(scanned, cleaned)
+                    if len(batch_ids) < batch_size:
+                        break
             
+            print(f"Orphan reconciliation completed. Scanned {scanned} profiles, cleaned {cleaned} orphaned records.")
+            return {"success": True, "scanned": scanned, "cleaned": cleaned}
         except Exception as e:
-            print(f"Error during manual cleanup: {e}")
-            return {"error": f"Cleanup failed: {str(e)}"}
+            print(f"Error during orphan reconciliation: {e}")
+            return {"error": f"Cleanup failed: {str(e)}", "scanned": scanned, "cleaned": cleaned}
+
+    def manual_cleanup_orphaned_records(self, batch_size=200, max_workers=4):
+        """Manual cleanup method for orphaned records. Use carefully."""
+        return self.reconcile_orphaned_records(batch_size=batch_size, max_workers=max_workers)
+
+
+class OrphanCleanupJob:
+    """Runs SupabaseDB.reconcile_orphaned_records on a daemon thread and exposes its progress."""
+
+    def __init__(self, db=None, batch_size=200, max_workers=4):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.progress = {'running': False, 'scanned': 0, 'cleaned': 0, 'result': None}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _on_progress(self, scanned, cleaned):
+        self.progress.update({'scanned': scanned, 'cleaned': cleaned})
+        print(f"[INFO] Orphan cleanup progress: {scanned} profiles scanned, {cleaned} cleaned")
+
+    def _run(self):
+        try:
+            db = self.db or SupabaseDB()
+            result = db.reconcile_orphaned_records(
+                batch_size=self.batch_size,
+                max_workers=self.max_workers,
+                progress_callback=self._on_progress,
+                should_stop=self._stop_event.is_set
+            )
+        except Exception as e:
+            result = {"error": f"Cleanup failed: {str(e)}"}
+        self.progress.update({'running': False, 'result': result})
+
+    def start(self):
+        """Start the job in the background; does nothing if it is already running."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+        self.progress.update({'running': True, 'scanned': 0, 'cleaned': 0, 'result': None})
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
 
+    def stop(self):
+        """Ask the job to stop after the current batch."""
+        self._stop_event.set()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
@@ -9,7 +10,7 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
 )
-from supabase_db import get_supabase_client, get_or_create_user_by_telegram_id, add_internship, get_internships_by_user, delete_internship, update_internship_status
+from async_supabase_db import AsyncSupabaseDB
 from scraper import scrape_linkedin
 
 # Import config
@@ -30,35 +31,45 @@ GET_TITLE, GET_COMPANY, GET_LINK, GET_DESCRIPTION, GET_SOURCE_URL, GET_SOURCE_SI
 GET_SCRAPE_QUERY, GET_SCRAPE_LOCATION = range(7, 9)
 
 # --- Constants for Internship Statuses ---
-STATUS_OPTIONS = ["Applied", "Interviewing", "Offer", "Rejected", "Saved"]
+STATUS_OPTIONS = ["New", "Applied", "Rejected"]
+
+# --- Database Helpers ---
+
+def _get_db(context: ContextTypes.DEFAULT_TYPE) -> AsyncSupabaseDB:
+    """Returns the shared async DB client created in post_init."""
+    return context.application.bot_data['db']
+
+async def _get_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Returns the profile linked to this chat, caching it in user_data."""
+    profile = context.user_data.get('profile')
+    if profile:
+        return profile
+    profile = await _get_db(context).get_profile_by_telegram_chat_id(update.effective_chat.id)
+    if profile:
+        context.user_data['profile'] = profile
+    return profile
 
 # --- Bot Handlers ---
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     logger.info(f"/start by {user.username}")
-    supabase = get_supabase_client()
-    if not supabase:
-        await update.message.reply_text("DB connection failed.")
-        return
 
-    profile, is_new = get_or_create_user_by_telegram_id(supabase, {'id': user.id, 'username': user.username})
-    context.user_data['profile'] = profile
+    profile = await _get_profile(update, context)
 
     if profile:
         reply = f"Welcome back, {user.mention_html()}!"
-        if is_new:
-            reply = f"Welcome, {user.mention_html()}! Your account is set up."
         reply += "\n\nUse /add to save an internship or /view to see your list."
         await update.message.reply_html(reply)
     else:
-        await update.message.reply_text("Sorry, could not set up your account.")
+        await update.message.reply_text(
+            "Sorry, this chat is not linked to an account yet. "
+            f"Add chat ID {update.effective_chat.id} in the app's Telegram Settings, then try /start again."
+        )
 
 async def add_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Starts the conversation to add a new internship."""
-    user = update.effective_user
-    supabase = get_supabase_client()
-    profile, _ = get_or_create_user_by_telegram_id(supabase, {'id': user.id, 'username': user.username})
+    profile = await _get_profile(update, context)
     if not profile:
         await update.message.reply_text("Could not find your profile. Please try /start again.")
         return ConversationHandler.END
@@ -94,7 +105,6 @@ async def get_source_url(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def _save_internship(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Helper function to save internship data to the database."""
-    supabase = get_supabase_client()
     profile = context.user_data.get('profile')
 
     job_data = {
@@ -106,10 +116,10 @@ async def _save_internship(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         'source_site': context.user_data.get('source_site'),
     }
 
-    result = add_internship(supabase, profile['id'], job_data)
+    result = await _get_db(context).add_internship(profile['id'], job_data)
 
     if result and 'error' in result:
-        await update.message.reply_text(f"Error: {result['message']}")
+        await update.message.reply_text(f"Error: {result.get('message', result['error'])}")
     elif result:
         await update.message.reply_text("Success! I've saved this internship.")
     else:
@@ -158,21 +168,18 @@ async def get_scrape_location(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Stores location, runs scraper, saves results, and notifies user."""
     location = update.message.text
     query = context.user_data['scrape_query']
-    user = update.effective_user
     
     await update.message.reply_text(f"Scraping for '{query}' in '{location}'. This might take a moment...")
 
-    supabase = get_supabase_client()
-    profile = context.user_data.get('profile')
+    profile = await _get_profile(update, context)
     if not profile:
-        profile, _ = get_or_create_user_by_telegram_id(supabase, {'id': user.id, 'username': user.username})
-        if not profile:
-            await update.message.reply_text("I couldn't find your profile to save the jobs. Please try /start first.")
-            return ConversationHandler.END
+        await update.message.reply_text("I couldn't find your profile to save the jobs. Please try /start first.")
+        return ConversationHandler.END
     
-    scraped_jobs = scrape_linkedin(job_title=query, location=location)
+    # Selenium scraping is blocking, so keep it off the event loop
+    scraped_jobs = await asyncio.to_thread(scrape_linkedin, job_title=query, location=location)
     
-    if not scraped_jobs:
+    if isinstance(scraped_jobs, dict) or not scraped_jobs:
         await update.message.reply_text("I couldn't find any new internships with that query. Try a different search.")
         return ConversationHandler.END
         
@@ -180,8 +187,9 @@ async def get_scrape_location(update: Update, context: ContextTypes.DEFAULT_TYPE
     duplicate_count = 0
     error_count = 0
     
+    db = _get_db(context)
     for job in scraped_jobs:
-        result = add_internship(supabase, profile['id'], job)
+        result = await db.add_internship(profile['id'], job)
         if result and 'error' in result and result['error'] == 'duplicate':
             duplicate_count += 1
         elif result:
@@ -218,22 +226,16 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     action = parts[0]
     internship_id = int(parts[1])
 
-    user_id = context.user_data.get('user_id')
-    supabase = get_supabase_client()
-
-    # Ensure user_id is available, fetching if necessary
-    if not user_id:
-        telegram_user = query.from_user
-        user_id, _ = get_or_create_user_by_telegram_id(supabase, telegram_user.id, telegram_user.username)
-        if user_id:
-            context.user_data['user_id'] = user_id
-        else:
-            await query.edit_message_text(text="Error: Could not identify your profile. Please /start again.")
-            return
+    db = _get_db(context)
+    profile = await _get_profile(update, context)
+    if not profile:
+        await query.edit_message_text(text="Error: Could not identify your profile. Please /start again.")
+        return
+    user_id = profile['id']
 
     # --- Handle DELETE action ---
     if action == 'delete':
-        success = delete_internship(supabase, user_id, internship_id)
+        success = await db.delete_internship(user_id, internship_id)
         if success:
             await query.edit_message_text(text="🗑️ Internship has been deleted.")
         else:
@@ -252,8 +254,12 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     # --- Handle SETSTATUS action (apply the new status) ---
     elif action == 'setstatus':
-        new_status = parts[2]
-        updated_job = update_internship_status(supabase, user_id, internship_id, new_status)
+        new_status = parts[2].lower()
+        try:
+            updated_job = await db.update_internship_status(user_id, internship_id, new_status)
+        except Exception as e:
+            logger.error(f"Failed to update status: {e}")
+            updated_job = None
 
         if updated_job:
             # Re-create the original keyboard with Delete and Update buttons
@@ -286,17 +292,13 @@ async def view_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Displays all saved internships for the user."""
     user = update.effective_user
     logger.info(f"/view by {user.username}")
-    supabase = get_supabase_client()
 
-    profile = context.user_data.get('profile')
+    profile = await _get_profile(update, context)
     if not profile:
-        profile, _ = get_or_create_user_by_telegram_id(supabase, {'id': user.id, 'username': user.username})
-        if not profile:
-            await update.message.reply_text("Could not find your profile. Please try /start.")
-            return
-        context.user_data['profile'] = profile
+        await update.message.reply_text("Could not find your profile. Please try /start.")
+        return
 
-    internships = get_internships_by_user(supabase, profile['id'])
+    internships = await _get_db(context).get_internships_by_user(profile['id'])
 
     if not internships:
         await update.message.reply_text("You haven't saved any internships yet. Use /add.")
@@ -321,9 +323,13 @@ async def view_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         )
         await update.message.reply_html(message, reply_markup=reply_markup, disable_web_page_preview=True)
 
+async def post_init(application: Application) -> None:
+    """Creates the shared async DB client once the bot's event loop is running."""
+    application.bot_data['db'] = await AsyncSupabaseDB.create()
+
 def main() -> None:
     """Sets up and runs the bot."""
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = Application.builder().token(TELEGRAM_BOT_TOKEN).post_init(post_init).build()
 
     # Conversation handler for adding internships
     add_conv_handler = ConversationHandler(
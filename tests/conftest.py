@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_matching_engine import SmartMatchingEngine
+
+FILLER_WORDS = (
+    "we are looking for a motivated intern to join our team you will work on backend services "
+    "data pipelines and internal tools must have ability to learn quickly nice to have "
+    "bachelor degree in computer science or related field"
+).split()
+
+SAMPLE_RESUME = {
+    'skills': ['Python', 'SQL', 'Pandas', 'Docker', 'Git', 'React'],
+    'education': [{'degree': 'Bachelor of Computer Science'}],
+    'professional_experience': [{'duration': '2024/06 – 2024/09'}],
+    'projects': [{'name': 'Dashboard'}],
+    'languages': ['English']
+}
+
+
+@pytest.fixture(scope='session')
+def engine():
+    return SmartMatchingEngine()
+
+
+@pytest.fixture
+def sample_resume():
+    return {key: list(value) for key, value in SAMPLE_RESUME.items()}
+
+
+def make_postings(engine, count, seed=7):
+    """Small synthetic postings: filler text plus random taxonomy terms."""
+    rng = random.Random(seed)
+    terms = [tech for techs in engine.tech_skills.values() for tech in techs]
+    postings = []
+    for i in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(60)]
+        for _ in range(rng.randint(3, 12)):
+            words.insert(rng.randrange(len(words)), rng.choice(terms))
+        postings.append({
+            'job_title': rng.choice(["Software Engineer Intern", "Data Science Intern", "Senior Backend Engineer"]),
+            'company_name': f"Company {i % 17}",
+            'application_link': f"https://www.linkedin.com/jobs/view/role-{4000000 + i}",
+            'job_description': " ".join(words)
+        })
+    return postings
+
+
+@pytest.fixture
+def postings(engine):
+    return make_postings(engine, 120)
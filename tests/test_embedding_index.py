@@ -0,0 +1,20 @@
+from embedding_index import EmbeddingIndex
+
+
+def test_top_candidates_keeps_unstored_postings_and_never_embeds(postings, sample_resume):
+    index = EmbeddingIndex(path=None)
+    stored, fresh = postings[:80], postings[80:]
+    index.add(stored)
+    count = index.stats()['postings']
+
+    candidates = index.top_candidates(postings, sample_resume, limit=20)
+    assert index.stats()['postings'] == count
+    assert candidates == sorted(candidates)
+    assert set(range(80, len(postings))) <= set(candidates)
+    assert len(candidates) == 20 + len(fresh)
+
+
+def test_top_candidates_keeps_everything_below_the_limit(postings, sample_resume):
+    index = EmbeddingIndex(path=None)
+    index.add(postings[:10])
+    assert index.top_candidates(postings, sample_resume, limit=20) == list(range(len(postings)))
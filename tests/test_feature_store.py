@@ -0,0 +1,32 @@
+from feature_store import FeatureStore
+
+
+def test_lookup_store_and_invalidation(tmp_path, engine, postings):
+    store = FeatureStore(path=str(tmp_path / "features.db"))
+    jobs = postings[:20]
+    assert store.lookup(engine, jobs) == [None] * 20
+
+    parsed = [engine.extract_job_requirements(job['job_description'], job['job_title']) for job in jobs]
+    store.store(engine, jobs, parsed)
+    assert store.lookup(engine, jobs) == parsed
+
+    # A changed description is a miss; the same posting without a description reuses its row
+    edited = {**jobs[0], 'job_description': jobs[0]['job_description'] + " Kubernetes required"}
+    title_only = {**jobs[1], 'job_description': ''}
+    assert store.lookup(engine, [edited, title_only]) == [None, parsed[1]]
+
+    # Title-only parses never replace a row parsed from the full description
+    store.store(engine, [title_only], [engine.extract_job_requirements('', title_only['job_title'])])
+    assert store.lookup(engine, [jobs[1]]) == [parsed[1]]
+    assert store.stats()['rows'] == 20
+
+
+def test_requirements_for_parses_only_misses(tmp_path, engine, postings):
+    store = FeatureStore(path=str(tmp_path / "features.db"))
+    store.requirements_for(engine, postings[:10])
+    before = store.stats()
+    store.requirements_for(engine, postings[:15])
+    after = store.stats()
+    assert after['hits'] - before['hits'] == 10
+    assert after['misses'] - before['misses'] == 5
+    assert after['rows'] == 15
@@ -0,0 +1,77 @@
+import time
+
+from ingestion_queue import IngestionQueue, SOURCE_CONTINUOUS, SOURCE_INTERACTIVE
+
+
+class FakeDB:
+    """add_internships_bulk stand-in: fails the first `failures` calls, then inserts everything."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def add_internships_bulk(self, user_id, jobs):
+        if self.failures:
+            self.failures -= 1
+            return {'error': 'supabase unavailable'}
+        self.batches.append((user_id, jobs))
+        return {'inserted': [{**job, 'id': i} for i, job in enumerate(jobs)], 'duplicate_count': 0}
+
+
+def make_queue(tmp_path, db, **kwargs):
+    return IngestionQueue(db=db, path=str(tmp_path / "outbox.db"), **kwargs)
+
+
+def job(job_id, suffix=""):
+    return {'job_title': "Intern", 'company_name': "Acme",
+            'application_link': f"https://www.linkedin.com/jobs/view/intern-{job_id}{suffix}"}
+
+
+def test_duplicate_postings_share_one_outbox_row(tmp_path):
+    queue = make_queue(tmp_path, FakeDB())
+    first = queue.enqueue('u1', [job(1234567)])
+    again = queue.enqueue('u1', [job(1234567, "?refId=abc&trackingId=xyz"), job(1234567)])
+    assert first['queued'] == 1 and again['queued'] == 0
+    assert queue.depth() == 1
+    # The same posting for another user is a separate row
+    assert queue.enqueue('u2', [job(1234567)])['queued'] == 1
+
+
+def test_failed_batches_stay_queued_with_backoff(tmp_path):
+    db = FakeDB(failures=1)
+    queue = make_queue(tmp_path, db, base_backoff=60)
+    queue.enqueue('u1', [job(1111111), job(2222222)])
+
+    result = queue.flush()
+    assert result['failed'] == 2 and queue.depth() == 2
+    attempts, next_attempt = queue._execute("SELECT MAX(attempts), MIN(next_attempt_at) FROM outbox")[0]
+    assert attempts == 1 and next_attempt > time.time() + 30
+    # Not due yet: nothing is retried early
+    assert queue.flush()['inserted'] == 0
+
+    queue._execute("UPDATE outbox SET next_attempt_at = 0")
+    assert queue.flush()['inserted'] == 2
+    assert queue.depth() == 0 and len(db.batches) == 1
+    assert queue.metrics()['failed_batches_total'] == 1
+
+
+def test_backpressure_without_waiting(tmp_path):
+    queue = make_queue(tmp_path, FakeDB(), max_depth=2, enqueue_timeout=5)
+    queue.enqueue('u1', [job(1111111), job(2222222)])
+    started = time.monotonic()
+    result = queue.enqueue('u1', [job(3333333)], timeout=0)
+    assert result['error'] == 'backpressure'
+    assert time.monotonic() - started < 1
+    assert queue.depth() == 2
+
+
+def test_listener_only_sees_its_source(tmp_path):
+    queue = make_queue(tmp_path, FakeDB())
+    notified = []
+    queue.add_flush_listener('u1', lambda user_id, rows: notified.extend(rows), source=SOURCE_CONTINUOUS)
+    queue.enqueue('u1', [job(1111111)], source=SOURCE_INTERACTIVE)
+    queue.flush_all()
+    assert notified == []
+    queue.enqueue('u1', [job(2222222)], source=SOURCE_CONTINUOUS)
+    queue.flush_all()
+    assert [row['application_link'] for row in notified] == [job(2222222)['application_link']]
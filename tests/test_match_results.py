@@ -0,0 +1,54 @@
+import random
+
+from match_results import QUERY_MEMO_SIZE, ResultRanker, ResumeProfile, ScoredJob
+
+PROFILE = ResumeProfile.from_analysis({'skills': {'python'}, 'normalized_skills': {'python'}})
+
+
+def category(compatibility):
+    return 'High Match' if compatibility >= 80 else 'Medium Match' if compatibility >= 60 else 'Low Match'
+
+
+def record(i, compatibility, priority=None):
+    return ScoredJob(
+        job={'job_title': f"Job {i}", 'company_name': f"Company {i % 3}", 'application_link': f"https://x.com/{i}"},
+        requirements={'required_skills': set(), 'preferred_skills': set()},
+        resume=PROFILE,
+        technical_score=compatibility, experience_score=80.0, education_score=95.0,
+        compatibility=compatibility, acceptance_probability=compatibility / 2,
+        recommendation_priority=compatibility if priority is None else priority,
+        match_category=category(compatibility)
+    )
+
+
+def test_top_k_keeps_best_and_summary_counts_everything():
+    rng = random.Random(3)
+    records = [record(i, round(rng.uniform(20, 100), 1)) for i in range(300)]
+    ranker = ResultRanker.from_records(records, top_k=25)
+
+    expected = sorted(records, key=lambda r: r.recommendation_priority, reverse=True)[:25]
+    assert [r.recommendation_priority for r in ranker.ranked()] == [r.recommendation_priority for r in expected]
+
+    summary = ranker.summary()
+    assert summary['total_found'] == 300
+    assert summary['high_match_count'] == sum(r.match_category == 'High Match' for r in records)
+    assert summary['low_match_count'] == sum(r.match_category == 'Low Match' for r in records)
+    assert summary['average_compatibility'] == round(sum(r.compatibility for r in records) / 300, 1)
+
+
+def test_ties_keep_arrival_order():
+    ranker = ResultRanker.from_records([record(i, 70.0) for i in range(5)], top_k=3)
+    assert [r.job_title for r in ranker.ranked()] == ["Job 0", "Job 1", "Job 2"]
+
+
+def test_query_filters_sorts_and_bounds_its_memo():
+    records = [record(i, float(c)) for i, c in enumerate([95, 85, 72, 64, 55, 40])]
+    ranker = ResultRanker.from_records(records)
+
+    assert [r.compatibility for r in ranker.query("Medium Match", 65)] == [72.0]
+    assert [r.compatibility for r in ranker.query(min_compatibility=60, sort_option="Compatibility Score")] == [95, 85, 72, 64]
+    assert [r.company_name for r in ranker.query(sort_option="Company Name")][:2] == ["Company 0", "Company 0"]
+
+    for minimum in range(0, 101):
+        ranker.query(min_compatibility=minimum)
+    assert len(ranker._queries) == QUERY_MEMO_SIZE
@@ -0,0 +1,35 @@
+from posting_index import PostingIndex, build_resume_query, canonical_job_id, posting_key
+
+
+def test_canonical_job_id_ignores_tracking_parameters():
+    base = {'application_link': "https://www.linkedin.com/jobs/view/software-intern-at-acme-3912345678"}
+    tracked = {'application_link': "https://www.linkedin.com/jobs/view/software-intern-at-acme-3912345678?refId=abc&trk=xyz"}
+    current = {'application_link': "https://www.linkedin.com/jobs/search/?currentJobId=3912345678&keywords=intern"}
+    assert canonical_job_id(base) == canonical_job_id(tracked) == canonical_job_id(current) == "linkedin:3912345678"
+    assert posting_key(base) == posting_key(current)
+
+
+def test_canonical_job_id_non_linkedin_and_title_fallback():
+    assert canonical_job_id({'application_link': "https://jobs.example.com/42/?utm_source=x#apply"}) == \
+        canonical_job_id({'application_link': "https://JOBS.example.com/42"})
+    job = {'job_title': " Data  Intern ", 'company_name': "Acme"}
+    assert canonical_job_id(job) == canonical_job_id({'job_title': "data intern", 'company_name': "ACME", 'application_link': None})
+    assert canonical_job_id(job) != canonical_job_id({'job_title': "Data Intern", 'company_name': "Other"})
+
+
+def test_search_ranks_matching_postings_and_skips_unchanged(tmp_path, engine):
+    index = PostingIndex(path=str(tmp_path / "index.db"))
+    jobs = [
+        {'job_title': "Backend Intern", 'company_name': "A", 'application_link': "https://x.com/1",
+         'job_description': "Python and Django services, Docker deployments"},
+        {'job_title': "Design Intern", 'company_name': "B", 'application_link': "https://x.com/2",
+         'job_description': "Figma mockups and user research"},
+    ]
+    assert index.add_postings(jobs)['indexed'] == 2
+    # Search-only fields do not make a posting "changed"
+    assert index.add_postings([{**jobs[0], 'search_context': {'query': 'q'}, 'status': 'new'}])['unchanged'] == 1
+
+    query = build_resume_query(engine.analyze_resume({'skills': ['Python', 'Docker']}))
+    results = index.search(query, limit=5)
+    assert [result['company_name'] for result in results] == ["A"]
+    assert results[0]['index_score'] > 0
@@ -0,0 +1,20 @@
+import time
+
+from rate_limiter import RateLimiter
+
+
+def test_burst_then_rate():
+    limiter = RateLimiter(rate=20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire()
+    assert time.monotonic() - started < 0.05
+    assert limiter.acquire()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_acquire_timeout_returns_the_token():
+    limiter = RateLimiter(rate=1, burst=1)
+    assert limiter.acquire()
+    assert not limiter.acquire(timeout=0.1)
+    assert limiter.stats()['acquired'] == 1
@@ -0,0 +1,37 @@
+import json
+import sqlite3
+
+from recommendations import RecommendationStore
+from smart_matching_engine import resume_scoring_fields
+
+PERSONAL = {'name': "Ada Example", 'email': "ada@example.com", 'phone': "+33 6 00 00 00 00"}
+
+
+def test_scoring_fields_score_like_the_full_resume(engine, sample_resume):
+    full = {**sample_resume, 'personal_information': PERSONAL}
+    fields = resume_scoring_fields(full)
+    assert 'personal_information' not in fields
+    assert resume_scoring_fields(fields) == fields
+    assert engine._analyze_resume(fields) == engine._analyze_resume(full)
+
+
+def test_store_keeps_only_scoring_fields(tmp_path, sample_resume):
+    store = RecommendationStore(path=str(tmp_path / "recommendations.db"))
+    full = {**sample_resume, 'personal_information': PERSONAL}
+    store.save_resume('u1', full)
+    assert dict(store.resumes()) == {'u1': resume_scoring_fields(full)}
+    assert store.has_resume('u1', full)
+    assert not store.has_resume('u1', {**full, 'skills': ['Go']})
+
+
+def test_resumes_stored_in_full_are_stripped_on_open(tmp_path, sample_resume):
+    path = tmp_path / "recommendations.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE resumes (user_id TEXT PRIMARY KEY, resume TEXT NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO resumes VALUES ('u1', ?, 0)", (json.dumps({**sample_resume, 'personal_information': PERSONAL}),))
+    conn.commit()
+    conn.close()
+
+    store = RecommendationStore(path=str(path))
+    assert dict(store.resumes()) == {'u1': resume_scoring_fields(sample_resume)}
+    assert b"ada@example.com" not in path.read_bytes()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+LEVELS = ['low', 'medium', 'high']
+
+
+@pytest.fixture
+def requirements(engine, postings):
+    return [engine.extract_job_requirements(job['job_description'], job['job_title']) for job in postings]
+
+
+def test_score_many_matches_per_job_scoring(engine, requirements, sample_resume):
+    analysis = engine.analyze_resume(sample_resume)
+    competition = [LEVELS[i % 3] for i in range(len(requirements))]
+    scores = engine.score_many(analysis, requirements, competition)
+
+    for job_requirements, level, row in zip(requirements, competition, scores):
+        compatibility = engine.calculate_compatibility_score(analysis, job_requirements)
+        acceptance = engine.calculate_acceptance_probability(compatibility, {'competition_level': level})
+        assert row['technical'] == compatibility['technical_skills_score']
+        assert row['overall'] == compatibility['overall_compatibility']
+        assert row['acceptance'] == acceptance['acceptance_probability']
+
+
+def test_encoded_skill_matrices_are_boolean(engine, requirements):
+    encoded = engine.encode_jobs(requirements)
+    assert encoded['required'].dtype == bool and encoded['preferred'].dtype == bool
+    assert encoded['required'].shape == (len(requirements), len(engine.skill_columns))
+
+
+@pytest.mark.parametrize('edit', [
+    lambda resume: {**resume, 'skills': resume['skills'] + ['Kubernetes']},
+    lambda resume: {**resume, 'skills': resume['skills'][2:] + ['Go', 'Rust']},
+    lambda resume: {**resume, 'skills': []},
+    lambda resume: {**resume, 'professional_experience': resume['professional_experience'] * 12},
+    lambda resume: {**resume, 'education': resume['education'] + [{'degree': 'Master of Data Science'}]},
+])
+def test_rescore_many_equals_full_scoring(engine, requirements, sample_resume, edit):
+    competition = [LEVELS[i % 3] for i in range(len(requirements))]
+    encoded = engine.encode_jobs(requirements)
+    previous = engine.analyze_resume(sample_resume)
+    current = engine.analyze_resume(edit(sample_resume))
+
+    rescored, _ = engine.rescore_many(engine.score_many(previous, encoded, competition), encoded,
+                                      previous, current, competition)
+    full = engine.score_many(current, encoded, competition)
+    for field in full.dtype.names:
+        np.testing.assert_array_equal(rescored[field], full[field])
+
+
+def test_experience_and_remote_terms_match_whole_tokens(engine):
+    parse = engine.extract_job_requirements
+    assert parse("Python and SQL", "Team Lead, Backend")['experience_level'] == 'senior_level'
+    assert parse("Python and SQL", "Mid-level Developer")['experience_level'] == 'mid_level'
+    assert parse("Leading a pyramid of data", "Midfield Analytics Intern")['experience_level'] == 'entry_level'
+    assert parse("Work-from-home role", "Intern")['is_remote']
+    assert not parse("Remotely managed team, homework", "Intern")['is_remote']
+
+
+def test_skills_match_on_token_boundaries(engine):
+    found = engine.extract_job_requirements("Required: Go and R.", "Intern")['required_skills']
+    assert {'go', 'r'} <= found
+    # "r" inside "organisational" / "react", "java" inside "javascript" are not mentions
+    found = engine.extract_job_requirements("Great organisational skills, React and JavaScript", "Intern")
+    skills = found['required_skills'] | found['preferred_skills']
+    assert {'react', 'javascript'} <= skills
+    assert not skills & {'r', 'go', 'java'}
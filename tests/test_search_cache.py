@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from search_cache import SearchResultCache
+
+
+def slow_fetch(calls, count, delay=0.2):
+    def fetch():
+        calls.append(count)
+        time.sleep(delay)
+        return [{'rank': i} for i in range(count)]
+    return fetch
+
+
+def run_concurrently(cache, requests):
+    """requests: (name, max_results, start_delay); returns name -> number of results."""
+    calls, results = [], {}
+
+    def worker(name, max_results, delay):
+        time.sleep(delay)
+        results[name] = len(cache.get_or_fetch("Data Intern", "Paris", False, max_results,
+                                               slow_fetch(calls, max_results)))
+
+    threads = [threading.Thread(target=worker, args=request) for request in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return calls, results
+
+
+def test_concurrent_identical_searches_fetch_once():
+    cache = SearchResultCache()
+    calls, results = run_concurrently(cache, [(f"w{i}", 10, 0.01 * i) for i in range(5)])
+    assert calls == [10]
+    assert set(results.values()) == {10}
+    assert cache.stats()['coalesced'] == 4
+
+
+def test_waiter_needing_more_results_fetches_its_own():
+    cache = SearchResultCache()
+    calls, results = run_concurrently(cache, [('small', 10, 0), ('large', 25, 0.05), ('medium', 20, 0.1)])
+    assert sorted(calls) == [10, 25]
+    assert results == {'small': 10, 'large': 25, 'medium': 20}
+    # The larger result is what stays cached
+    assert len(cache.get_or_fetch("data intern", "paris", False, 25, slow_fetch([], 99))) == 25
+
+
+def test_cache_hits_are_normalised_copies_and_errors_are_not_cached():
+    cache = SearchResultCache()
+    first = cache.get_or_fetch("Data  Intern", None, False, 5, lambda: [{'rank': 1}])
+    first[0]['annotated'] = True
+    assert cache.get_or_fetch("data intern", "", False, 5, lambda: pytest.fail("should hit")) == [{'rank': 1}]
+
+    assert cache.get_or_fetch("q", None, False, 5, lambda: {'error': 'blocked'}) == {'error': 'blocked'}
+    assert cache.get_or_fetch("q", None, False, 5, lambda: [{'rank': 2}]) == [{'rank': 2}]
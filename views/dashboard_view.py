@@ -5,7 +5,10 @@ import time
 from dateutil import parser
 import math
 import pandas as pd
+import plotly.express as px
 import io
+from feature_store import get_feature_store
+from smart_matching_engine import SmartMatchingEngine
 from ai_content_generator import (
     generate_email_content, 
     generate_cover_letter_content,
@@ -27,8 +30,17 @@ def parse_date(date_str):
 def force_internships_refresh():
     """Helper function to force refresh of internships data"""
     st.session_state.all_internships = None
+    st.session_state.pop('internship_stats', None)
     st.session_state['force_refresh'] = True
 
+def get_internship_stats(user_id):
+    """Per-status/source/day counts from the server, cached until the internships are reloaded"""
+    if not user_id:
+        return {'total': 0, 'by_status': {}, 'by_source': {}, 'by_day': {}}
+    if st.session_state.get('internship_stats') is None:
+        st.session_state.internship_stats = SupabaseDB().get_internship_stats(user_id)
+    return st.session_state.internship_stats
+
 # Status configurations for consistent UI
 STATUS_INFO = {
     'New': {'color': 'blue', 'emoji': '✨'},
@@ -67,6 +79,7 @@ def delete_internship_directly(user_id, internship_id):
         if result:
             # Clear session state to force refresh from database
             st.session_state.all_internships = None
+            st.session_state.pop('internship_stats', None)
             st.session_state.delete_success = True
             # Force fresh data reload
             if 'user_id' in st.session_state:
@@ -195,10 +208,11 @@ def show_dashboard_page():
     st.markdown("### 📈 Overview")
     col1, col2, col3, col4 = st.columns(4)
     
-    # Calculate statistics
-    total_internships = len(all_internships) if all_internships is not None else 0
-    new_internships = len([i for i in (all_internships or []) if i.get('status') == 'new'])
-    applied_internships = len([i for i in (all_internships or []) if i.get('status') == 'applied'])
+    # Statistics are aggregated server-side in a single round trip
+    stats = get_internship_stats(user_id)
+    total_internships = stats['total']
+    new_internships = stats['by_status'].get('new', 0)
+    applied_internships = stats['by_status'].get('applied', 0)
     
     with col1:
         st.metric("🎯 Total", total_internships)
@@ -210,6 +224,32 @@ def show_dashboard_page():
         resume_status = get_resume_status()
         st.metric("📄 Resume", "Available" if resume_status['has_resume'] else "None")
     
+    if stats['by_day'] or stats['by_source']:
+        with st.expander("📊 Activity", expanded=False):
+            chart_col1, chart_col2 = st.columns(2)
+            with chart_col1:
+                days = sorted(d for d in stats['by_day'] if d != 'Unknown')
+                if days:
+                    fig = px.bar(x=days, y=[stats['by_day'][d] for d in days],
+                                 labels={'x': 'Date added', 'y': 'Internships'}, title="Internships per day")
+                    st.plotly_chart(fig, use_container_width=True)
+            with chart_col2:
+                if stats['by_source']:
+                    fig = px.pie(names=list(stats['by_source'].keys()), values=list(stats['by_source'].values()),
+                                 title="By source site")
+                    st.plotly_chart(fig, use_container_width=True)
+    
+    # Skill demand from stored job features (no description parsing on the dashboard)
+    skill_demand = get_feature_store().skill_demand(SmartMatchingEngine(), all_internships) if all_internships else []
+    if skill_demand:
+        with st.expander("🧠 Skills in Demand", expanded=False):
+            fig = px.bar(x=[count for _, count in skill_demand], y=[skill for skill, _ in skill_demand], orientation='h',
+                         labels={'x': 'Internships requiring it', 'y': 'Skill'},
+                         title="Most required skills across your saved internships")
+            fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption("Counted from postings scored by Smart Search or recommendations")
+    
     st.markdown("---")
     
     # Resume info section
@@ -326,6 +366,7 @@ def show_dashboard_page():
         # Refresh button
         if st.button('🔄 Refresh', key="dashboard_refresh_btn", use_container_width=True):
             st.session_state.all_internships = None
+            st.session_state.pop('internship_stats', None)
             if not st.session_state.user_id:
                 st.error("You must be logged in to view internships.")
                 return
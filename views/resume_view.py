@@ -2,6 +2,9 @@ import streamlit as st
 import json
 from datetime import datetime
 from supabase_db import SupabaseDB
+from smart_matching_engine import invalidate_resume_analysis
+from recommendations import get_recommendation_store
+from rag_linkedin_searcher import RAGLinkedInSearcher
 
 def save_resume_json(user_id, resume_data):
     """Save resume JSON data to the database."""
@@ -14,6 +17,22 @@ def save_resume_json(user_id, resume_data):
         st.error(f"Error saving resume: {str(e)}")
         return False
 
+def rescore_session_results(resume_data):
+    """Re-score this session's search results and recommendations against an updated resume."""
+    searcher = None
+    st.session_state.pop('selected_results', None)  # selection keys carry the old ranks
+    if st.session_state.get('smart_search_results'):
+        searcher = RAGLinkedInSearcher()
+        st.session_state.smart_search_results = searcher.rescore_results(st.session_state.smart_search_results, resume_data)
+    cached = st.session_state.get('recommendation_results')
+    if cached and cached.get('results'):
+        searcher = searcher or RAGLinkedInSearcher()
+        st.session_state.recommendation_results = {
+            'resume': resume_data,
+            'results': searcher.rescore_results(cached['results'], resume_data)
+        }
+    return searcher is not None
+
 def get_required_template():
     """Get the required resume template structure."""
     return {
@@ -259,12 +278,20 @@ def show_resume_page():
                         
                         # Check if updating existing resume
                         if 'resume' in st.session_state and st.session_state.resume:
+                            # The old version's cached matching analysis is no longer needed
+                            invalidate_resume_analysis(st.session_state.resume)
                             st.session_state.resume = resume_data
                             st.success("🔄 Resume updated successfully!")
                             st.info("Your previous resume has been replaced with the new data.")
+                            if rescore_session_results(resume_data):
+                                st.info("📊 Your Smart Search results were re-scored against the updated resume.")
                         else:
                             st.session_state.resume = resume_data
                             st.success("💾 Resume saved successfully!")
+                        
+                        # Register the resume for the nightly recommendation job
+                        if st.session_state.get('user_id'):
+                            get_recommendation_store().save_resume(st.session_state.user_id, resume_data)
                     else:
                         st.error("❌ **Cannot save invalid resume!**")
                         st.write("**Validation errors:**")
@@ -319,7 +346,10 @@ def show_resume_page():
                     )
                     
                     if st.button("🗑️ Delete Resume", type="secondary", use_container_width=True):
+                        invalidate_resume_analysis(st.session_state.resume)
                         st.session_state.resume = None
+                        if st.session_state.get('user_id'):
+                            get_recommendation_store().remove_user(st.session_state.user_id)
                         st.success("Resume deleted!")
                         st.rerun()
                 
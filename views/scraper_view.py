@@ -7,47 +7,82 @@ import time
 from datetime import datetime
 from notifications import send_telegram_notification
 from config import SCRAPING_INTERVAL_MINUTES
+from ingestion_queue import get_ingestion_queue, make_idempotency_key, SOURCE_CONTINUOUS
 
 
 def process_and_save_search_results(result, user_id, all_internships):
-    """Helper function to process and save search results with comprehensive duplicate detection"""
+    """
+    Helper function to queue search results and write them through with duplicate detection.
+    Returns (new, duplicates), or None when the outbox is full (the error is shown to the user).
+    """
     print(f"[DEBUG] Processing {len(result)} scraped internships")
     print(f"[DEBUG] Current user has {len(all_internships)} existing internships")
     
-    db = SupabaseDB()
-    new_internships_count = 0
-    duplicate_count = 0
+    queue = get_ingestion_queue()
+    save_data = [{**internship, "status": "new"} for internship in result if isinstance(internship, dict)]
+    # Never block the page on a full outbox
+    enqueue_result = queue.enqueue(user_id, save_data, timeout=0)
+    if enqueue_result.get("error"):
+        print(f"[ERROR] Could not queue internships: {enqueue_result.get('message')}")
+        st.error(f"❌ Could not save the {len(save_data)} internships found: {enqueue_result.get('message')}. "
+                 "Please try the search again in a few minutes.")
+        return None
     
-    for i, internship in enumerate(result):
-        print(f"[DEBUG] Processing internship {i+1}: {internship.get('job_title', 'Unknown')} at {internship.get('company_name', 'Unknown')}")
-        
-        save_data = {
-            **internship,
-            "status": "new",
-        }
-        
-        # Use improved duplicate checking from database
-        resp = db.add_internship(user_id, save_data)
-        print(f"[DEBUG] Save response: {resp}")
-        
-        if resp.get("success"):
-            new_internships_count += 1
-            print(f"[DEBUG] Successfully saved new internship {new_internships_count}")
-        elif resp.get("error") == "duplicate":
-            duplicate_count += 1
-            reason = resp.get("message", "unknown reason")
-            print(f"[DEBUG] Duplicate internship detected: {reason}")
-        else:
-            error_msg = resp.get("error", "unknown error")
-            print(f"[DEBUG] Failed to save internship: {error_msg}")
+    # The user is waiting for counts, so drain this user's rows now; anything that
+    # fails stays in the outbox and the background flusher retries it.
+    flush_result = queue.flush_all(user_id=user_id)
+    new_internships_count = flush_result['inserted']
+    duplicate_count = flush_result['duplicates']
+    if flush_result['failed']:
+        print(f"[DEBUG] {flush_result['failed']} internships left in the outbox for retry")
     
     print(f"[DEBUG] Final results: {new_internships_count} new, {duplicate_count} duplicates")
     return new_internships_count, duplicate_count
 
 
+def send_internship_notifications(db, internships, telegram_bot_token, telegram_chat_id):
+    """Send one Telegram message per internship plus a summary, then mark them as notified."""
+    successfully_notified = []
+    
+    # Send individual detailed messages for each internship
+    for internship in internships:
+        detail_message = (
+            f"✨ New Internship: {internship['job_title']}\n"
+            f"🏢 Company: {internship['company_name']}\n"
+            f"🔗 Apply Here ({internship['application_link']})\n\n"
+            f"LinkedIn ({internship['application_link']})\n"
+            f"{internship['company_name']} hiring {internship['job_title']}\n"
+            f"{(internship.get('job_description') or '').split('Posted')[0]}"
+        )
+        try:
+            print(f"[DEBUG] Sending Telegram notification for internship: {internship['job_title']} at {internship['company_name']}")
+            send_telegram_notification(detail_message, telegram_bot_token, telegram_chat_id)
+            successfully_notified.append(internship)
+            print(f"[DEBUG] Successfully sent notification for internship ID: {internship.get('id', 'unknown')}")
+        except Exception as notify_err:
+            print(f"[ERROR] Failed to send Telegram notification: {notify_err}")
+    
+    # Flag every delivered internship as notified in a single round trip
+    if successfully_notified:
+        mark_result = db.mark_notified([internship['id'] for internship in successfully_notified])
+        print(f"[DEBUG] Continuous: Mark notified result: {mark_result}")
+
+    # Send summary message only if notifications were successful
+    if successfully_notified:
+        summary = f"🎯 Sent {len(successfully_notified)} internship notifications!\n\n"
+        for idx, internship in enumerate(successfully_notified, 1):
+            summary += f"{idx}. {internship['job_title']} at {internship['company_name']}\n"
+        try:
+            print(f"[DEBUG] Sending Telegram summary notification")
+            send_telegram_notification(summary, telegram_bot_token, telegram_chat_id)
+        except Exception as notify_err:
+            print(f"[ERROR] Failed to send Telegram summary notification: {notify_err}")
+
+
 def continuous_scraping(job_title, location, user_id):
     """Background task to continuously scrape LinkedIn for new internships."""
     db = SupabaseDB()
+    queue = get_ingestion_queue()
     
     # Temporarily skip notification field initialization until database is updated
     # print(f"[DEBUG] Initializing notification field for user {user_id}")
@@ -60,80 +95,40 @@ def continuous_scraping(job_title, location, user_id):
     telegram_chat_id = user_profile.get('telegram_chat_id')
     print(f"[DEBUG] Telegram config for user {user_id}: token={telegram_bot_token}, chat_id={telegram_chat_id}")
 
+    # Notifications are sent by the ingestion flusher once new internships are actually written
+    def on_internships_saved(_user_id, inserted):
+        print(f"[DEBUG] Continuous: {len(inserted)} newly saved internships to notify")
+        if telegram_bot_token and telegram_chat_id:
+            send_internship_notifications(db, inserted, telegram_bot_token, telegram_chat_id)
+        else:
+            print(f"[ERROR] Telegram config missing for user {user_id}.")
+
+    queue.add_flush_listener(user_id, on_internships_saved, source=SOURCE_CONTINUOUS)
+    
+    # Postings the outbox could not take yet (backpressure), keyed like the outbox; retried every round
+    pending = {}
+
     while True:
         try:
-            # Get current internships count for logging
-            all_internships = db.get_internships_by_user(user_id)
-            print(f"[DEBUG] Continuous: Found {len(all_internships) if all_internships else 0} existing internships in database")
-
             # Scrape LinkedIn
             result = scrape_linkedin(job_title, location, True)  # Only last 24h
             print(f"[DEBUG] Scraped {len(result) if isinstance(result, list) else 0} internships from LinkedIn.")
 
-            newly_saved_internships = []
             if isinstance(result, list):
                 for internship in result:
-                    print(f"[DEBUG] Continuous: Processing internship: {internship.get('job_title', 'Unknown')} at {internship.get('company_name', 'Unknown')}")
-                    
-                    save_data = {
-                        **internship,
-                        "status": "new"
-                    }
-                    
-                    resp = db.add_internship(user_id, save_data)
-                    print(f"[DEBUG] Continuous: Save response: {resp}")
-                    
-                    if resp.get("success"):
-                        # Add the internship ID to the data for notification tracking
-                        internship_with_id = {**internship, 'id': resp['data']['id']}
-                        newly_saved_internships.append(internship_with_id)
-                        print(f"[DEBUG] Continuous: Successfully saved internship with ID {resp['data']['id']}")
-                    elif resp.get("error") == "duplicate":
-                        print(f"[DEBUG] Continuous: Duplicate internship detected: {resp.get('message', 'unknown reason')}")
-                    else:
-                        print(f"[DEBUG] Continuous: Failed to save internship: {resp}")
-                        
-            # Only notify about newly saved internships since duplicates are filtered out
-            internships_to_notify = newly_saved_internships
-            print(f"[DEBUG] Total internships to notify: {len(internships_to_notify)} newly saved internships")
-
-            # Send notifications if there are internships to notify about
-            if internships_to_notify and telegram_bot_token and telegram_chat_id:
-                successfully_notified = []
-                
-                # Send individual detailed messages for each internship
-                for internship in internships_to_notify:
-                        detail_message = (
-                            f"✨ New Internship: {internship['job_title']}\n"
-                            f"🏢 Company: {internship['company_name']}\n"
-                            f"🔗 Apply Here ({internship['application_link']})\n\n"
-                            f"LinkedIn ({internship['application_link']})\n"
-                            f"{internship['company_name']} hiring {internship['job_title']}\n"
-                            f"{internship.get('job_description', '').split('Posted')[0]}"
-                        )
-                        try:
-                            print(f"[DEBUG] Sending Telegram notification for internship: {internship['job_title']} at {internship['company_name']}")
-                            send_telegram_notification(detail_message, telegram_bot_token, telegram_chat_id)
-                            successfully_notified.append(internship)
-                            print(f"[DEBUG] Successfully sent notification for internship ID: {internship.get('id', 'unknown')}")
-                        except Exception as notify_err:
-                            print(f"[ERROR] Failed to send Telegram notification: {notify_err}")
-                
-                # Send summary message only if notifications were successful
-                if successfully_notified:
-                    summary = f"🎯 Sent {len(successfully_notified)} internship notifications!\n\n"
-                    for idx, internship in enumerate(successfully_notified, 1):
-                        summary += f"{idx}. {internship['job_title']} at {internship['company_name']}\n"
-                    try:
-                        print(f"[DEBUG] Sending Telegram summary notification")
-                        send_telegram_notification(summary, telegram_bot_token, telegram_chat_id)
-                    except Exception as notify_err:
-                        print(f"[ERROR] Failed to send Telegram summary notification: {notify_err}")
-                        
-            elif not internships_to_notify:
+                    if isinstance(internship, dict):
+                        pending[make_idempotency_key(user_id, internship)] = {**internship, "status": "new"}
+            if pending:
+                # Append to the outbox; the background flusher batches the database writes
+                enqueue_result = queue.enqueue(user_id, list(pending.values()), source=SOURCE_CONTINUOUS)
+                print(f"[DEBUG] Continuous: Enqueue result: {enqueue_result}, metrics: {queue.metrics()}")
+                if enqueue_result.get("error"):
+                    print(f"[ERROR] Continuous: keeping {len(pending)} internships for the next round: "
+                          f"{enqueue_result.get('message')}")
+                else:
+                    pending.clear()
+            else:
                 print(f"[DEBUG] No new internships to notify for user {user_id}.")
-            elif not (telegram_bot_token and telegram_chat_id):
-                print(f"[ERROR] Telegram config missing for user {user_id}.")
 
         except Exception as e:
             print(f"Error in continuous scraping: {e}")
@@ -190,6 +185,13 @@ def show_scraper_page():
             search_location = st.session_state.get('last_location', '')
             location_text = f" in {search_location}" if search_location else " globally"
             st.success(f"🔄 Continuous search is active! Monitoring for new '{st.session_state.get('last_job_title', 'internships')}' opportunities{location_text} every {SCRAPING_INTERVAL_MINUTES} minutes.")
+            ingestion_metrics = get_ingestion_queue().metrics()
+            st.caption(
+                f"📥 Ingestion queue: {ingestion_metrics['queue_depth']} pending "
+                f"(oldest {ingestion_metrics['oldest_pending_age_s']}s) • "
+                f"last flush {ingestion_metrics['last_flush_latency_ms']} ms • "
+                f"{ingestion_metrics['inserted_total']} saved, {ingestion_metrics['failed_batches_total']} failed batches"
+            )
         else:
             st.info(f"ℹ️ Fill in the job title above and optionally specify a location (or leave empty for global search), then click 'Start Continuous Search' to begin automated monitoring every {SCRAPING_INTERVAL_MINUTES} minutes.")
     # Handle continuous search form submission
@@ -219,12 +221,12 @@ def show_scraper_page():
                         all_internships = st.session_state.get('all_internships', [])
                         
                         # Process and save the results
-                        new_internships, duplicate_internships = process_and_save_search_results(
-                            result, user_id, all_internships
-                        )
+                        saved = process_and_save_search_results(result, user_id, all_internships)
                         
-                        if new_internships > 0 or duplicate_internships > 0:
-                            st.success(f"✅ Found {new_internships} new internships and {duplicate_internships} duplicates!")
+                        if saved is None:
+                            pass  # outbox full, already reported
+                        elif saved[0] > 0 or saved[1] > 0:
+                            st.success(f"✅ Found {saved[0]} new internships and {saved[1]} duplicates!")
                             # Force refresh the data to show new results
                             st.session_state.force_refresh = True
                         else:
@@ -285,7 +287,10 @@ def show_scraper_page():
         all_internships = st.session_state.get('all_internships', [])
 
         with st.spinner("Processing and saving new internships..."):
-            new_internships_count, duplicate_count = process_and_save_search_results(result, user_id, all_internships)
+            saved = process_and_save_search_results(result, user_id, all_internships)
+        if saved is None:
+            return  # outbox full, already reported
+        new_internships_count, duplicate_count = saved
 
         # Clear the session state to force a refresh of internships
         st.session_state.all_internships = None
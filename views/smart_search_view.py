@@ -9,8 +9,13 @@ from typing import Dict, List
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from rag_linkedin_searcher import RAGLinkedInSearcher
+from rag_linkedin_searcher import (
+    RAGLinkedInSearcher, SOURCE_LOCAL, SOURCE_BOTH,
+    EVENT_STAGE, EVENT_LOCAL_RESULTS, EVENT_QUERY_DONE, EVENT_DUPLICATES, EVENT_PREFILTER, EVENT_SCORING
+)
 from smart_matching_engine import SmartMatchingEngine
+from match_results import ScoredJob, ResultRanker
+from recommendations import get_recommendation_store, load_recommendations, refresh_recommendations
 import time
 
 def show_smart_search_page():
@@ -41,6 +46,9 @@ def show_smart_search_page():
     with st.expander("📋 Your Resume Analysis", expanded=False):
         show_resume_analysis_summary(st.session_state.resume, matching_engine)
     
+    # Precomputed recommendations (refreshed nightly, or on demand here)
+    recommendations = show_recommendations_status(searcher)
+    
     st.markdown("---")
     
     # Smart Search Section
@@ -64,6 +72,13 @@ def show_smart_search_page():
             help="Higher values give more comprehensive results but take longer"
         )
         
+        source_label = st.radio(
+            "Results source:",
+            ["📚 Local corpus + 🌐 LinkedIn (fresh)", "📚 Local corpus only (instant)"],
+            help="The local corpus holds every posting scraped so far; LinkedIn adds new ones but takes longer"
+        )
+        search_source = SOURCE_LOCAL if source_label.startswith("📚 Local corpus only") else SOURCE_BOTH
+        
     # Query Management section (moved above Add New Search Query)
     st.markdown("---")
     st.markdown("## 📋 Query Management")
@@ -255,16 +270,75 @@ def show_smart_search_page():
             st.error("Please log in to perform searches")
             return
         
-        if not st.session_state.custom_queries:
+        if not st.session_state.custom_queries and search_source != SOURCE_LOCAL:
             st.error("Please add at least one search query before starting the search")
             return
             
-        perform_smart_search(searcher, search_mode, st.session_state.custom_queries, max_results_per_query)
+        perform_smart_search(searcher, search_mode, st.session_state.custom_queries, max_results_per_query, search_source)
     
-    # Display previous search results if available
+    if st.button("📌 Score My Saved Internships", use_container_width=True,
+                 help="Rank the internships already in your list against your resume"):
+        if not st.session_state.get('user_id'):
+            st.error("Please log in to score your saved internships")
+            return
+        try:
+            with st.spinner("Scoring your saved internships..."):
+                saved_results = searcher.score_saved_internships(st.session_state.user_id, st.session_state.resume)
+            if 'error' in saved_results:
+                st.error(f"❌ Failed to load saved internships: {saved_results['error']}")
+            else:
+                st.session_state.smart_search_results = saved_results
+                st.session_state.pop('selected_results', None)
+        except Exception as e:
+            st.error(f"❌ Scoring saved internships failed: {str(e)}")
+    
+    # Display previous search results if available, else the precomputed recommendations
     if 'smart_search_results' in st.session_state:
         st.markdown("---")
         display_search_results(st.session_state.smart_search_results)
+    elif recommendations:
+        st.markdown("---")
+        st.markdown("## 🌙 Recommended for You")
+        display_search_results(recommendations)
+
+def show_recommendations_status(searcher: RAGLinkedInSearcher):
+    """Show when recommendations were last computed, with a refresh button; returns them (or None)."""
+    user_id = st.session_state.get('user_id')
+    if not user_id:
+        return None
+    
+    # Resumes saved before recommendations existed are registered for the nightly job on first visit
+    if st.session_state.get('recommendations_registered') is not st.session_state.resume:
+        store = get_recommendation_store()
+        if not store.has_resume(user_id, st.session_state.resume):
+            store.save_resume(user_id, st.session_state.resume)
+        st.session_state.recommendations_registered = st.session_state.resume
+    
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        if st.button("🔄 Refresh Recommendations", help="Rescore the shared posting corpus against your resume now"):
+            store = get_recommendation_store()
+            store.save_resume(user_id, st.session_state.resume)
+            with st.spinner("Scoring the posting corpus against your resume..."):
+                refresh_recommendations(user_id, st.session_state.resume, searcher, store, full=True)
+            st.session_state.pop('recommendation_results', None)
+            if 'smart_search_results' not in st.session_state:
+                st.session_state.pop('selected_results', None)  # the recommendations are the list on screen
+    
+    cached = st.session_state.get('recommendation_results')
+    if cached is None or cached.get('resume') is not st.session_state.resume:
+        cached = {'resume': st.session_state.resume,
+                  'results': load_recommendations(user_id, st.session_state.resume, searcher)}
+        st.session_state.recommendation_results = cached
+    recommendations = cached['results']
+    
+    with col1:
+        if recommendations:
+            computed = time.strftime('%Y-%m-%d %H:%M', time.localtime(recommendations['computed_at']))
+            st.caption(f"🌙 {len(recommendations['analyzed_results'])} recommendations precomputed on {computed}")
+        else:
+            st.caption("🌙 No precomputed recommendations yet for this resume version")
+    return recommendations
 
 def show_resume_analysis_summary(resume_data: dict, matching_engine: SmartMatchingEngine):
     """Display a summary of the user's resume analysis"""
@@ -324,7 +398,48 @@ def show_resume_analysis_summary(resume_data: dict, matching_engine: SmartMatchi
             languages_list = list(analysis['languages'])
             st.write(" • ".join(languages_list))
 
-def perform_smart_search(searcher: RAGLinkedInSearcher, search_mode: str, custom_queries: List[dict], max_results: int):
+class StreamlitSearchProgress:
+    """Renders search pipeline events (see rag_linkedin_searcher.EVENT_*) as Streamlit output."""
+    
+    def __init__(self):
+        self.progress_bar = None
+    
+    def __call__(self, event: str, payload: dict):
+        if event == EVENT_STAGE:
+            if payload['stage'] == 'linkedin':
+                st.write(f"🔍 **{payload['message']}...**")
+                self.progress_bar = st.progress(0)
+            elif payload['stage'] == 'scoring':
+                st.write(f"🧠 **{payload['message']}...**")
+                self.progress_bar = st.progress(0)
+        
+        elif event == EVENT_LOCAL_RESULTS:
+            st.write(f"📚 **Local corpus:** {payload['count']} matching postings (of {payload['indexed']} indexed)")
+        
+        elif event == EVENT_QUERY_DONE:
+            query_info = payload['query_info']
+            st.write(f"🔍 **Search {payload['index'] + 1}/{payload['total']}:** {query_info['query']}")
+            st.write(f"*{query_info['reasoning']}*")
+            if 'error' in payload:
+                st.error(f"❌ Error in search: {payload['error']}")
+            elif payload['count']:
+                st.success(f"✅ Found {payload['count']} opportunities")
+            else:
+                st.warning(f"⚠️ No results found for this search")
+            if self.progress_bar is not None:
+                self.progress_bar.progress(payload['completed'] / payload['total'])
+        
+        elif event == EVENT_DUPLICATES:
+            st.write(f"🔁 **Merged {payload['count']} duplicate postings** returned by more than one query")
+        
+        elif event == EVENT_PREFILTER:
+            st.write(f"🧭 **Semantic pre-filter:** scoring the {payload['kept']} closest of {payload['total']} postings")
+        
+        elif event == EVENT_SCORING and self.progress_bar is not None:
+            self.progress_bar.progress(payload['done'] / payload['total'])
+
+def perform_smart_search(searcher: RAGLinkedInSearcher, search_mode: str, custom_queries: List[dict], max_results: int,
+                         source: str = SOURCE_BOTH):
     """Execute the smart search process"""
     
     search_start_time = time.time()
@@ -354,21 +469,17 @@ def perform_smart_search(searcher: RAGLinkedInSearcher, search_mode: str, custom
                 resume_data=st.session_state.resume,
                 user_id=st.session_state.user_id,
                 max_results_per_query=max_results,
-                custom_queries=all_queries
+                custom_queries=all_queries,
+                source=source,
+                on_event=StreamlitSearchProgress()
             )
             
             # Step 3: Analysis complete (done in perform_rag_search)
             status_text.text("Step 3/4: Analysis completed...")
             progress_bar.progress(0.75)
             
-            # Step 4: Save results
-            status_text.text("Step 4/4: Saving results...")
-            if search_results['analyzed_results']:
-                save_success = searcher.save_smart_search_results(
-                    search_results, st.session_state.user_id
-                )
-                if save_success:
-                    st.success("✅ Results saved to your internship list!")
+            # Step 4: Results are saved selectively from the results list
+            status_text.text("Step 4/4: Preparing results...")
             
             progress_bar.progress(1.0)
             status_text.text("✅ Smart search completed!")
@@ -378,6 +489,7 @@ def perform_smart_search(searcher: RAGLinkedInSearcher, search_mode: str, custom
             
             # Store results in session state
             st.session_state.smart_search_results = search_results
+            st.session_state.pop('selected_results', None)
             st.session_state.smart_search_metadata = {
                 'search_time': search_time,
                 'timestamp': time.time()
@@ -468,11 +580,11 @@ def display_search_results(search_results: dict):
             help="Choose how many results to display per page"
         )
     
-    # Filter results
-    filtered_results = filter_results(analyzed_results, match_filter, min_compatibility)
-    
-    # Sort results
-    filtered_results = sort_results(filtered_results, sort_option)
+    # Filter and sort from the ranker's indexes (memoised per filter/sort combination)
+    ranker = search_results.get('ranker')
+    if ranker is None:
+        ranker = search_results['ranker'] = ResultRanker.from_records(analyzed_results)
+    filtered_results = ranker.query(match_filter, min_compatibility, sort_option)
     
     # Convert "Show All" to actual number
     results_per_page = len(filtered_results) if results_per_page_selection == "Show All" else results_per_page_selection
@@ -487,6 +599,7 @@ def display_search_results(search_results: dict):
     
     # Pagination setup
     total_results = len(filtered_results)
+    ranks = {id(record): rank for rank, record in enumerate(search_results['analyzed_results'])}
     
     if total_results > 0:
         # Check if showing all results (no pagination needed)
@@ -495,7 +608,7 @@ def display_search_results(search_results: dict):
         if show_all:
             # Show all results without pagination
             st.info(f"📋 **Showing all {total_results} filtered results**")
-            display_results_list(filtered_results, 0)
+            display_results_list(filtered_results, 0, len(search_results.get('search_queries_used', [])), ranks)
         else:
             # Calculate pagination
             total_pages = (total_results - 1) // results_per_page + 1
@@ -563,7 +676,7 @@ def display_search_results(search_results: dict):
             paginated_results = filtered_results[start_idx:end_idx]
             
             # Display paginated results
-            display_results_list(paginated_results, start_idx)
+            display_results_list(paginated_results, start_idx, len(search_results.get('search_queries_used', [])), ranks)
             
             # Bottom pagination controls (repeat for convenience if more than 1 page)
             if total_pages > 1:
@@ -595,43 +708,68 @@ def display_search_results(search_results: dict):
     else:
         st.warning("No results match your current filters.")
     
+    display_save_controls(search_results, filtered_results, min_compatibility)
+    
     # Analytics section removed for simplified view
 
-def filter_results(results: List[dict], match_filter: str, min_compatibility: int) -> List[dict]:
-    """Filter results based on user criteria"""
-    
-    filtered = results
-    
-    # Filter by match quality
-    if match_filter != "All Matches":
-        filtered = [r for r in filtered if r['match_category'] == match_filter]
+def _selection_key(rank: int, record: ScoredJob) -> str:
+    """Checkbox key of a result: its rank keeps keys unique when result_ids collide (same title and company, no link)"""
+    return f"select_{rank}_{record.result_id}"
+
+def _toggle_selection(key: str):
+    """Checkbox on_change: mirror the tick into selected_results, which outlives the widget when it is paged or filtered away"""
+    selected = st.session_state.setdefault('selected_results', set())
+    if st.session_state.get(key):
+        selected.add(key)
+    else:
+        selected.discard(key)
+
+def display_save_controls(search_results: dict, filtered_results: List[ScoredJob], min_compatibility: float):
+    """Save the selected results, or every result passing the current filters, in one bulk insert"""
     
-    # Filter by minimum compatibility
-    filtered = [r for r in filtered if r['compatibility_scores']['overall_compatibility'] >= min_compatibility]
+    selected = st.session_state.get('selected_results', set())
+    selected_records = [record for rank, record in enumerate(search_results['analyzed_results'])
+                        if _selection_key(rank, record) in selected]
     
-    return filtered
-
-def sort_results(results: List[dict], sort_option: str) -> List[dict]:
-    """Sort results based on user preference"""
+    st.markdown("### 💾 Save to Your Internship List")
+    col1, col2 = st.columns(2)
     
-    sort_keys = {
-        "Recommendation Priority": lambda x: x['recommendation_priority'],
-        "Compatibility Score": lambda x: x['compatibility_scores']['overall_compatibility'],
-        "Acceptance Probability": lambda x: x['acceptance_analysis']['acceptance_probability'],
-        "Company Name": lambda x: x.get('company_name', '').lower()
-    }
+    save_kwargs = None
+    with col1:
+        if st.button(f"💾 Save Selected ({len(selected_records)})", disabled=not selected_records,
+                     use_container_width=True):
+            save_kwargs = {'records': selected_records}
+    with col2:
+        if st.button(f"💾 Save All Filtered ({len(filtered_results)})", disabled=not filtered_results,
+                     use_container_width=True):
+            save_kwargs = {'records': filtered_results, 'min_compatibility': min_compatibility}
     
-    if sort_option in sort_keys:
-        reverse_sort = sort_option != "Company Name"  # Company name should be A-Z
-        results.sort(key=sort_keys[sort_option], reverse=reverse_sort)
+    if save_kwargs is None:
+        return
+    if not st.session_state.get('user_id'):
+        st.error("Please log in to save results")
+        return
     
-    return results
+    result = RAGLinkedInSearcher().save_smart_search_results(search_results, st.session_state.user_id, **save_kwargs)
+    if 'error' in result:
+        st.error(f"❌ Could not save results: {result['error']}")
+    else:
+        st.success(f"✅ {result['new']} new internships saved ({result['duplicates']} already in your list)")
 
-def display_results_list(results: List[dict], start_index: int = 0):
-    """Display the filtered and sorted results list"""
+def display_results_list(results: List[ScoredJob], start_index: int = 0, query_count: int = 0, ranks: dict = None):
+    """Display the filtered and sorted results list (ranks: id(record) -> position in analyzed_results)"""
     
     for i, job in enumerate(results):
-        with st.expander(f"🏢 **{job.get('job_title', 'Unknown Position')}** at **{job.get('company_name', 'Unknown Company')}** - {job['match_category']} ({job['compatibility_scores']['overall_compatibility']:.1f}% compatible)"):
+        with st.expander(f"🏢 **{job.job_title or 'Unknown Position'}** at **{job.company_name or 'Unknown Company'}** - {job.match_category} ({job.compatibility:.1f}% compatible)"):
+            
+            rank = ranks[id(job)] if ranks else start_index + i
+            key = _selection_key(rank, job)
+            st.checkbox("Select to save", value=key in st.session_state.get('selected_results', set()), key=key,
+                        on_change=_toggle_selection, args=(key,))
+            
+            matched_queries = job.matched_queries
+            if query_count > 1 and len(matched_queries) > 1:
+                st.caption(f"🔁 Matched {len(matched_queries)} of your {query_count} queries: {', '.join(matched_queries)}")
             
             # Top section with key metrics
             col1, col2, col3 = st.columns(3)
@@ -639,14 +777,14 @@ def display_results_list(results: List[dict], start_index: int = 0):
             with col1:
                 st.metric(
                     "Compatibility Score",
-                    f"{job['compatibility_scores']['overall_compatibility']:.1f}%",
+                    f"{job.compatibility:.1f}%",
                     help="How well your skills match this role"
                 )
             
             with col2:
                 st.metric(
                     "Acceptance Probability",
-                    f"{job['acceptance_analysis']['acceptance_probability']:.1f}%",
+                    f"{job.acceptance_probability:.1f}%",
                     help="Estimated chance of getting this position"
                 )
             
@@ -654,22 +792,18 @@ def display_results_list(results: List[dict], start_index: int = 0):
                 st.metric(
                     "Priority Rank",
                     f"#{start_index + i + 1}",
-                    f"{job['recommendation_priority']:.1f}/100"
+                    f"{job.recommendation_priority:.1f}/100"
                 )
             
             # Detailed analysis
             st.markdown("#### 📈 Detailed Analysis")
             
-            # Skills breakdown
-            breakdown = job['compatibility_scores']['detailed_breakdown']
-            
+            # Skills breakdown (computed only for the results on this page)
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("**✅ Matching Skills:**")
-                technical_details = breakdown['technical_skills']['details']
-                matching_skills = technical_details.get('matching_required_skills', []) + \
-                                 technical_details.get('matching_preferred_skills', [])
+                matching_skills = job.matching_skills()
                 
                 if matching_skills:
                     for skill in matching_skills[:5]:
@@ -679,7 +813,7 @@ def display_results_list(results: List[dict], start_index: int = 0):
             
             with col2:
                 st.markdown("**📚 Areas to Improve:**")
-                missing_skills = technical_details.get('missing_required_skills', [])
+                missing_skills = job.missing_required_skills()
                 if missing_skills:
                     for skill in missing_skills[:5]:
                         st.write(f"• {skill}")
@@ -687,16 +821,16 @@ def display_results_list(results: List[dict], start_index: int = 0):
                     st.write("• No specific gaps identified")
             
             # Job description preview if available
-            if job.get('job_description'):
+            if job.job_description:
                 st.markdown("**📄 Job Description Preview:**")
-                description = job['job_description']
+                description = job.job_description
                 preview = description[:300] + ('...' if len(description) > 300 else '')
                 st.markdown(f"> {preview}")
             
             # Short Summary
             st.markdown("**📝 Summary:**")
-            compatibility = job['compatibility_scores']['overall_compatibility']
-            acceptance = job['acceptance_analysis']['acceptance_probability']
+            compatibility = job.compatibility
+            acceptance = job.acceptance_probability
             
             if compatibility >= 80:
                 match_quality = "Excellent match"
@@ -709,37 +843,9 @@ def display_results_list(results: List[dict], start_index: int = 0):
             st.write(summary_text)
             
             # Apply button only
-            if job.get('application_link'):
-                st.link_button("🌐 Apply Now", job['application_link'], use_container_width=True)
+            if job.application_link:
+                st.link_button("🌐 Apply Now", job.application_link, use_container_width=True)
 
 # Removed detailed analysis function for simplified view
 
-def filter_results(results: List[dict], match_filter: str, min_compatibility: int) -> List[dict]:
-    """Filter results based on user criteria"""
-    
-    filtered = results
-    
-    # Filter by match quality
-    if match_filter != "All Matches":
-        filtered = [r for r in filtered if r['match_category'] == match_filter]
-    
-    # Filter by minimum compatibility
-    filtered = [r for r in filtered if r['compatibility_scores']['overall_compatibility'] >= min_compatibility]
-    
-    return filtered
-
-def sort_results(results: List[dict], sort_option: str) -> List[dict]:
-    """Sort results based on user preference"""
-    
-    sort_keys = {
-        "Recommendation Priority": lambda x: x['recommendation_priority'],
-        "Compatibility Score": lambda x: x['compatibility_scores']['overall_compatibility'], 
-        "Acceptance Probability": lambda x: x['acceptance_analysis']['acceptance_probability'],
-        "Company Name": lambda x: x.get('company_name', '')
-    }
-    
-    reverse = sort_option != "Company Name"  # Company name should be ascending
-    
-    return sorted(results, key=sort_keys[sort_option], reverse=reverse)
-
 # Removed search analytics function for simplified view
\ No newline at end of file
@@ -1,6 +1,5 @@
 import requests
 from bs4 import BeautifulSoup
-import streamlit as st
 import re
 
 # --- LinkedIn Scraper ---